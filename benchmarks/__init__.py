@@ -0,0 +1 @@
+"""Benchmarks of the GVol clients, see :mod:`benchmarks.run`."""
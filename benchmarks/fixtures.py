@@ -0,0 +1,170 @@
+"""Responses and arguments for benchmarking every endpoint offline.
+
+Responses are generated from the query documents and the schema, at the
+number of rows a real response has, or read from fixtures recorded with
+:func:`gvol.testing.record`.
+"""
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from graphql import (
+    FieldNode,
+    GraphQLEnumType,
+    GraphQLInputObjectType,
+    GraphQLList,
+    GraphQLObjectType,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+    type_from_ast,
+)
+
+from gvol import schema
+from gvol.columnar import TIMESTAMP_FIELDS
+from gvol.registry import registry
+from gvol.testing import Fixtures
+
+#: Rows in the responses of the biggest endpoints, e.g. a full Deribit book or a
+#: day of trades.
+ROWS = {
+    "options_orderbook_details": 2500,
+    "options_trades_orderbook_details": 50000,
+    "options_trades": 20000,
+    "options_greeks_minute": 2500,
+    "options_greeks_hour": 2500,
+    "HourlyInstrumentImpliedVolandOI": 5000,
+}
+#: Rows in the responses of every other endpoint.
+DEFAULT_ROWS = 500
+#: Items of lists nested in rows.
+NESTED_ROWS = 3
+#: Windows of the methods pulling a date range slice by slice: three days, or
+#: six hours for the hourly slices of options_greeks_minute_range.
+RANGES = {
+    "options_trades_range": ("2022-01-01", "2022-01-03"),
+    "options_greeks_minute_range": ("2022-01-01 00:00:00", "2022-01-01 06:00:00"),
+    "options_greeks_hour_range": ("2022-01-01", "2022-01-03"),
+}
+
+_START = 1_640_995_200_000  # 2022-01-01 in milliseconds
+
+
+def arguments(query: str) -> Dict[str, Any]:
+    """Returns plausible arguments for the endpoint method of a query."""
+    definition: Any = registry.document(query).definitions[0]
+    client_schema = schema.load_schema()
+    values = {}
+    for variable in definition.variable_definitions:
+        name = variable.variable.name.value
+        values[name] = _argument(name, type_from_ast(client_schema, variable.type))
+    return values
+
+
+def range_arguments(method: str) -> Dict[str, Any]:
+    """Returns plausible arguments for a method of :data:`RANGES`, which takes
+    the arguments of its query with a window instead of a date.
+    """
+    values = arguments(method[: -len("_range")])
+    values.pop("date", None)
+    values.pop("dateTime", None)
+    values["dateStart"], values["dateEnd"] = RANGES[method]
+    return values
+
+
+def _argument(name: str, graphql_type: Any) -> Any:
+    graphql_type = get_nullable_type(graphql_type)
+    if isinstance(graphql_type, GraphQLList):
+        return [_argument(name, graphql_type.of_type)]
+    if isinstance(graphql_type, GraphQLEnumType):
+        return next(iter(graphql_type.values))
+    if isinstance(graphql_type, GraphQLInputObjectType):
+        return {
+            field: _argument(field, field_type.type)
+            for field, field_type in graphql_type.fields.items()
+        }
+    scalar = graphql_type.name
+    if scalar == "Float":
+        return 1.0
+    if scalar == "Int":
+        return 7
+    if scalar == "Boolean":
+        return True
+    if name.startswith("date"):
+        return "2022-01-01T00:00:00"
+    return "BTC-30DEC22-20000-C"
+
+
+def synthetic(query: str, seed: int = 0) -> Dict[str, Any]:
+    """Generates the response to a query, with ROWS rows per root field."""
+    rng = random.Random(seed)
+    definition: Any = registry.document(query).definitions[0]
+    query_type = schema.load_schema().query_type
+    assert query_type is not None
+    rows = ROWS.get(query, DEFAULT_ROWS)
+    return {
+        (root.alias or root.name).value: _value(
+            rng, root, query_type.fields[root.name.value].type, rows
+        )
+        for root in definition.selection_set.selections
+    }
+
+
+def _value(rng: random.Random, field: FieldNode, graphql_type: Any, rows: int) -> Any:
+    name = (field.alias or field.name).value
+    graphql_type = get_nullable_type(graphql_type)
+    if is_list_type(graphql_type):
+        return [
+            _value(rng, field, graphql_type.of_type, NESTED_ROWS) for _ in range(rows)
+        ]
+    named = get_named_type(graphql_type)
+    if isinstance(named, GraphQLObjectType):
+        assert field.selection_set is not None
+        return {
+            (child.alias or child.name).value: _value(
+                rng, child, named.fields[child.name.value].type, NESTED_ROWS
+            )
+            for child in field.selection_set.selections
+            if isinstance(child, FieldNode)
+        }
+    if isinstance(named, GraphQLEnumType):
+        return rng.choice(list(named.values))
+    if name in TIMESTAMP_FIELDS:
+        timestamp = _START + rng.randrange(86_400) * 1000
+        return timestamp if named.name in ("Float", "Int") else str(timestamp)
+    if named.name == "Float":
+        return round(rng.uniform(0, 100), 4)
+    if named.name == "Int":
+        return rng.randrange(1000)
+    if named.name == "Boolean":
+        return rng.random() < 0.5
+    return f"{name}-{rng.randrange(100)}"
+
+
+class Feed:
+    """LocalServer feed answering every call of a query with the same response.
+
+    Responses come from recorded fixtures when there are some for the query,
+    whatever their variables, and are generated otherwise.
+
+    Args:
+        directory: fixtures recorded with :func:`gvol.testing.record`
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None) -> None:
+        self.fixtures = Fixtures(directory) if directory is not None else None
+        self._responses: Dict[str, Any] = {}
+
+    def __call__(self, query: str, variable_values: Dict[str, Any]) -> Any:
+        try:
+            return self._responses[query]
+        except KeyError:
+            return self._responses.setdefault(query, self._response(query))
+
+    def _response(self, query: str) -> Any:
+        if self.fixtures is not None:
+            for path in sorted((self.fixtures.directory / query).glob("*.json")):
+                with open(path) as f:
+                    return json.load(f)["data"]
+        return synthetic(query)
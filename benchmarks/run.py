@@ -0,0 +1,431 @@
+"""Runs the benchmarks and compares them with a baseline.
+
+Every endpoint method is called against a local server, running in its own
+process so that encoding responses does not compete with the client for the
+GIL, in three modes: one call after the other ("serial"), from a thread pool
+("threaded") and from AsyncGVol ("async"), along with the methods pulling a
+date range slice by slice and a batch of calls. Extra cases time the decoding
+to columns, streaming and the caches. Each case runs in a new process, so that
+the peak RSS it reports is its own. Run from the repository root::
+
+    python -m benchmarks --save benchmarks/baseline.json
+    python -m benchmarks --compare benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import inspect
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from benchmarks import fixtures
+from gvol import AsyncGVol, GVol, columnar
+from gvol.cache import DiskCache, IntervalCache, LiveCache
+from gvol.registry import registry
+from gvol.testing import LocalServer
+
+MODES = ("serial", "threaded", "async")
+
+#: Relative change of a measurement past which it counts as a regression.
+THRESHOLD = 0.1
+
+
+class Result(NamedTuple):
+    requests_per_sec: float
+    rows_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+
+
+#: Whether a higher value of each measurement is better.
+HIGHER_IS_BETTER = {
+    "requests_per_sec": True,
+    "rows_per_sec": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+class Case(NamedTuple):
+    """A benchmark: ``call(gvol_client)`` returns the rows it got, from a
+    client created with the arguments ``setup()`` returns.
+    """
+
+    name: str
+    mode: str
+    call: Callable[[Any], Any]
+    setup: Callable[[], Dict[str, Any]] = dict
+
+
+class _Server(LocalServer):
+    """Server encoding the response of each query once, as every call of a
+    query gets the same response from the benchmark feed.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._encoded: Dict[str, bytes] = {}
+
+    def encode(self, body: Dict[str, Any]) -> bytes:
+        key = body.get("query", "")
+        if key not in self._encoded:
+            self._encoded[key] = super().encode(body)
+        return self._encoded[key]
+
+
+def _serve(
+    directory: Optional[str], latency: float, bandwidth: Optional[float], urls: Any
+) -> None:
+    server = _Server(fixtures.Feed(directory), latency=latency, bandwidth=bandwidth)
+    server.start()
+    urls.put(server.url)
+    threading.Event().wait()  # until terminated
+
+
+def methods() -> List[str]:
+    """Returns the names of every endpoint method."""
+    return [
+        name
+        for name, _ in inspect.getmembers(GVol, inspect.isfunction)
+        if name in registry
+    ]
+
+
+def cases(modes: Sequence[str] = MODES) -> Iterator[Case]:
+    for method in methods():
+        arguments = fixtures.arguments(method)
+        for mode in modes:
+            yield Case(method, mode, _caller(method, arguments))
+
+    for method in fixtures.RANGES:
+        arguments = fixtures.range_arguments(method)
+        for mode in modes:
+            if method == "options_greeks_minute_range":  # merges the slices itself
+                yield Case(method, mode, _caller(method, arguments))
+            else:
+                yield Case(method, mode, _backfill_caller(method, arguments, mode))
+
+    calls = [(method, fixtures.arguments(method)) for method in methods()[:8]]
+    for mode in modes:
+        yield Case(f"batch[{len(calls)}]", mode, _batch_caller(calls, mode))
+
+    if "serial" not in modes:
+        return
+    details = fixtures.arguments("options_orderbook_details")
+    for result_format in columnar.FORMATS:
+        try:
+            columnar.check_format(result_format)
+        except ImportError:
+            continue
+        yield Case(
+            f"decode[{result_format}]",
+            "serial",
+            _caller("options_orderbook_details", details),
+            partial(dict, result_format=result_format),
+        )
+
+    trades = fixtures.arguments("options_trades_orderbook_details")
+    yield Case(
+        "stream[10000]",
+        "serial",
+        lambda gvol_client: [
+            row
+            for batch in gvol_client.stream(
+                "options_trades_orderbook_details", batch_size=10000, **trades
+            )
+            for row in batch
+        ],
+    )
+    yield Case(
+        "cache[live]",
+        "serial",
+        _caller("futures_orderbook", fixtures.arguments("futures_orderbook")),
+        lambda: {"live_cache": LiveCache(ttls={"futures_orderbook": 3600.0})},
+    )
+    yield Case(
+        "cache[disk]",
+        "serial",
+        _caller("options_trades", fixtures.arguments("options_trades")),
+        lambda: {"cache": DiskCache(tempfile.mkdtemp(prefix="gvol-benchmarks-"))},
+    )
+
+    # The warm-up call fills the interval cache, so a warm case only requests
+    # the rows at dateEnd. A partial case settles only the first of its two
+    # days, and requests the second one on every call.
+    atm = fixtures.arguments("options_atm_constant")
+    yield Case(
+        "cache[interval-warm]",
+        "serial",
+        _caller(
+            "options_atm_constant",
+            dict(atm, dateStart="2022-01-01", dateEnd="2022-01-02"),
+        ),
+        lambda: {"interval_cache": _interval_cache()},
+    )
+    yield Case(
+        "cache[interval-partial]",
+        "serial",
+        _caller(
+            "options_atm_constant",
+            dict(atm, dateStart="2022-01-01", dateEnd="2022-01-03"),
+        ),
+        lambda: {"interval_cache": _interval_cache(settled=datetime(2022, 1, 2))},
+    )
+
+
+def _interval_cache(settled: Optional[datetime] = None) -> IntervalCache:
+    """Returns an empty interval cache, holding only what is older than
+    ``settled`` if given.
+    """
+    cache = IntervalCache(tempfile.mkdtemp(prefix="gvol-benchmarks-"))
+    if settled is not None:
+        cache.settle = datetime.now(timezone.utc) - settled.replace(tzinfo=timezone.utc)
+    return cache
+
+
+def _caller(method: str, arguments: Dict[str, Any]) -> Callable[[Any], Any]:
+    return lambda gvol_client: getattr(gvol_client, method)(**arguments)
+
+
+def _backfill_caller(
+    method: str, arguments: Dict[str, Any], mode: str
+) -> Callable[[Any], Any]:
+    """Returns a caller consuming the (day, result) pairs of a range method."""
+    if mode == "async":
+
+        async def consume(gvol_client: Any) -> Tuple[Any, ...]:
+            results = getattr(gvol_client, method)(**arguments)
+            return tuple([result async for _, result in results])
+
+        return consume
+    return lambda gvol_client: tuple(
+        result for _, result in getattr(gvol_client, method)(**arguments)
+    )
+
+
+def _batch_caller(calls: List[Any], mode: str) -> Callable[[Any], Any]:
+    if mode == "async":
+
+        async def call(gvol_client: Any) -> Tuple[Any, ...]:
+            return tuple(await gvol_client.batch(calls))
+
+        return call
+    return lambda gvol_client: tuple(gvol_client.batch(calls))
+
+
+def count(result: Any) -> int:
+    """Returns the rows of a result, as rows, columns or a pyarrow Table, or of
+    a tuple of results, e.g. the days of a range or the calls of a batch.
+    """
+    if isinstance(result, tuple):
+        return sum(map(count, result))
+    if isinstance(result, list):
+        return len(result)
+    total = 0
+    for value in result.values() if isinstance(result, dict) else ():
+        if hasattr(value, "num_rows"):
+            total += value.num_rows
+        elif isinstance(value, dict):
+            total += len(next(iter(value.values()), ()))
+        else:
+            total += len(value) if isinstance(value, list) else 1
+    return total
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process so far, which only grows: it is
+    the peak of a case when the case runs in a process of its own.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run(case: Case, url: str, calls: int, concurrency: int) -> Result:
+    """Runs a case ``calls`` times and returns its measurements."""
+    latencies: List[float] = []
+    rows: List[int] = []
+    # Identical calls in flight at once would share requests otherwise.
+    client_kwargs = {"coalesce": False, **case.setup()}
+
+    def timed(result: Any, started: float) -> None:
+        latencies.append(time.perf_counter() - started)
+        rows.append(count(result))
+
+    def call(gvol_client: Any) -> None:
+        started = time.perf_counter()
+        timed(case.call(gvol_client), started)
+
+    async def call_async(gvol_client: Any, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            timed(await case.call(gvol_client), started)
+
+    async def run_async() -> float:
+        async with AsyncGVol("header", "benchmark", **client_kwargs) as gvol_client:
+            gvol_client._url = gvol_client._aio_transport.url = url
+            await case.call(gvol_client)  # warm up
+            semaphore = asyncio.Semaphore(concurrency)
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(call_async(gvol_client, semaphore) for _ in range(calls))
+            )
+            return time.perf_counter() - started
+
+    if case.mode == "async":
+        elapsed = asyncio.run(run_async())
+    else:
+        with GVol(
+            "header", "benchmark", max_connections=concurrency, **client_kwargs
+        ) as gvol_client:
+            gvol_client._url = gvol_client._transport.url = url
+            case.call(gvol_client)  # warm up
+            started = time.perf_counter()
+            if case.mode == "threaded":
+                with ThreadPoolExecutor(concurrency) as executor:
+                    list(executor.map(lambda _: call(gvol_client), range(calls)))
+            else:
+                for _ in range(calls):
+                    call(gvol_client)
+            elapsed = time.perf_counter() - started
+
+    return Result(
+        requests_per_sec=calls / elapsed,
+        rows_per_sec=sum(rows) / elapsed,
+        p50_ms=percentile(latencies, 0.5) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def case_name(case: Case) -> str:
+    return f"{case.name}[{case.mode}]"
+
+
+def _run_named(
+    name: str, modes: Sequence[str], url: str, calls: int, concurrency: int
+) -> Result:
+    case = next(case for case in cases(modes) if case_name(case) == name)
+    return run(case, url, calls, concurrency)
+
+
+def run_isolated(
+    context: Any, case: Case, url: str, calls: int, concurrency: int
+) -> Result:
+    """Runs a case like :func:`run` in a new process of a multiprocessing context."""
+    with context.Pool(1) as pool:
+        return pool.apply(
+            _run_named, (case_name(case), [case.mode], url, calls, concurrency)
+        )
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = THRESHOLD,
+) -> List[str]:
+    """Returns the regressions of results against a baseline, one line each."""
+    regressions = []
+    for name, result in results.items():
+        for measurement, value in result.items():
+            previous = baseline.get(name, {}).get(measurement)
+            if not previous:
+                continue
+            change = (value - previous) / previous
+            worse = -change if HIGHER_IS_BETTER[measurement] else change
+            if worse > threshold:
+                regressions.append(
+                    f"{name} {measurement}: {previous:.4g} -> {value:.4g} ({change:+.1%})"
+                )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "-k", "--select", default="*", help="glob selecting cases by name"
+    )
+    parser.add_argument(
+        "--modes", default=",".join(MODES), help="comma separated modes"
+    )
+    parser.add_argument("--calls", type=int, default=20, help="calls per case")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--fixtures", help="directory of fixtures recorded with gvol.testing.record"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added by the server"
+    )
+    parser.add_argument(
+        "--bandwidth", type=float, help="bytes per second sent by the server"
+    )
+    parser.add_argument("--save", help="write the results to this baseline file")
+    parser.add_argument("--compare", help="baseline file to compare the results with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context("spawn")
+    urls = context.Queue()
+    server = context.Process(
+        target=_serve,
+        args=(args.fixtures, args.latency, args.bandwidth, urls),
+        daemon=True,
+    )
+    server.start()
+    url = urls.get(timeout=60)
+
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for case in cases(args.modes.split(",")):
+            name = case_name(case)
+            if not fnmatch.fnmatchcase(name, args.select):
+                continue
+            result = run_isolated(context, case, url, args.calls, args.concurrency)
+            results[name] = result._asdict()
+            print(
+                f"{name:<60} {result.requests_per_sec:>9.1f} req/s "
+                f"{result.rows_per_sec:>12.0f} rows/s "
+                f"p50 {result.p50_ms:>8.2f} ms p99 {result.p99_ms:>8.2f} ms "
+                f"{result.peak_rss_mb:>7.1f} MB",
+                flush=True,
+            )
+    finally:
+        server.terminate()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
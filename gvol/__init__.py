@@ -1,4 +1,5 @@
-__all__ = ("__version__", "GVol")
+__all__ = ("__version__", "AsyncGVol", "GVol")
 __version__ = "0.6.2"
 
+from gvol.async_client import AsyncGVol
 from gvol.client import GVol
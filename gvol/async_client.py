@@ -0,0 +1,1006 @@
+import asyncio
+import inspect
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from gql.client import AsyncClientSession
+from gql.transport.exceptions import TransportServerError
+from graphql import DocumentNode
+
+from gvol import batch, columnar, diff, metrics, ranges, streaming, types
+from gvol.cache import (
+    INTERVAL_QUERIES,
+    DiskCache,
+    IntervalCache,
+    LiveCache,
+    request_key,
+)
+from gvol.client import GVol
+from gvol.ratelimit import RateLimiter
+from gvol.registry import registry
+from gvol.retry import RetryPolicy
+from gvol.store import Store
+
+try:
+    import aiohttp
+    from gql.transport.aiohttp import AIOHTTPTransport
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore
+
+
+class AsyncGVol(GVol):
+    """Asyncio GVol API client.
+
+    Exposes exactly the same endpoints as :class:`GVol`, but every endpoint
+    method returns a coroutine. All requests share one aiohttp connection pool,
+    so a single event loop can keep many of them in flight at once::
+
+        async with AsyncGVol(header="x-oracle", gvol_api_key="...") as gvol_client:
+            btc, eth = await asyncio.gather(
+                gvol_client.options_orderbook(symbol="BTC", exchange="deribit"),
+                gvol_client.options_orderbook(symbol="ETH", exchange="deribit"),
+            )
+
+    Requires the ``aiohttp`` extra: ``pip install gvol[aiohttp]``.
+    """
+
+    def __init__(
+        self,
+        header: str,
+        gvol_api_key: str,
+        fetch_schema: bool = False,
+        max_connections: int = 100,
+        cache: Optional[DiskCache] = None,
+        interval_cache: Optional[IntervalCache] = None,
+        live_cache: Optional[LiveCache] = None,
+        result_format: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        subscription_url: Optional[str] = None,
+        hooks: Sequence[metrics.Hook] = (),
+        store: Optional[Store] = None,
+    ) -> None:
+        """Initializes asyncio GVol API client.
+
+        Args:
+            gvol_api_key (str): API key
+            fetch_schema (bool): introspect the schema from the API before the
+                first query instead of using the local one
+            max_connections (int): size of the shared connection pool
+            cache (DiskCache): on-disk cache for responses of historical queries
+            interval_cache (IntervalCache): cache fetching only the missing
+                parts of dateStart/dateEnd windows of time series queries
+            live_cache (LiveCache): in-memory cache of real-time queries,
+                serving stale responses while refreshing them in the background
+            result_format (str): "numpy" or "arrow" to return every response as
+                columns instead of lists of row dicts, see :mod:`gvol.columnar`
+            rate_limiter (RateLimiter): limiter every request waits on, e.g.
+                RateLimiter.for_plan("pro")
+            retry (RetryPolicy): how failed requests are retried, defaults to
+                RetryPolicy(), pass RetryPolicy(attempts=1) to disable retries
+            coalesce (bool): share one request, and its result, between
+                identical calls made while it is in flight
+            subscription_url (str): graphql-ws websocket endpoint used by
+                :meth:`subscribe`, which polls when it is not set
+            hooks (list): callables receiving the :class:`gvol.metrics.Call`
+                record of every request sent, e.g. a :class:`gvol.metrics.Metrics`
+            store (Store): local database the rows of every response are
+                added to, see :mod:`gvol.store`
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncGVol requires aiohttp, install it with `pip install gvol[aiohttp]`"
+            )
+
+        super().__init__(
+            header,
+            gvol_api_key,
+            fetch_schema=fetch_schema,
+            max_connections=max_connections,
+            cache=cache,
+            interval_cache=interval_cache,
+            live_cache=live_cache,
+            result_format=result_format,
+            rate_limiter=rate_limiter,
+            retry=retry,
+            coalesce=coalesce,
+            subscription_url=subscription_url,
+            hooks=hooks,
+            store=store,
+        )
+
+    def _init_transport(self, fetch_schema: bool) -> None:
+        self._aio_transport = AIOHTTPTransport(
+            url=self._url, headers=self._api_headers, ssl=True
+        )
+        self._client = self._create_client(
+            self._aio_transport, fetch_schema, execute_timeout=None
+        )
+        self._aio_session: Optional[AsyncClientSession] = None
+        self._aio_connect_lock: Optional[asyncio.Lock] = None
+        self._aio_in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._aio_refreshes: Set["asyncio.Future[None]"] = set()
+
+    def __enter__(self) -> "GVol":
+        raise TypeError("Use 'async with AsyncGVol(...)' instead")
+
+    async def __aenter__(self) -> "AsyncGVol":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        """Opens the shared connection pool.
+
+        Called automatically by the first request, so this is only needed to
+        pay the connection cost up front.
+        """
+        if self._aio_connect_lock is None:
+            self._aio_connect_lock = asyncio.Lock()
+
+        async with self._aio_connect_lock:
+            if self._aio_session is None:
+                self._aio_transport.client_session_args = {
+                    "connector": aiohttp.TCPConnector(limit=self._max_connections),
+                    "trace_configs": [metrics.trace_config()],
+                }
+                self._aio_session = await self._client.connect_async()
+
+    async def close(self) -> None:  # type: ignore[override]
+        """Closes the shared connection pool."""
+        if self._aio_session is not None:
+            self._aio_session = None
+            await self._client.close_async()
+
+    async def _execute(
+        self,
+        query: str,
+        variable_values: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Any:
+        query = self._project(query, fields)
+        return self._format(query, await self._fetch(query, variable_values))
+
+    async def _fetch(  # type: ignore[override]
+        self, query: str, variable_values: Optional[Dict[str, Any]]
+    ) -> Any:
+        live_ttl = self._live_cache.ttl(query, variable_values) if self._live_cache else None
+        if self._live_cache is not None and live_ttl is not None:
+            live_key = request_key(registry.source(query), variable_values)
+            result, refresh = self._live_cache.lookup(live_key, live_ttl)
+            if result is None:
+                return self._live_cache.set(
+                    live_key, await self._request(query, variable_values)
+                )
+            if refresh:
+                task = asyncio.ensure_future(self._refresh(live_key, query, variable_values))
+                self._aio_refreshes.add(task)
+                task.add_done_callback(self._aio_refreshes.discard)
+            return result
+
+        if self._interval_cache is not None and registry.base(query) in INTERVAL_QUERIES:
+            plan = self._interval_cache.plan(query, variable_values or {})
+            return self._interval_cache.complete(
+                plan,
+                await asyncio.gather(
+                    *(self._request(query, request) for request in plan.requests)
+                ),
+            )
+
+        key, ttl = self._cache_entry(query, variable_values)
+        if key is not None and self._cache is not None:
+            result = self._cache.get(key)
+            if result is not None:
+                return result
+
+        result = await self._request(query, variable_values)
+
+        if key is not None and self._cache is not None:
+            self._cache.set(key, result, ttl)
+        return result
+
+    async def _refresh(  # type: ignore[override]
+        self, key: str, query: str, variable_values: Optional[Dict[str, Any]]
+    ) -> None:
+        assert self._live_cache is not None
+        try:
+            self._live_cache.set(key, await self._request(query, variable_values))
+        except Exception:
+            self._live_cache.release(key)
+
+    async def _request(
+        self, query: str, variable_values: Optional[Dict[str, Any]]
+    ) -> Any:
+        if not self._coalesce:
+            return await self._send_query(query, variable_values)
+
+        key = request_key(registry.source(query), variable_values)
+        in_flight = self._aio_in_flight.get(key)
+        if in_flight is None:
+            in_flight = self._aio_in_flight[key] = asyncio.ensure_future(
+                self._send_query(query, variable_values)
+            )
+            in_flight.add_done_callback(lambda _: self._aio_in_flight.pop(key))
+        # A caller being cancelled must not cancel the request for the others.
+        return await asyncio.shield(in_flight)
+
+    async def _send_query(  # type: ignore[override]
+        self, query: str, variable_values: Optional[Dict[str, Any]]
+    ) -> Any:
+        result = await self._send(query, registry.document(query), variable_values)
+        if self._store is not None and self._store.accepts(query):
+            # sqlite writes block, keep them off the event loop.
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self._store.insert, query, variable_values, result
+            )
+        return result
+
+    async def _send(  # type: ignore[override]
+        self,
+        query: str,
+        document: DocumentNode,
+        variable_values: Optional[Dict[str, Any]],
+    ) -> Any:
+        if self._aio_session is None:
+            await self.connect()
+        assert self._aio_session is not None
+
+        with metrics.measure(self._hooks, query, variable_values) as span:
+            attempt = 0
+            while True:
+                if self._rate_limiter is not None:
+                    with span.waiting():
+                        await self._rate_limiter.acquire_async(query)
+                try:
+                    with span.sending():
+                        result = await self._aio_session.execute(
+                            document, variable_values=variable_values
+                        )
+                    span.done(result)
+                    return result
+                except Exception as e:
+                    delay = self._backoff(query, attempt, e)
+                    if delay is None:
+                        raise
+                with span.waiting():
+                    await asyncio.sleep(delay)
+                attempt += 1
+
+    async def batch(  # type: ignore[override]
+        self, calls: Sequence[batch.Call]
+    ) -> List[Any]:
+        if not calls:
+            return []
+        document = batch.document(tuple(query for query, _ in calls))
+        result = await self._send("batch", document, batch.variables(calls))
+        return [
+            self._format(query, call_result)
+            for (query, _), call_result in zip(calls, batch.split(calls, result))
+        ]
+
+    async def stream(  # type: ignore[override]
+        self,
+        query: str,
+        batch_size: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+        **variable_values: Any,
+    ) -> AsyncIterator[Any]:
+        if self._aio_session is None:
+            await self.connect()
+        query = self._project(query, fields)
+        root = self._stream_root(query)
+
+        with metrics.measure(self._hooks, query, variable_values) as span:
+            async with await self._post_stream(query, variable_values, span) as response:
+                parser = streaming.RecordParser(root)
+                batch: List[Dict[str, Any]] = []
+                chunks = span.receiving_async(
+                    response.content.iter_chunked(streaming.CHUNK_SIZE)
+                )
+                async for chunk in chunks:
+                    with span.decoding():
+                        rows = parser.feed(chunk)
+                    span.rows += len(rows)
+                    for row in rows:
+                        if batch_size is None:
+                            yield row
+                            continue
+                        batch.append(row)
+                        if len(batch) == batch_size:
+                            yield self._format_batch(query, root, batch)
+                            batch = []
+                with span.decoding():
+                    rows = parser.close()
+                span.rows += len(rows)
+                for row in rows:
+                    if batch_size is None:
+                        yield row
+                    else:
+                        batch.append(row)
+                for rest in streaming.batches(batch, batch_size or 1):
+                    yield self._format_batch(query, root, rest)
+
+    async def _post_stream(  # type: ignore[override]
+        self, query: str, variable_values: Dict[str, Any], span: metrics.Span
+    ) -> "aiohttp.ClientResponse":
+        assert self._aio_transport.session is not None
+
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                with span.waiting():
+                    await self._rate_limiter.acquire_async(query)
+            try:
+                with span.sending():
+                    response = await self._aio_transport.session.post(
+                        self._url,
+                        json={"query": registry.source(query), "variables": variable_values},
+                        headers=self._api_headers,
+                    )
+                try:
+                    response.raise_for_status()
+                except aiohttp.ClientResponseError as e:
+                    response.release()
+                    raise TransportServerError(str(e), e.status) from e
+                return response
+            except (aiohttp.ClientError, asyncio.TimeoutError, TransportServerError) as e:
+                delay = self._backoff(query, attempt, e)
+                if delay is None:
+                    raise
+            with span.waiting():
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _poll(self, query: str, variable_values: Dict[str, Any]) -> Any:
+        return await self._fetch(query, variable_values)
+
+    def options_orderbook_details_changes(  # type: ignore[override]
+        self, exchange: types.ExchangeEnumType, interval: float = 1.0
+    ) -> AsyncIterator[diff.SnapshotDiff]:
+        async def fetch() -> List[Dict[str, Any]]:
+            result = await self._fetch("options_orderbook_details", {"exchange": exchange})
+            return result["UtilityRealtimeOptionbook"]
+
+        return diff.poll_async(fetch, interval)
+
+    async def options_greeks_minute_range(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        symbol: types.BTCOrETHEnumType,
+        max_concurrency: int = 8,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def pull(dateTime: str) -> Dict:
+            async with semaphore:
+                return await self.options_greeks_minute(
+                    exchange=exchange, dateTime=dateTime, symbol=symbol, fields=fields
+                )
+
+        results = await asyncio.gather(*map(pull, ranges.hours(dateStart, dateEnd)))
+        if self._result_format is not None:
+            return columnar.concat(results)
+        return ranges.merge(results)
+
+    def options_trades_range(  # type: ignore[override]
+        self,
+        dateStart: types.String,
+        dateEnd: types.String,
+        exchange: types.ExchangeEnumType,
+        max_concurrency: int = 8,
+        checkpoint: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        return ranges.backfill_async(
+            lambda date: self.options_trades(
+                date=date, exchange=exchange, fields=fields
+            ),
+            ranges.days(dateStart, dateEnd),
+            max_concurrency,
+            checkpoint,
+        )
+
+    def options_greeks_hour_range(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        symbol: types.BTCOrETHEnumType,
+        interval: types.String,
+        max_concurrency: int = 8,
+        checkpoint: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        return ranges.backfill_async(
+            lambda date: self.options_greeks_hour(
+                exchange=exchange,
+                date=date,
+                symbol=symbol,
+                interval=interval,
+                fields=fields,
+            ),
+            ranges.days(dateStart, dateEnd),
+            max_concurrency,
+            checkpoint,
+        )
+
+    # Coroutine counterparts of the GVol endpoint methods, with the same
+    # arguments; their docstrings are copied from GVol below.
+
+    async def options_orderbook(  # type: ignore[override]
+        self,
+        symbol: types.SymbolEnumType,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_orderbook",
+            variable_values={"symbol": symbol, "exchange": exchange},
+            fields=fields,
+        )
+
+    async def options_termstructure(  # type: ignore[override]
+        self,
+        symbol: types.SymbolEnumType,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_termstructure",
+            variable_values={"symbol": symbol, "exchange": exchange},
+            fields=fields,
+        )
+
+    async def options_termstructure_hist(  # type: ignore[override]
+        self,
+        dateTime: types.String,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_termstructure_hist",
+            variable_values={
+                "dateTime": dateTime,
+                "symbol": symbol,
+                "exchange": exchange,
+            },
+            fields=fields,
+        )
+
+    async def options_termstructure_comparison(  # type: ignore[override]
+        self,
+        dateTimeOne: types.String,
+        dateTimeTwo: types.String,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_termstructure_comparison",
+            variable_values={
+                "dateTimeOne": dateTimeOne,
+                "dateTimeTwo": dateTimeTwo,
+                "symbol": symbol,
+                "exchange": exchange,
+            },
+            fields=fields,
+        )
+
+    async def options_dvol_index(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        symbol: types.BTCOrETHEnumType,
+        interval: types.String,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_dvol_index",
+            variable_values={
+                "exchange": exchange,
+                "symbol": symbol,
+                "interval": interval,
+                "dateStart": dateStart,
+                "dateEnd": dateEnd,
+            },
+            fields=fields,
+        )
+
+    async def options_trades(  # type: ignore[override]
+        self,
+        date: types.String,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_trades",
+            variable_values={"date": date, "exchange": exchange},
+            fields=fields,
+        )
+
+    async def options_trades_orderbook_details(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_trades_orderbook_details",
+            variable_values={"exchange": exchange, "symbol": symbol, "dateStart": dateStart, "dateEnd": dateEnd},
+            fields=fields,
+        )
+
+    async def options_volatility_surface(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        date: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_volatility_surface",
+            variable_values={"symbol": symbol, "date": date},
+            fields=fields,
+        )
+
+    async def spot_prices(  # type: ignore[override]
+        self,
+        symbol: types.String,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "spot_prices",
+            variable_values={
+                "symbol": symbol,
+                "dateStart": dateStart,
+                "dateEnd": dateEnd,
+            },
+            fields=fields,
+        )
+
+    async def options_skew_constant(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        interval: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_skew_constant",
+            variable_values={
+                "symbol": symbol,
+                "dateStart": dateStart,
+                "dateEnd": dateEnd,
+                "interval": interval,
+            },
+            fields=fields,
+        )
+
+    async def options_atm_constant(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        interval: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_atm_constant",
+            variable_values={
+                "symbol": symbol,
+                "dateStart": dateStart,
+                "dateEnd": dateEnd,
+                "interval": interval,
+            },
+            fields=fields,
+        )
+
+    async def futures_basis_hist(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        symbol: types.BTCOrETHEnumType,
+        expiration: types.String,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "futures_basis_hist",
+            variable_values={
+                "exchange": exchange,
+                "symbol": symbol,
+                "expiration": expiration,
+                "dateStart": dateStart,
+                "dateEnd": dateEnd,
+            },
+            fields=fields,
+        )
+
+    async def options_orderbook_details(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_orderbook_details",
+            variable_values={
+                "exchange": exchange,
+            },
+            fields=fields,
+        )
+
+    async def portfolio_analyzer(  # type: ignore[override]
+        self,
+        portfolio: types.String,
+        deltaFutures: types.Float = 0,
+        ivShift: types.Float = 0,
+        symbol: types.BTCOrETHEnumType = 'BTC',
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "portfolio_analyzer",
+            variable_values={
+                "portfolio": portfolio,
+                "deltaFutures": deltaFutures,
+                "ivShift": ivShift,
+                "symbol": symbol
+            },
+            fields=fields,
+        )
+
+    async def options_greeks_minute(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        dateTime: types.String,
+        symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_greeks_minute",
+            variable_values={
+                "exchange": exchange,
+                "dateTime": dateTime,
+                "symbol": symbol
+            },
+            fields=fields,
+        )
+
+    async def options_greeks_hour(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        date: types.String,
+        symbol: types.BTCOrETHEnumType,
+        interval: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_greeks_hour",
+            variable_values={
+                "exchange": exchange,
+                "date": date,
+                "symbol": symbol,
+                "interval": interval
+            },
+            fields=fields,
+        )
+
+    async def options_atm_constant_lite(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_atm_constant_lite",
+            variable_values={
+                "exchange": exchange,
+                "symbol": symbol,
+            },
+            fields=fields,
+        )
+
+    async def options_skew_constant_lite(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_skew_constant_lite",
+            variable_values={
+                "exchange": exchange,
+                "symbol": symbol,
+            },
+            fields=fields,
+        )
+
+    async def futures_orderbook(  # type: ignore[override]
+        self,
+        exchange: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "futures_orderbook",
+            variable_values={
+                "exchange": exchange,
+            },
+            fields=fields,
+        )
+
+    async def futures_perps_table(  # type: ignore[override]
+        self,
+        exchange: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "futures_perps_table",
+            variable_values={
+                "exchange": exchange,
+            },
+            fields=fields,
+        )
+
+    async def futures_futs_table(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "futures_futs_table",
+            variable_values={
+                "exchange": exchange,
+            },
+            fields=fields,
+        )
+
+    async def defi_zeta_orderbook(  # type: ignore[override]
+        self,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "defi_zeta_orderbook",
+            fields=fields,
+        )
+
+    async def defi_ribbon_trades(  # type: ignore[override]
+        self,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "defi_ribbon_trades",
+            fields=fields,
+        )
+
+    async def defi_dovs_table(  # type: ignore[override]
+        self,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "defi_dovs_table",
+            variable_values={},
+            fields=fields,
+        )
+
+    async def HourlyInstrumentImpliedVolandOI(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        strike: types.String,
+        putCall: types.PutCallEnumType,
+        expiration: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "HourlyInstrumentImpliedVolandOI",
+            variable_values={
+                "symbol": symbol,
+                "dateStart": dateStart,
+                "dateEnd": dateEnd,
+                "strike": strike,
+                "putCall": putCall,
+                "expiration": expiration,
+            },
+            fields=fields,
+        )
+
+    async def CustomMaturityDeltaSurface(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        date: types.String,
+        days: types.Float,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "CustomMaturityDeltaSurface",
+            variable_values={"symbol": symbol, "date": date, "days": days},
+            fields=fields,
+        )
+
+    async def options_gvol_direction(  # type: ignore[override]
+        self,
+        dateStart: types.String,
+        dateEnd: types.String,
+        symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_gvol_direction",
+            variable_values={"dateStart": dateStart, "dateEnd": dateEnd, "symbol": symbol},
+            fields=fields,
+        )
+
+    async def options_gvol_gex(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        date: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_gvol_gex",
+            variable_values={"symbol": symbol, "date": date},
+            fields=fields,
+        )
+
+    async def futures_constant_basis(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "futures_constant_basis",
+            variable_values={"symbol": symbol, "dateStart": dateStart, "dateEnd": dateEnd, "exchange": exchange},
+            fields=fields,
+        )
+
+    async def options_atm_skew_spot(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_atm_skew_spot",
+            variable_values={"symbol": symbol, "dateStart": dateStart, "dateEnd": dateEnd},
+            fields=fields,
+        )
+
+    async def options_deribit_volume_detailed_daily(  # type: ignore[override]
+        self,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_deribit_volume_detailed_daily",
+            variable_values={"exchange": exchange, "dateStart": dateStart, "dateEnd": dateEnd},
+            fields=fields,
+        )
+
+    async def options_cumulative_net_volumes(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        days: types.Float,
+        showActiveExpirations: types.Boolean,
+        tradeType: types.TradeTypeEnum,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_cumulative_net_volumes",
+            variable_values={"symbol": symbol, "exchange": exchange, "days": days, "showActiveExpirations": showActiveExpirations, "tradeType": tradeType},
+            fields=fields,
+        )
+
+    async def options_cumulative_net_volumes_hist(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        showActiveExpirations: types.Boolean,
+        tradeType: types.TradeTypeEnum,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_cumulative_net_volumes_hist",
+            variable_values={"symbol": symbol, "exchange": exchange, "dateStart": dateStart, "dateEnd": dateEnd, "showActiveExpirations": showActiveExpirations, "tradeType": tradeType},
+            fields=fields,
+        )
+
+    async def options_cumulative_net_positioning(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_cumulative_net_positioning",
+            variable_values={"symbol": symbol, "exchange": exchange, "dateStart": dateStart},
+            fields=fields,
+        )
+
+    async def options_cumulative_net_positioning_hist(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_cumulative_net_positioning_hist",
+            variable_values={"symbol": symbol, "exchange": exchange, "dateStart": dateStart, "dateEnd": dateEnd},
+            fields=fields,
+        )
+
+    async def options_iv_rv_comparison(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_iv_rv_comparison",
+            variable_values={"symbol": symbol, "exchange": exchange, "dateStart": dateStart, "dateEnd": dateEnd},
+            fields=fields,
+        )
+
+    async def options_butterfly_constant_maturities(  # type: ignore[override]
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_butterfly_constant_maturities",
+            variable_values={"symbol": symbol, "exchange": exchange, "dateStart": dateStart, "dateEnd": dateEnd},
+            fields=fields,
+        )
+
+    async def options_term_structure_richness(  # type: ignore[override]
+        self,
+        symbol: types.SymbolEnumType,
+        exchange: types.ExchangeEnumType,
+        dateStart: str,
+        dateEnd: str,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        return await self._execute(
+            "options_term_structure_richness",
+            variable_values={
+                "symbol": symbol,
+                "exchange": exchange,
+                "dateStart": dateStart,
+                "dateEnd": dateEnd
+            },
+            fields=fields,
+        )
+
+
+for _name, _method in list(vars(AsyncGVol).items()):
+    if inspect.iscoroutinefunction(_method) and _method.__doc__ is None and hasattr(GVol, _name):
+        _method.__doc__ = getattr(GVol, _name).__doc__
+del _name, _method
@@ -0,0 +1,174 @@
+"""Merging several registered queries into one GraphQL operation.
+
+Call ``n`` of a batch has its root fields aliased ``b<n>_<field>`` and its
+variables renamed ``$b<n>_<variable>``, so calls of the same query with
+different arguments do not clash::
+
+    query Batch($b0_symbol: BTCOrETHEnumType, $b1_symbol: BTCOrETHEnumType) {
+      b0_ConstantMaturityAtmLite: ConstantMaturityAtmLite(symbol: $b0_symbol) {...}
+      b1_ConstantMaturityAtmLite: ConstantMaturityAtmLite(symbol: $b1_symbol) {...}
+    }
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from gql import gql
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    GraphQLError,
+    NameNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    VariableNode,
+    Visitor,
+    parse,
+    print_ast,
+    visit,
+)
+
+from gvol.registry import registry
+
+Call = Tuple[str, Optional[Dict[str, Any]]]
+
+
+class _RenameVariables(Visitor):
+    def __init__(self, prefix: str, strip: bool = False) -> None:
+        super().__init__()
+        self.prefix = prefix
+        self.strip = strip
+
+    def enter_variable(self, node: VariableNode, *args: Any) -> VariableNode:
+        name = node.name.value
+        name = name[len(self.prefix) :] if self.strip else self.prefix + name
+        return VariableNode(name=NameNode(value=name))
+
+
+def _aliased(field: FieldNode, alias: str) -> FieldNode:
+    return FieldNode(
+        alias=NameNode(value=alias),
+        name=field.name,
+        arguments=field.arguments,
+        directives=field.directives,
+        selection_set=field.selection_set,
+    )
+
+
+def _key(fields: Sequence[FieldNode]) -> str:
+    return print_ast(SelectionSetNode(selections=fields))
+
+
+# Registered queries by the key of their aliased root fields, see calls().
+_queries: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=256)
+def document(queries: Tuple[str, ...]) -> DocumentNode:
+    """Returns the merged document for a sequence of query names."""
+    definitions: List[Any] = []
+    selections: List[Any] = []
+
+    for n, query in enumerate(queries):
+        prefix = f"b{n}_"
+        operation = visit(
+            registry.document(query).definitions[0], _RenameVariables(prefix)
+        )
+        assert isinstance(operation, OperationDefinitionNode)
+        definitions.extend(operation.variable_definitions)
+        for field in operation.selection_set.selections:
+            assert isinstance(field, FieldNode)
+            selections.append(_aliased(field, prefix + (field.alias or field.name).value))
+
+    merged = DocumentNode(
+        definitions=[
+            OperationDefinitionNode(
+                operation=OperationType.QUERY,
+                name=NameNode(value="Batch"),
+                variable_definitions=definitions,
+                directives=[],
+                selection_set=SelectionSetNode(selections=selections),
+            )
+        ]
+    )
+    # Parse the printed document so it has a source, which keys the registry's
+    # validation cache.
+    return gql(print_ast(merged))
+
+
+def variables(calls: Sequence[Call]) -> Dict[str, Any]:
+    """Returns the variable values of a merged document."""
+    return {
+        f"b{n}_{name}": value
+        for n, (_, values) in enumerate(calls)
+        for name, value in (values or {}).items()
+    }
+
+
+def split(calls: Sequence[Call], result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Splits the response to a merged document into the response of every call."""
+    results: List[Dict[str, Any]] = [{} for _ in calls]
+    for key, value in result.items():
+        n, _, alias = key.partition("_")
+        results[int(n[1:])][alias] = value
+    return results
+
+
+def calls(source: str, variable_values: Dict[str, Any]) -> Optional[List[Call]]:
+    """Returns the calls a merged document was made for, with their variables.
+
+    The inverse of :func:`document` and :func:`variables`, for servers answering
+    batches. None when the source is not a merged document of registered queries.
+    """
+    try:
+        operation = parse(source).definitions[0]
+    except GraphQLError:
+        return None
+    if (
+        not isinstance(operation, OperationDefinitionNode)
+        or operation.name is None
+        or operation.name.value != "Batch"
+    ):
+        return None
+
+    fields: Dict[int, List[FieldNode]] = {}
+    for field in operation.selection_set.selections:
+        if not isinstance(field, FieldNode) or field.alias is None:
+            return None
+        prefix, _, alias = field.alias.value.partition("_")
+        if prefix[:1] != "b" or not prefix[1:].isdigit():
+            return None
+        stripped = visit(field, _RenameVariables(f"{prefix}_", strip=True))
+        fields.setdefault(int(prefix[1:]), []).append(_aliased(stripped, alias))
+
+    result: List[Call] = []
+    for n in sorted(fields):
+        key = _key(fields[n])
+        if key not in _queries:
+            for query in registry:
+                root = registry.document(query).definitions[0]
+                assert isinstance(root, OperationDefinitionNode)
+                _queries.setdefault(
+                    _key(
+                        [
+                            _aliased(field, (field.alias or field.name).value)
+                            for field in root.selection_set.selections
+                            if isinstance(field, FieldNode)
+                        ]
+                    ),
+                    query,
+                )
+        if key not in _queries:
+            return None
+        prefix = f"b{n}_"
+        result.append(
+            (
+                _queries[key],
+                {
+                    name[len(prefix) :]: value
+                    for name, value in variable_values.items()
+                    if name.startswith(prefix)
+                },
+            )
+        )
+    return result
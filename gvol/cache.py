@@ -0,0 +1,473 @@
+"""Response caches."""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from gvol import ranges, schema
+from gvol.registry import registry
+
+# Queries returning fixed history, with the variables bounding their window.
+HISTORICAL_QUERIES: Dict[str, Tuple[str, ...]] = {
+    "options_termstructure_hist": ("dateTime",),
+    "options_termstructure_comparison": ("dateTimeOne", "dateTimeTwo"),
+    "options_dvol_index": ("dateEnd",),
+    "options_trades": ("date",),
+    "options_trades_orderbook_details": ("dateEnd",),
+    "options_volatility_surface": ("date",),
+    "spot_prices": ("dateEnd",),
+    "options_skew_constant": ("dateEnd",),
+    "options_atm_constant": ("dateEnd",),
+    "futures_basis_hist": ("dateEnd",),
+    "options_greeks_minute": ("dateTime",),
+    "options_greeks_hour": ("date",),
+    "HourlyInstrumentImpliedVolandOI": ("dateEnd",),
+    "CustomMaturityDeltaSurface": ("date",),
+    "options_gvol_direction": ("dateEnd",),
+    "options_gvol_gex": ("date",),
+    "futures_constant_basis": ("dateEnd",),
+    "options_atm_skew_spot": ("dateEnd",),
+    "options_deribit_volume_detailed_daily": ("dateEnd",),
+    "options_cumulative_net_volumes_hist": ("dateEnd",),
+    "options_cumulative_net_positioning_hist": ("dateEnd",),
+    "options_iv_rv_comparison": ("dateEnd",),
+    "options_butterfly_constant_maturities": ("dateEnd",),
+    "options_term_structure_richness": ("dateEnd",),
+}
+
+# Queries over a dateStart/dateEnd window, with the field holding row timestamps.
+INTERVAL_QUERIES: Dict[str, str] = {
+    "options_skew_constant": "date",
+    "options_atm_constant": "date",
+    "options_dvol_index": "timerange",
+    "futures_constant_basis": "ts",
+    "options_iv_rv_comparison": "date",
+}
+
+# Real-time queries, with the refresh interval of their data in seconds.
+LIVE_QUERIES: Dict[str, float] = {
+    "options_orderbook": 0.1,
+    "futures_orderbook": 0.1,
+    "futures_perps_table": 0.1,
+    "futures_futs_table": 0.1,
+    "defi_zeta_orderbook": 60.0,
+}
+
+# Exchanges refreshing slower than LIVE_QUERIES says, per query.
+LIVE_EXCHANGE_TTLS: Dict[Tuple[str, str], float] = {
+    ("futures_orderbook", "dydx"): 60.0,
+}
+
+_DAY_MS = 86400000
+
+
+def window_end(values: Iterable[Any]) -> Optional[datetime]:
+    """Returns the latest UTC time a query window can cover.
+
+    A day ("2022-04-12") covers the whole day and a date time covers the hour
+    after it. None when a value cannot be parsed.
+    """
+    end = None
+    for value in values:
+        try:
+            start = ranges.parse_datetime(value)
+        except (AttributeError, ValueError):
+            return None
+        covered = timedelta(days=1) if len(value.strip()) <= 10 else timedelta(hours=1)
+        end = max(end, start + covered) if end else start + covered
+    return end
+
+
+def request_key(source: str, variable_values: Optional[Dict[str, Any]]) -> str:
+    """Returns the content address of a query document and its variables."""
+    variables = json.dumps(variable_values or {}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{source}\0{variables}".encode()).hexdigest()
+
+
+class DiskCache:
+    """Compressed, content-addressed cache of API responses on disk.
+
+    Responses of historical queries never change, so they are kept until the
+    cache grows past ``max_bytes``; the least recently read entries are then
+    evicted. Queries whose window reaches into the last ``settle`` interval
+    may still change and are kept for ``recent_ttl`` seconds only (not at all
+    when ``recent_ttl`` is 0). The cache can be shared by processes.
+
+    Args:
+        path: cache directory, defaults to ``responses`` under the gvol cache directory
+        max_bytes: size limit of the cache directory
+        recent_ttl: seconds to keep responses of windows touching the present
+        settle: how long after the fact data is considered final
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = 2 ** 30,
+        recent_ttl: float = 60,
+        settle: timedelta = timedelta(hours=1),
+    ) -> None:
+        self.path = Path(path) if path else schema.cache_dir() / "responses"
+        self.max_bytes = max_bytes
+        self.recent_ttl = recent_ttl
+        self.settle = settle
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def ttl(self, query: str, variable_values: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Returns how long a response may be cached: None for ever, 0 not at all."""
+        query = registry.base(query)
+        if query not in HISTORICAL_QUERIES:
+            return 0
+
+        variable_values = variable_values or {}
+        end = window_end(
+            variable_values[name]
+            for name in HISTORICAL_QUERIES[query]
+            if variable_values.get(name) is not None
+        )
+        if end is None or end + self.settle > datetime.utcnow():
+            return self.recent_ttl
+        return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for a key, or None."""
+        file = self._file(key)
+        try:
+            with open(file, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            return None
+
+        if entry["expires"] is not None and entry["expires"] < time.time():
+            return None
+
+        try:
+            os.utime(file)
+        except OSError:
+            pass
+        return entry["value"]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Stores a value for ttl seconds (for ever when None)."""
+        entry = {"expires": None if ttl is None else time.time() + ttl, "value": value}
+        data = zlib.compress(json.dumps(entry, separators=(",", ":")).encode())
+
+        file = self._file(key)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_name(f"{file.name}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, file)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        """Removes every cached response."""
+        with self._lock:
+            for file in self.path.glob("*/*"):
+                file.unlink()
+            self._size = 0
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / key
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for file in self.path.glob("*/*"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+        return entries
+
+    def _disk_usage(self) -> int:
+        return sum(file_size for _, file_size, _ in self._entries())
+
+    def _evict(self) -> None:
+        files = sorted(self._entries())
+
+        size = sum(file_size for _, file_size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, file_size, file in files:
+            if size <= target:
+                break
+            try:
+                file.unlink()
+            except OSError:
+                continue
+            size -= file_size
+        self._size = size
+
+
+Interval = Tuple[int, int]
+
+
+def _to_ms(value: str) -> int:
+    return int(ranges.parse_datetime(value).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _from_ms(ms: int) -> str:
+    fmt = ranges.DATE_FORMAT if ms % _DAY_MS == 0 else ranges.DATETIME_FORMAT
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime(fmt)
+
+
+def _gaps(start: int, end: int, covered: List[Interval]) -> List[Interval]:
+    """Returns the parts of [start, end) outside the sorted, disjoint ``covered``."""
+    gaps = []
+    for covered_start, covered_end in covered:
+        if covered_end <= start:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > start:
+            gaps.append((start, covered_start))
+        start = max(start, covered_end)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+
+def _union(covered: List[Interval], interval: Interval) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(covered + [interval]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class IntervalPlan(NamedTuple):
+    """Requests needed to answer a query from an :class:`IntervalCache`."""
+
+    query: str
+    series: str
+    start: int
+    end: int
+    gaps: List[Interval]
+    requests: List[Dict[str, Any]]
+
+
+class IntervalCache:
+    """Cache of time series queries that only fetches the missing parts of a window.
+
+    A series is a query with fixed variables other than dateStart/dateEnd
+    (symbol, exchange, interval, ...). The cache records which time ranges it
+    holds for every series and requests only the gaps of a window, e.g. the
+    newest day of a rolling 90-day lookback. Rows at or after dateEnd are
+    always requested along with the last gap, so the boundary matches the API
+    exactly, and ranges younger than ``settle`` are never marked as held.
+
+    Run a query with :meth:`plan`, one request per entry of ``plan.requests``,
+    then :meth:`complete`.
+
+    Args:
+        path: cache directory, defaults to ``intervals`` under the gvol cache directory
+        settle: how long after the fact data is considered final
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, settle: timedelta = timedelta(hours=1)
+    ) -> None:
+        self.path = Path(path) if path else schema.cache_dir() / "intervals"
+        self.settle = settle
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict[str, Any]] = {}
+
+    def plan(self, query: str, variable_values: Dict[str, Any]) -> IntervalPlan:
+        """Returns the requests needed to answer a query."""
+        fixed = {
+            name: value
+            for name, value in variable_values.items()
+            if name not in ("dateStart", "dateEnd")
+        }
+        series = request_key(registry.source(query), fixed)
+        start, end = _to_ms(variable_values["dateStart"]), _to_ms(variable_values["dateEnd"])
+
+        with self._lock:
+            gaps = _gaps(start, end, self._load(series)["covered"])
+        if not gaps or gaps[-1][1] != end:
+            gaps.append((end, end))
+
+        requests = [
+            dict(variable_values, dateStart=_from_ms(gap_start), dateEnd=_from_ms(gap_end))
+            for gap_start, gap_end in gaps
+        ]
+        return IntervalPlan(query, series, start, end, gaps, requests)
+
+    def complete(self, plan: IntervalPlan, responses: List[Dict]) -> Dict:
+        """Stores the responses to a plan's requests and returns the query result."""
+        time_field = INTERVAL_QUERIES[registry.base(plan.query)]
+        settled = datetime.now(timezone.utc) - self.settle
+        settled_ms = int(settled.timestamp() * 1000) // _DAY_MS * _DAY_MS
+
+        def in_gap(ts: int) -> bool:
+            return any(start <= ts < end for start, end in plan.gaps)
+
+        with self._lock:
+            entry = self._load(plan.series)
+            result: Dict[str, List] = {
+                field: [
+                    row
+                    for row in rows
+                    if plan.start <= int(row[time_field]) < plan.end
+                    and not in_gap(int(row[time_field]))
+                ]
+                for field, rows in entry["rows"].items()
+            }
+
+            for (gap_start, gap_end), response in zip(plan.gaps, responses):
+                missing = _gaps(gap_start, min(gap_end, settled_ms), entry["covered"])
+                for field, rows in response.items():
+                    result_rows = result.setdefault(field, [])
+                    for row in rows or []:
+                        ts = int(row[time_field])
+                        if gap_start <= ts < gap_end or (gap_end == plan.end and ts >= gap_end):
+                            result_rows.append(row)
+                        if any(start <= ts < end for start, end in missing):
+                            entry["rows"].setdefault(field, []).append(row)
+                for interval in missing:
+                    entry["covered"] = _union(entry["covered"], interval)
+
+            for rows in entry["rows"].values():
+                rows.sort(key=lambda row: int(row[time_field]))
+            self._save(plan.series, entry)
+
+        for rows in result.values():
+            rows.sort(key=lambda row: int(row[time_field]))
+        return result
+
+    def clear(self) -> None:
+        """Removes every cached series."""
+        with self._lock:
+            for file in self.path.glob("*"):
+                file.unlink()
+            self._series.clear()
+
+    def _load(self, series: str) -> Dict[str, Any]:
+        if series not in self._series:
+            try:
+                with open(self.path / series, "rb") as f:
+                    entry = json.loads(zlib.decompress(f.read()))
+                entry["covered"] = [tuple(interval) for interval in entry["covered"]]
+            except (OSError, ValueError, zlib.error):
+                entry = {"covered": [], "rows": {}}
+            self._series[series] = entry
+        return self._series[series]
+
+    def _save(self, series: str, entry: Dict[str, Any]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        file = self.path / series
+        tmp_file = file.with_name(f"{series}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_file, "wb") as f:
+            f.write(zlib.compress(json.dumps(entry, separators=(",", ":")).encode()))
+        os.replace(tmp_file, file)
+
+
+class LiveResult(dict):
+    """Response served by a :class:`LiveCache`, converted to the client's
+    ``result_format`` if it has one.
+
+    Attributes:
+        stale: whether the response is older than the refresh interval of its
+            endpoint, i.e. served while a newer one is being fetched
+        age: seconds since the response was received
+    """
+
+    def __init__(self, value: Any = (), stale: bool = False, age: float = 0.0) -> None:
+        super().__init__(value)
+        self.stale = stale
+        self.age = age
+
+
+class LiveCache:
+    """In-memory cache of real-time queries, kept as fresh as their data.
+
+    A response is served from memory for the refresh interval of its endpoint
+    (``LIVE_QUERIES``, e.g. 100 ms for futures orderbooks). After that it is
+    still served right away, marked as stale, while one background request
+    fetches a newer one (stale-while-revalidate). Responses older than
+    ``max_stale`` beyond their interval are fetched before returning.
+
+    Args:
+        ttls: refresh interval in seconds per query, overriding ``LIVE_QUERIES``
+        max_stale: how long past its interval a response may still be served
+        max_entries: number of responses kept, least recently stored ones are dropped
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_stale: float = 5.0,
+        max_entries: int = 1024,
+    ) -> None:
+        self.ttls = dict(LIVE_QUERIES, **(ttls or {}))
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def ttl(self, query: str, variable_values: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Returns the refresh interval of a query, or None if it is not cached."""
+        query = registry.base(query)
+        ttl = self.ttls.get(query)
+        if ttl is None:
+            return None
+        exchange = str((variable_values or {}).get("exchange"))
+        return LIVE_EXCHANGE_TTLS.get((query, exchange), ttl)
+
+    def lookup(self, key: str, ttl: float) -> Tuple[Optional[LiveResult], bool]:
+        """Returns the response to serve, if any, and whether to refresh it.
+
+        Only one caller at a time is told to refresh a response; it has to
+        call :meth:`set` or :meth:`release` once done.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+
+            value, received = entry
+            age = time.monotonic() - received
+            if age >= ttl + self.max_stale:
+                return None, False
+
+            stale = age >= ttl
+            refresh = stale and key not in self._refreshing
+            if refresh:
+                self._refreshing.add(key)
+            return LiveResult(value, stale, age), refresh
+
+    def set(self, key: str, value: Any) -> LiveResult:
+        """Stores a response received just now and returns it."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._refreshing.discard(key)
+        return LiveResult(value)
+
+    def release(self, key: str) -> None:
+        """Gives up refreshing a response, e.g. after the request failed."""
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,37 +1,577 @@
-from typing import Dict
-
-from gql import Client, gql
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import requests
+from gql import Client
+from gql.client import SyncClientSession
+from gql.transport.exceptions import TransportServerError
 from gql.transport.requests import RequestsHTTPTransport
-
-from gvol import queries, types
+from graphql import DocumentNode
+from requests.adapters import HTTPAdapter
+
+from gvol import (
+    batch,
+    columnar,
+    diff,
+    metrics,
+    ranges,
+    schema,
+    streaming,
+    subscription,
+    types,
+)
+from gvol.cache import (
+    INTERVAL_QUERIES,
+    DiskCache,
+    IntervalCache,
+    LiveCache,
+    LiveResult,
+    request_key,
+)
+from gvol.ratelimit import RateLimiter
+from gvol.registry import registry
+from gvol.retry import RetryPolicy, response_headers
+from gvol.store import Store
+
+
+class _Client(Client):
+    """gql client validating documents through the registry's cache."""
+
+    def validate(self, document: DocumentNode) -> None:
+        assert self.schema is not None
+        registry.validate(document, self.schema)
 
 
 class GVol:
     """GVol API client.
 
+    Every endpoint method takes an optional ``fields`` argument, the names of
+    the fields of the rows to return. Only those are requested and decoded,
+    which makes responses smaller in proportion::
+
+        gvol_client.options_trades_orderbook_details(
+            exchange="deribit", symbol="BTC",
+            dateStart="2022-05-01", dateEnd="2022-05-02",
+            fields=["date", "instrumentName", "price", "amount", "direction"],
+        )
+
     Contact info@genesisvolatility.io for API key information.
     """
 
     _url = "https://app.pinkswantrading.com/graphql"
 
-    def __init__(self, header: str, gvol_api_key: str) -> None:
+    def __init__(
+        self,
+        header: str,
+        gvol_api_key: str,
+        fetch_schema: bool = False,
+        max_connections: int = 10,
+        cache: Optional[DiskCache] = None,
+        interval_cache: Optional[IntervalCache] = None,
+        live_cache: Optional[LiveCache] = None,
+        result_format: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        subscription_url: Optional[str] = None,
+        hooks: Sequence[metrics.Hook] = (),
+        store: Optional[Store] = None,
+    ) -> None:
         """Initializes GVol API client.
 
+        Queries are validated against the local schema (see :mod:`gvol.schema`),
+        so no request is sent until the first endpoint call. The client keeps
+        its HTTP connections open between calls and can be shared by threads.
+
         Args:
             gvol_api_key (str): API key
+            fetch_schema (bool): introspect the schema from the API before the
+                first query instead of using the local one
+            max_connections (int): size of the connection pool
+            cache (DiskCache): on-disk cache for responses of historical queries
+            interval_cache (IntervalCache): cache fetching only the missing
+                parts of dateStart/dateEnd windows of time series queries
+            live_cache (LiveCache): in-memory cache of real-time queries,
+                serving stale responses while refreshing them in the background
+            result_format (str): "numpy" or "arrow" to return every response as
+                columns instead of lists of row dicts, see :mod:`gvol.columnar`
+            rate_limiter (RateLimiter): limiter every request waits on, e.g.
+                RateLimiter.for_plan("pro")
+            retry (RetryPolicy): how failed requests are retried, defaults to
+                RetryPolicy(), pass RetryPolicy(attempts=1) to disable retries
+            coalesce (bool): share one request, and its result, between
+                identical calls made while it is in flight
+            subscription_url (str): graphql-ws websocket endpoint used by
+                :meth:`subscribe`, which polls when it is not set
+            hooks (list): callables receiving the :class:`gvol.metrics.Call`
+                record of every request sent, e.g. a :class:`gvol.metrics.Metrics`
+            store (Store): local database the rows of every response are
+                added to, see :mod:`gvol.store`
+        """
+        columnar.check_format(result_format)
+        self._result_format = result_format
+        self._cache = cache
+        self._interval_cache = interval_cache
+        self._live_cache = live_cache
+        self._rate_limiter = rate_limiter
+        self._retry = retry if retry is not None else RetryPolicy()
+        self._coalesce = coalesce
+        self._subscription_url = subscription_url
+        self._hooks = list(hooks)
+        self._store = store
+        self._api_headers = self._headers(header, gvol_api_key)
+        self._max_connections = max_connections
+        self._init_transport(fetch_schema)
+
+    def _init_transport(self, fetch_schema: bool) -> None:
+        """Creates the transport, the gql client and the connection state.
+
+        The only part of the setup the async client does differently.
         """
-        headers = {
+        self._transport = RequestsHTTPTransport(
+            url=self._url, headers=self._api_headers
+        )
+        self._client = self._create_client(self._transport, fetch_schema)
+        self._session: Optional[SyncClientSession] = None
+        self._connect_lock = threading.Lock()
+        self._in_flight: Dict[str, "Future[Any]"] = {}
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def retries(self) -> Counter:
+        """Number of retried requests per query, see :class:`gvol.retry.RetryPolicy`."""
+        return self._retry.retries
+
+    def __enter__(self) -> "GVol":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _create_client(transport: Any, fetch_schema: bool, **kwargs: Any) -> Client:
+        if fetch_schema:
+            return _Client(
+                transport=transport, fetch_schema_from_transport=True, **kwargs
+            )
+        return _Client(schema=schema.load_schema(), transport=transport, **kwargs)
+
+    @staticmethod
+    def _headers(header: str, gvol_api_key: str) -> Dict[str, str]:
+        return {
             f"{header}": f"{gvol_api_key}",
             "Content-Type": "application/json",
             "accept": "*/*",
             "Accept-Language": "en-US,en;q=0.9",
         }
 
-        transport = RequestsHTTPTransport(url=self._url, headers=headers)
-        self._client = Client(transport=transport, fetch_schema_from_transport=True)
+    def refresh_schema(self) -> None:
+        """Introspects the API schema and saves it as the local schema.
+
+        Every client created afterwards on this machine validates against the
+        refreshed schema instead of the snapshot bundled with the package,
+        until another version of gvol is installed.
+        """
+        with Client(
+            transport=RequestsHTTPTransport(url=self._url, headers=self._api_headers),
+            fetch_schema_from_transport=True,
+        ) as session:
+            assert session.client.schema is not None
+            schema.save_schema(session.client.schema)
+            self._client.schema = session.client.schema
+
+    def close(self) -> None:
+        """Closes the pooled HTTP connections."""
+        with self._connect_lock:
+            if self._session is not None:
+                self._session = None
+                self._client.close_sync()
+
+    def _connect(self) -> SyncClientSession:
+        with self._connect_lock:
+            if self._session is None:
+                self._session = self._client.connect_sync()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self._max_connections
+                )
+                assert self._transport.session is not None
+                for prefix in "http://", "https://":
+                    self._transport.session.mount(prefix, adapter)
+                self._transport.session.hooks["response"].append(metrics.on_response)
+            return self._session
+
+    def _execute(
+        self,
+        query: str,
+        variable_values: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Any:
+        """Runs a registered query. Every endpoint method goes through here.
+
+        Args:
+            query: name of the query document in :mod:`gvol.queries`
+            variable_values: query variables
+            fields: fields of the rows to select instead of the document's
+        """
+        query = self._project(query, fields)
+        return self._format(query, self._fetch(query, variable_values))
+
+    def _project(self, query: str, fields: Optional[Sequence[str]]) -> str:
+        """Returns the name of the projection of a query on some fields, see
+        :meth:`gvol.registry.QueryRegistry.project`.
+
+        Projections of interval queries always select their time field.
+        """
+        if fields is None:
+            return query
+        time_field = INTERVAL_QUERIES.get(query)
+        if time_field is not None and time_field not in fields:
+            # The interval cache splits responses by row timestamp.
+            fields = [time_field, *fields]
+        return registry.project(query, fields, self._client.schema or schema.load_schema())
+
+    def _fetch(self, query: str, variable_values: Optional[Dict[str, Any]]) -> Any:
+        """Returns the raw response of a query, from the caches when possible."""
+        live_ttl = self._live_cache.ttl(query, variable_values) if self._live_cache else None
+        if self._live_cache is not None and live_ttl is not None:
+            live_key = request_key(registry.source(query), variable_values)
+            result, refresh = self._live_cache.lookup(live_key, live_ttl)
+            if result is None:
+                return self._live_cache.set(live_key, self._request(query, variable_values))
+            if refresh:
+                threading.Thread(
+                    target=self._refresh, args=(live_key, query, variable_values), daemon=True
+                ).start()
+            return result
+
+        if self._interval_cache is not None and registry.base(query) in INTERVAL_QUERIES:
+            plan = self._interval_cache.plan(query, variable_values or {})
+            return self._interval_cache.complete(
+                plan, [self._request(query, request) for request in plan.requests]
+            )
+
+        key, ttl = self._cache_entry(query, variable_values)
+        if key is not None and self._cache is not None:
+            result = self._cache.get(key)
+            if result is not None:
+                return result
+
+        result = self._request(query, variable_values)
+
+        if key is not None and self._cache is not None:
+            self._cache.set(key, result, ttl)
+        return result
+
+    def _refresh(
+        self, key: str, query: str, variable_values: Optional[Dict[str, Any]]
+    ) -> None:
+        """Fetches a newer response for the live cache."""
+        assert self._live_cache is not None
+        try:
+            self._live_cache.set(key, self._request(query, variable_values))
+        except Exception:
+            self._live_cache.release(key)
+
+    def _format(self, query: str, result: Any) -> Any:
+        """Converts a raw response to the client's result format."""
+        if self._result_format is None:
+            return result
+        assert self._client.schema is not None
+        converted = columnar.convert(query, self._client.schema, result, self._result_format)
+        if isinstance(result, LiveResult):
+            return LiveResult(converted, result.stale, result.age)
+        return converted
+
+    def _cache_entry(
+        self, query: str, variable_values: Optional[Dict[str, Any]]
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """Returns the disk cache key and TTL of a query, or no key if it is not cached."""
+        if self._cache is None:
+            return None, None
+
+        ttl = self._cache.ttl(query, variable_values)
+        if ttl == 0:
+            return None, None
+        return request_key(registry.source(query), variable_values), ttl
+
+    def _request(self, query: str, variable_values: Optional[Dict[str, Any]]) -> Any:
+        """Sends a registered query to the API.
+
+        Identical calls made while the request is in flight wait for it and
+        get the same result object, so it should not be modified in place.
+        """
+        if not self._coalesce:
+            return self._send_query(query, variable_values)
+
+        key = request_key(registry.source(query), variable_values)
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                future = self._in_flight[key] = Future()
+        if in_flight is not None:
+            return in_flight.result()
+
+        try:
+            result = self._send_query(query, variable_values)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+    def _send_query(self, query: str, variable_values: Optional[Dict[str, Any]]) -> Any:
+        """Sends a registered query and adds the rows of its response to the store."""
+        result = self._send(query, registry.document(query), variable_values)
+        if self._store is not None and self._store.accepts(query):
+            self._store.insert(query, variable_values, result)
+        return result
+
+    def _send(
+        self,
+        query: str,
+        document: DocumentNode,
+        variable_values: Optional[Dict[str, Any]],
+    ) -> Any:
+        """Sends a document, waiting on the rate limiter and retrying failures.
+
+        Args:
+            query: name the rate limiter costs and retry counts use
+        """
+        session = self._session or self._connect()
+        with metrics.measure(self._hooks, query, variable_values) as span:
+            attempt = 0
+            while True:
+                if self._rate_limiter is not None:
+                    with span.waiting():
+                        self._rate_limiter.acquire(query)
+                try:
+                    with span.sending():
+                        result = session.execute(document, variable_values=variable_values)
+                    span.done(result)
+                    return result
+                except Exception as e:
+                    delay = self._backoff(query, attempt, e)
+                    if delay is None:
+                        raise
+                with span.waiting():
+                    time.sleep(delay)
+                attempt += 1
+
+    def _backoff(self, query: str, attempt: int, error: Exception) -> Optional[float]:
+        """Returns how long to wait before retrying a failed request, None to give up.
+
+        The Retry-After header of the failed response, if any, is read from the error.
+        """
+        if not self._retry.should_retry(query, attempt, error):
+            return None
+
+        delay = self._retry.delay(attempt, response_headers(error))
+        if getattr(error, "code", None) == 429 and self._rate_limiter is not None:
+            # Hold back every request sharing the limiter, not only this one.
+            self._rate_limiter.pause(delay)
+        return delay
+
+    def batch(self, calls: Sequence[batch.Call]) -> List[Any]:
+        """Runs several endpoint calls in one HTTP request.
+
+        The documents of the calls are merged into one GraphQL operation, and
+        the response is split back into the result of every call, in order.
+        Caches are bypassed, the rate limiter counts the batch as one "batch"
+        request.
+
+        Example::
+
+            btc_atm, eth_atm, btc_skew = gvol_client.batch([
+                ("options_atm_constant_lite", {"symbol": "BTC"}),
+                ("options_atm_constant_lite", {"symbol": "ETH"}),
+                ("options_skew_constant_lite", {"symbol": "BTC"}),
+            ])
+
+        Args:
+            calls: (endpoint method name, arguments) pairs
+        """
+        if not calls:
+            return []
+        document = batch.document(tuple(query for query, _ in calls))
+        result = self._send("batch", document, batch.variables(calls))
+        return [
+            self._format(query, call_result)
+            for (query, _), call_result in zip(calls, batch.split(calls, result))
+        ]
+
+    def stream(
+        self,
+        query: str,
+        batch_size: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+        **variable_values: Any,
+    ) -> Iterator[Any]:
+        """Streams the rows of a query without holding the whole response in memory.
+
+        The response body is parsed as it arrives and rows are yielded one by
+        one, or in lists of batch_size rows. With a result_format, every batch
+        is converted to columns instead. Caches are bypassed.
+
+        Example::
+
+            for batch in gvol_client.stream(
+                "options_trades_orderbook_details", batch_size=10000,
+                exchange="deribit", symbol="BTC",
+                dateStart="2022-05-01", dateEnd="2022-05-08",
+            ):
+                ...
+
+        Args:
+            query: name of the endpoint method, e.g. "options_gvol_direction"
+            batch_size: number of rows per batch, rows are yielded one by one if None
+            fields: fields of the rows to stream, all of them if None
+            variable_values: arguments of the endpoint method
+        """
+        self._session or self._connect()
+        query = self._project(query, fields)
+        root = self._stream_root(query)
+
+        with metrics.measure(self._hooks, query, variable_values) as span:
+            with self._post_stream(query, variable_values, span) as response:
+                chunks = span.receiving(response.iter_content(streaming.CHUNK_SIZE))
+                rows = self._stream_records(span, root, chunks)
+                if batch_size is None:
+                    yield from rows
+                else:
+                    for batch in streaming.batches(rows, batch_size):
+                        yield self._format_batch(query, root, batch)
+
+    @staticmethod
+    def _stream_records(
+        span: metrics.Span, root: str, chunks: Iterator[bytes]
+    ) -> Iterator[Dict[str, Any]]:
+        """Yields the rows of a streamed body, timing their parsing as decode time."""
+        parser = streaming.RecordParser(root)
+        for chunk in chunks:
+            with span.decoding():
+                rows = parser.feed(chunk)
+            span.rows += len(rows)
+            yield from rows
+        with span.decoding():
+            rows = parser.close()
+        span.rows += len(rows)
+        yield from rows
+
+    def _post_stream(
+        self, query: str, variable_values: Dict[str, Any], span: metrics.Span
+    ) -> requests.Response:
+        """Posts a query to stream, retrying until the response headers arrive."""
+        assert self._transport.session is not None
+
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None:
+                with span.waiting():
+                    self._rate_limiter.acquire(query)
+            try:
+                with span.sending():
+                    response = self._transport.session.post(
+                        self._url,
+                        json={"query": registry.source(query), "variables": variable_values},
+                        headers=self._api_headers,
+                        timeout=self._transport.default_timeout,
+                        stream=True,
+                    )
+                try:
+                    response.raise_for_status()
+                except requests.HTTPError as e:
+                    response.close()
+                    raise TransportServerError(str(e), response.status_code) from e
+                return response
+            except (requests.RequestException, TransportServerError) as e:
+                delay = self._backoff(query, attempt, e)
+                if delay is None:
+                    raise
+            with span.waiting():
+                time.sleep(delay)
+            attempt += 1
+
+    def _stream_root(self, query: str) -> str:
+        """Validates a query to stream and returns the root field holding its rows."""
+        document = registry.document(query)
+        if self._client.schema is not None:
+            registry.validate(document, self._client.schema)
+
+        roots = document.definitions[0].selection_set.selections  # type: ignore[attr-defined]
+        if len(roots) != 1:
+            raise ValueError(f"{query} has {len(roots)} root fields, only one can be streamed")
+        return (roots[0].alias or roots[0].name).value
+
+    def _format_batch(self, query: str, root: str, batch: List[Dict[str, Any]]) -> Any:
+        if self._result_format is None:
+            return batch
+        return self._format(query, {root: batch})[root]
+
+    async def subscribe(
+        self,
+        query: str,
+        min_interval: float = 0.1,
+        max_interval: float = 5.0,
+        **variable_values: Any,
+    ) -> AsyncIterator[Any]:
+        """Yields the result of a real-time query every time it changes.
+
+        Subscribes over websockets when the client has a subscription_url and
+        the ``websockets`` extra is installed. Otherwise the query is polled,
+        every min_interval seconds while its result keeps changing, backing
+        off up to max_interval seconds while it does not.
+
+        Example::
+
+            async for book in gvol_client.subscribe(
+                "futures_orderbook", symbol="BTC", exchange="deribit"
+            ):
+                ...
+
+        Args:
+            query: name of the endpoint method, e.g. "options_orderbook"
+            min_interval: shortest time between polls, in seconds
+            max_interval: longest time between polls, in seconds
+            variable_values: arguments of the endpoint method
+        """
+        if self._subscription_url is not None and subscription.websockets_available():
+            results = subscription.subscribe(
+                self._subscription_url, self._api_headers, query, variable_values
+            )
+        else:
+            results = subscription.poll(
+                lambda: self._poll(query, variable_values),
+                subscription.AdaptiveInterval(min_interval, max_interval),
+            )
+        async for result in results:
+            yield self._format(query, result)
+
+    async def _poll(self, query: str, variable_values: Dict[str, Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._fetch, query, variable_values)
 
     def options_orderbook(
-        self, symbol: types.SymbolEnumType, exchange: types.ExchangeEnumType
+        self,
+        symbol: types.SymbolEnumType,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         Returns the current orderbook of options
@@ -53,14 +593,18 @@ class GVol:
             }
 
         """
-        return self._client.execute(
-            gql(queries.options_orderbook),
+        return self._execute(
+            "options_orderbook",
             variable_values={"symbol": symbol, "exchange": exchange},
+            fields=fields,
         )
 
     
     def options_termstructure(
-        self, symbol: types.SymbolEnumType, exchange: types.ExchangeEnumType
+        self,
+        symbol: types.SymbolEnumType,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """The volatility term structure represents the implied volatility given different expiration dates.
 
@@ -75,9 +619,10 @@ class GVol:
             "forwardVolatility": 61.91
             }
         """
-        return self._client.execute(
-            gql(queries.options_termstructure),
+        return self._execute(
+            "options_termstructure",
             variable_values={"symbol": symbol, "exchange": exchange},
+            fields=fields,
         )
 
    
@@ -86,6 +631,7 @@ class GVol:
         dateTime: types.String,
         symbol: types.BTCOrETHEnumType,
         exchange: types.ExchangeDeribit,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This endpoint returns a specific term structure for the datetime (till the minute) selected from the user.
 
@@ -105,13 +651,14 @@ class GVol:
             "markIv": 84.96
             }
         """
-        return self._client.execute(
-            gql(queries.options_termstructure_hist),
+        return self._execute(
+            "options_termstructure_hist",
             variable_values={
                 "dateTime": dateTime,
                 "symbol": symbol,
                 "exchange": exchange,
             },
+            fields=fields,
         )
    
     def options_termstructure_comparison(
@@ -120,6 +667,7 @@ class GVol:
         dateTimeTwo: types.String,
         symbol: types.BTCOrETHEnumType,
         exchange: types.ExchangeDeribit,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This endpoint returns a specific two term structure for the datetimes (till the minute) selected from the user.
 
@@ -147,14 +695,15 @@ class GVol:
             "markIv2": 71.6
             }
         """
-        return self._client.execute(
-            gql(queries.options_termstructure_comparison),
+        return self._execute(
+            "options_termstructure_comparison",
             variable_values={
                 "dateTimeOne": dateTimeOne,
                 "dateTimeTwo": dateTimeTwo,
                 "symbol": symbol,
                 "exchange": exchange,
             },
+            fields=fields,
         )
 
     def options_dvol_index(
@@ -164,6 +713,7 @@ class GVol:
         interval: types.String,
         dateStart: types.String,
         dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         The DVol index is a VIX like volatility index built and maintained by Deribit.com
@@ -193,8 +743,8 @@ class GVol:
             "close": 61.11
             }
         """
-        return self._client.execute(
-            gql(queries.options_dvol_index),
+        return self._execute(
+            "options_dvol_index",
             variable_values={
                 "exchange": exchange,
                 "symbol": symbol,
@@ -202,10 +752,14 @@ class GVol:
                 "dateStart": dateStart,
                 "dateEnd": dateEnd,
             },
+            fields=fields,
         )
 
     def options_trades(
-        self, date: types.String, exchange: types.ExchangeEnumType
+        self,
+        date: types.String,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return all the options times and sales data for a given exchange on a given day.
 
@@ -234,13 +788,54 @@ class GVol:
             "iv": "70.52"
             }
         """
-        return self._client.execute(
-            gql(queries.options_trades),
+        return self._execute(
+            "options_trades",
             variable_values={"date": date, "exchange": exchange},
+            fields=fields,
+        )
+
+    def options_trades_range(
+        self,
+        dateStart: types.String,
+        dateEnd: types.String,
+        exchange: types.ExchangeEnumType,
+        max_concurrency: int = 8,
+        checkpoint: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, Dict]]:
+        """Streams options_trades for every day from dateStart to dateEnd (both inclusive).
+
+        Up to max_concurrency days are pulled at the same time and each one is
+        yielded as soon as it arrives, so days come in completion order.
+        Pass a checkpoint file to resume an interrupted backfill: the days it
+        records are skipped and each processed day is appended to it.
+
+        Args:
+            {
+            "exchange": "deribit",
+            "dateStart": "2022-03-01",
+            "dateEnd": "2022-03-31"
+            }
+
+        Returns:
+            Iterator of ("2022-03-01", options_trades result) pairs
+        """
+        return ranges.backfill(
+            lambda date: self.options_trades(
+                date=date, exchange=exchange, fields=fields
+            ),
+            ranges.days(dateStart, dateEnd),
+            max_concurrency,
+            checkpoint,
         )
 
     def options_trades_orderbook_details(
-        self, exchange: types.ExchangeDeribit, symbol: types.BTCOrETHEnumType, dateStart: types.String, dateEnd: types.String 
+        self,
+        exchange: types.ExchangeDeribit,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return the trades with useful information about the orderbook at the time of the trade.
 
@@ -307,14 +902,18 @@ class GVol:
             "oiChange": -2.2
             }
         """
-        return self._client.execute(
-            gql(queries.options_trades_orderbook_details),
+        return self._execute(
+            "options_trades_orderbook_details",
             variable_values={"exchange": exchange, "symbol":symbol, "dateStart":dateStart, "dateEnd":dateEnd},
+            fields=fields,
         )
 
 
     def options_volatility_surface(
-        self, symbol: types.BTCOrETHEnumType, date: types.String
+        self,
+        symbol: types.BTCOrETHEnumType,
+        date: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query returns the "delta volatility surface" along with spot prices in 1 minute increments.
 
@@ -353,14 +952,19 @@ class GVol:
             "atmAskIV": 92.88
             }
         """
-        return self._client.execute(
-            gql(queries.options_volatility_surface),
+        return self._execute(
+            "options_volatility_surface",
             variable_values={"symbol": symbol, "date": date},
+            fields=fields,
         )
 
     
     def spot_prices(
-        self, symbol: types.String, dateStart: types.String, dateEnd: types.String
+        self,
+        symbol: types.String,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query returns spot price daily open, high, low, close (for all symbols)
 
@@ -381,13 +985,14 @@ class GVol:
             "close": 0.3607
             }
         """
-        return self._client.execute(
-            gql(queries.spot_prices),
+        return self._execute(
+            "spot_prices",
             variable_values={
                 "symbol": symbol,
                 "dateStart": dateStart,
                 "dateEnd": dateEnd,
             },
+            fields=fields,
         )
 
     def options_skew_constant(
@@ -396,6 +1001,7 @@ class GVol:
         dateStart: types.String,
         dateEnd: types.String,
         interval: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return the option skews (∆35, ∆25, ∆15, ∆5) for constant maturities (7-day, 30-day, 60-day, 90-day, 180-day).
 
@@ -441,14 +1047,15 @@ class GVol:
             "fiveDelta180DayExp": 15.27
             }
         """
-        return self._client.execute(
-            gql(queries.options_skew_constant),
+        return self._execute(
+            "options_skew_constant",
             variable_values={
                 "symbol": symbol,
                 "dateStart": dateStart,
                 "dateEnd": dateEnd,
                 "interval": interval,
             },
+            fields=fields,
         )
 
     def options_atm_constant(
@@ -457,6 +1064,7 @@ class GVol:
         dateStart: types.String,
         dateEnd: types.String,
         interval: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return the option at-the-money implied volatility for constant maturities (7-day, 30-day, 60-day, 90-day, 180-day).
         Users can pass the desired coin, time interval and date of interest.
@@ -481,14 +1089,15 @@ class GVol:
             "atm180": 87.62
             }
         """
-        return self._client.execute(
-            gql(queries.options_atm_constant),
+        return self._execute(
+            "options_atm_constant",
             variable_values={
                 "symbol": symbol,
                 "dateStart": dateStart,
                 "dateEnd": dateEnd,
                 "interval": interval,
             },
+            fields=fields,
         )
 
     def futures_basis_hist(
@@ -498,6 +1107,7 @@ class GVol:
         expiration: types.String,
         dateStart: types.String,
         dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """Historical intraday traded weighted basis
 
@@ -521,8 +1131,8 @@ class GVol:
             "close": 21958.5
             }
         """
-        return self._client.execute(
-            gql(queries.futures_basis_hist),
+        return self._execute(
+            "futures_basis_hist",
             variable_values={
                 "exchange": exchange,
                 "symbol": symbol,
@@ -530,12 +1140,14 @@ class GVol:
                 "dateStart": dateStart,
                 "dateEnd": dateEnd,
             },
+            fields=fields,
         )
 
 
     def options_orderbook_details(
         self,
         exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         This endpoint will return the option orderbook, index prices, underlying prices and open interest for the entire exchange.
@@ -567,11 +1179,41 @@ class GVol:
             "underlyingPrice": 21033.0751
             }
         """
-        return self._client.execute(
-            gql(queries.options_orderbook_details),
+        return self._execute(
+            "options_orderbook_details",
             variable_values={
                 "exchange": exchange,
             },
+            fields=fields,
+        )
+
+    def options_orderbook_details_changes(
+        self, exchange: types.ExchangeEnumType, interval: float = 1.0
+    ) -> Iterator[diff.SnapshotDiff]:
+        """
+        Polls options_orderbook_details and yields only what changed between polls.
+
+        Rows are matched by instrumentName. Every SnapshotDiff lists the added
+        and removed rows, and the changed ones with a mask of the fields that
+        changed. The snapshot timestamp ("date") is not compared. The first
+        diff has the whole exchange as added, and polls without changes are
+        skipped.
+
+        Example::
+
+            for changes in gvol_client.options_orderbook_details_changes(exchange="deribit"):
+                for change in changes.changed:
+                    surface.update(change.row, change.fields)
+
+        Args:
+            exchange: deribit / bitcom / okex / delta
+            interval: seconds between the start of two polls
+        """
+        return diff.poll(
+            lambda: self._fetch(
+                "options_orderbook_details", {"exchange": exchange}
+            )["UtilityRealtimeOptionbook"],
+            interval,
         )
 
     def portfolio_analyzer(
@@ -579,7 +1221,8 @@ class GVol:
         portfolio: types.String,
         deltaFutures: types.Float = 0,
         ivShift: types.Float = 0,
-        symbol: types.BTCOrETHEnumType = 'BTC'
+        symbol: types.BTCOrETHEnumType = 'BTC',
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         This endpoint will create a scenario simulation (underlying/iv/dte) of current portfolio book (DERIBIT)
@@ -609,21 +1252,23 @@ class GVol:
             "days": 0
             }
         """
-        return self._client.execute(
-            gql(queries.portfolio_analyzer),
+        return self._execute(
+            "portfolio_analyzer",
             variable_values={
                 "portfolio": portfolio,
                 "deltaFutures": deltaFutures,
                 "ivShift": ivShift,
                 "symbol": symbol
             },
+            fields=fields,
         )
 
     def options_greeks_minute(
         self,
         exchange: types.ExchangeDeribit,
         dateTime: types.String,
-        symbol: types.BTCOrETHEnumType
+        symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
       Explanation:
@@ -637,7 +1282,7 @@ class GVol:
         Comparing the underlying price and spot price will determine the basis.
         Endpoint Details:
         Time period start: June 2021
-        Total date per pull: 1-hour worth of data points (It's recommended that users build looping functions to retrieve the entire dataset)
+        Total date per pull: 1-hour worth of data points (use options_greeks_minute_range to retrieve longer ranges)
         Supported date intervals: 1-minute, 5-minute, 15-minute, etc.
         Supported Exchange: Deribit
         New data appendage rate: 1-min (new data is added every 1-min)
@@ -672,21 +1317,60 @@ class GVol:
             "rho": 0
             }
         """
-        return self._client.execute(
-            gql(queries.options_greeks_minute),
+        return self._execute(
+            "options_greeks_minute",
             variable_values={
                 "exchange": exchange,
                 "dateTime": dateTime,
                 "symbol": symbol
             },
+            fields=fields,
         )
 
+    def options_greeks_minute_range(
+        self,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        symbol: types.BTCOrETHEnumType,
+        max_concurrency: int = 8,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        """
+        Returns options_greeks_minute data for a whole date range.
+
+        The range is split into the one-hour pulls options_greeks_minute serves,
+        up to max_concurrency of them run at the same time, and the rows are
+        merged back in timestamp order.
+
+        Args:
+            {
+            "symbol": "BTC",
+            "dateStart": "2021-01-01 00:00:00",
+            "dateEnd": "2021-01-02 00:00:00",
+            "exchange": "deribit"
+            }
+        Returns:
+            Same rows as options_greeks_minute
+        """
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            results = executor.map(
+                lambda dateTime: self.options_greeks_minute(
+                    exchange=exchange, dateTime=dateTime, symbol=symbol, fields=fields
+                ),
+                ranges.hours(dateStart, dateEnd),
+            )
+            if self._result_format is not None:
+                return columnar.concat(results)
+            return ranges.merge(results)
+
     def options_greeks_hour(
         self,
         exchange: types.ExchangeDeribit,
         date: types.String,
         symbol: types.BTCOrETHEnumType,
-        interval: types.String
+        interval: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
       Explanation:
@@ -700,7 +1384,7 @@ class GVol:
         Comparing the underlying price and spot price will determine the basis.
         Endpoint Details:
         Time period start: April 2019
-        Total date per pull: 1-day worth of data points (It's recommended that users build looping functions to retrieve the entire dataset)
+        Total date per pull: 1-day worth of data points (use options_greeks_hour_range to retrieve longer ranges)
         Supported date intervals: 1-hour, 2-hour, etc. up to 'daily'
         Supported Exchange: Deribit
         New data appendage rate: 1-min (new data is added every 1-min)
@@ -737,14 +1421,58 @@ class GVol:
             "rho": 0
             }
         """
-        return self._client.execute(
-            gql(queries.options_greeks_hour),
+        return self._execute(
+            "options_greeks_hour",
             variable_values={
                 "exchange": exchange,
                 "date": date,
                 "symbol": symbol,
                 "interval": interval
             },
+            fields=fields,
+        )
+
+    def options_greeks_hour_range(
+        self,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        symbol: types.BTCOrETHEnumType,
+        interval: types.String,
+        max_concurrency: int = 8,
+        checkpoint: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Streams options_greeks_hour for every day from dateStart to dateEnd (both inclusive).
+
+        Up to max_concurrency days are pulled at the same time and each one is
+        yielded as soon as it arrives, so days come in completion order.
+        Pass a checkpoint file to resume an interrupted backfill: the days it
+        records are skipped and each processed day is appended to it.
+
+        Args:
+            {
+            "symbol": "BTC",
+            "dateStart": "2021-01-01",
+            "dateEnd": "2021-12-31",
+            "interval": "1 hour",
+            "exchange": "deribit"
+            }
+        Returns:
+            Iterator of ("2021-01-01", options_greeks_hour result) pairs
+        """
+        return ranges.backfill(
+            lambda date: self.options_greeks_hour(
+                exchange=exchange,
+                date=date,
+                symbol=symbol,
+                interval=interval,
+                fields=fields,
+            ),
+            ranges.days(dateStart, dateEnd),
+            max_concurrency,
+            checkpoint,
         )
 
     # def spot_prices_lite(
@@ -782,8 +1510,8 @@ class GVol:
     #         "close": 38.46
     #         }
     #     """
-    #     return self._client.execute(
-    #         gql(queries.spot_prices_lite),
+    #     return self._execute(
+    #         "spot_prices_lite",
     #         variable_values={
     #             "symbol": symbol,
     #         },
@@ -793,6 +1521,7 @@ class GVol:
         self,
         exchange: types.ExchangeDeribit,
         symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
       Explanation:
@@ -834,18 +1563,20 @@ class GVol:
             "currency": "BTC"
             }
         """
-        return self._client.execute(
-            gql(queries.options_atm_constant_lite),
+        return self._execute(
+            "options_atm_constant_lite",
             variable_values={
                 "exchange": exchange,
                 "symbol": symbol,
             },
+            fields=fields,
         )
 
     def options_skew_constant_lite(
         self,
         exchange: types.ExchangeDeribit,
         symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
       Explanation:
@@ -903,18 +1634,20 @@ class GVol:
             "fiveDelta180DayExp": -19.7
             }
         """
-        return self._client.execute(
-            gql(queries.options_skew_constant_lite),
+        return self._execute(
+            "options_skew_constant_lite",
             variable_values={
                 "exchange": exchange,
                 "symbol": symbol,
             },
+            fields=fields,
         )
 
 
     def futures_orderbook(
         self,
         exchange: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
       Explanation:
@@ -959,17 +1692,19 @@ class GVol:
             "currentFunding": null
             }
         """
-        return self._client.execute(
-            gql(queries.futures_orderbook),
+        return self._execute(
+            "futures_orderbook",
             variable_values={
                 "exchange": exchange,
             },
+            fields=fields,
         )
 
 
     def futures_perps_table(
-        self, 
+        self,
         exchange: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         Dataset: Returns the futures perpetual "table" information
@@ -1008,17 +1743,19 @@ class GVol:
             "hv180": 115.71
             }
         """
-        return self._client.execute(
-            gql(queries.futures_perps_table),
+        return self._execute(
+            "futures_perps_table",
             variable_values={
                 "exchange": exchange,
             },
+            fields=fields,
         )
 
 
     def futures_futs_table(
-        self, 
+        self,
         exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         Dataset: Returns the futures "table" information
@@ -1057,16 +1794,18 @@ class GVol:
             "hv180": 71.71
             }
         """
-        return self._client.execute(
-            gql(queries.futures_futs_table),
+        return self._execute(
+            "futures_futs_table",
             variable_values={
                 "exchange": exchange,
             },
+            fields=fields,
         )
 
 
     def defi_zeta_orderbook(
-        self
+        self,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         Why do traders like this endpoint?
@@ -1111,13 +1850,14 @@ class GVol:
             "oraclePrice": 39.41
             }
         """
-        return self._client.execute(
-            gql(queries.defi_zeta_orderbook),
-
+        return self._execute(
+            "defi_zeta_orderbook",
+            fields=fields,
         )
 
     def defi_ribbon_trades(
-        self
+        self,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         Why do traders like this endpoint?
@@ -1149,14 +1889,15 @@ class GVol:
             "notional": 39586
             }
         """
-        return self._client.execute(
-            gql(queries.defi_ribbon_trades),
-
+        return self._execute(
+            "defi_ribbon_trades",
+            fields=fields,
         )
 
     
     def defi_dovs_table(
         self,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         Returns dovs (defi options vaults) "table" information
@@ -1182,9 +1923,10 @@ class GVol:
             "iv": null
             }
         """
-        return self._client.execute(
-            gql(queries.defi_dovs_table),
+        return self._execute(
+            "defi_dovs_table",
             variable_values={},
+            fields=fields,
         )
 
 
@@ -1198,6 +1940,7 @@ class GVol:
         strike: types.String,
         putCall: types.PutCallEnumType,
         expiration: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query returns the open interest, bid iv, mark iv and ask iv for a specific instrument input.
         This data reflects option quotes found on Deribit for the given date range of interest.
@@ -1213,8 +1956,8 @@ class GVol:
         Returns:
             dict
         """
-        return self._client.execute(
-            gql(queries.HourlyInstrumentImpliedVolandOI),
+        return self._execute(
+            "HourlyInstrumentImpliedVolandOI",
             variable_values={
                 "symbol": symbol,
                 "dateStart": dateStart,
@@ -1223,11 +1966,16 @@ class GVol:
                 "putCall": putCall,
                 "expiration": expiration,
             },
+            fields=fields,
         )
 
 
     def CustomMaturityDeltaSurface(
-        self, symbol: types.BTCOrETHEnumType, date: types.String, days: types.Float
+        self,
+        symbol: types.BTCOrETHEnumType,
+        date: types.String,
+        days: types.Float,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This endpoint returns hourly intervals for desired "Constant Maturity Input".
         Users can input desired maturity for both BTC or ETH.
@@ -1239,9 +1987,10 @@ class GVol:
         Returns:
             dict
         """
-        return self._client.execute(
-            gql(queries.CustomMaturityDeltaSurface),
+        return self._execute(
+            "CustomMaturityDeltaSurface",
             variable_values={"symbol": symbol, "date": date, "days": days},
+            fields=fields,
         )
     
 
@@ -1249,7 +1998,11 @@ class GVol:
 
 
     def options_gvol_direction(
-        self, dateStart: types.String, dateEnd: types.String, symbol: types.BTCOrETHEnumType
+        self,
+        dateStart: types.String,
+        dateEnd: types.String,
+        symbol: types.BTCOrETHEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return the Deribit trades with useful information about the orderbook at the time of the trade with the
         gvol feature gvol_direction that asses the real initiator of the trade.
@@ -1319,13 +2072,17 @@ class GVol:
             "gvolDirection": "buy"
             }
         """
-        return self._client.execute(
-            gql(queries.options_gvol_direction),
+        return self._execute(
+            "options_gvol_direction",
             variable_values={"dateStart":dateStart, "dateEnd":dateEnd, "symbol":symbol},
+            fields=fields,
         )
 
     def options_gvol_gex(
-        self, symbol: types.BTCOrETHEnumType, date: types.String
+        self,
+        symbol: types.BTCOrETHEnumType,
+        date: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This endpoint returns the gamma levels (in nr of contracts for 1$ move in the underlying) of Market Makers according to a proprietary gvol algorithm.
         Inventory of dealers are estimated using the gvol_direction of each trade and analyzing the live orderbook
@@ -1344,13 +2101,19 @@ class GVol:
                 "dealerTotInventory": -66.4,
                 "dealerNetInventory": -23.4
         """
-        return self._client.execute(
-            gql(queries.options_gvol_gex),
+        return self._execute(
+            "options_gvol_gex",
             variable_values={"symbol": symbol, "date":date},
+            fields=fields,
         )
 
     def futures_constant_basis(
-        self, symbol: types.BTCOrETHEnumType, dateStart: types.String, dateEnd: types.String, exchange: types.ExchangeEnumType
+        self,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        exchange: types.ExchangeEnumType,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return futures basis annualized constant maturity in days.
 
@@ -1373,13 +2136,18 @@ class GVol:
             "b120": 0.1
             }
         """
-        return self._client.execute(
-            gql(queries.futures_constant_basis),
+        return self._execute(
+            "futures_constant_basis",
             variable_values={"symbol":symbol, "dateStart":dateStart, "dateEnd":dateEnd, "exchange":exchange},
+            fields=fields,
         )
 
     def options_atm_skew_spot(
-        self, symbol: types.BTCOrETHEnumType, dateStart: types.String, dateEnd: types.String, 
+        self,
+        symbol: types.BTCOrETHEnumType,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return hourly data of: atm constant maturities, skew constant maturities with each components (puts and calls details) and index price. 
 
@@ -1441,13 +2209,18 @@ class GVol:
                 "FiveDelta180Call": 66.21
             }
         """
-        return self._client.execute(
-            gql(queries.options_atm_skew_spot),
+        return self._execute(
+            "options_atm_skew_spot",
             variable_values={"symbol":symbol, "dateStart":dateStart, "dateEnd":dateEnd},
+            fields=fields,
         )
 
     def options_deribit_volume_detailed_daily(
-        self, exchange: types.ExchangeDeribit, dateStart: types.String, dateEnd: types.String, 
+        self,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """This query will return the Deribit daily volumes detailed and open interest with putcall ratio.
 
@@ -1478,14 +2251,21 @@ class GVol:
             "oiPcRatio": 0.47
             }
         """
-        return self._client.execute(
-            gql(queries.options_deribit_volume_detailed_daily),
+        return self._execute(
+            "options_deribit_volume_detailed_daily",
             variable_values={"exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd},
+            fields=fields,
         )
     
 
     def options_cumulative_net_volumes(
-        self,  symbol: types.BTCOrETHEnumType, exchange: types.ExchangeDeribit, days: types.Float, showActiveExpirations: types.Boolean, tradeType: types.TradeTypeEnum
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        days: types.Float,
+        showActiveExpirations: types.Boolean,
+        tradeType: types.TradeTypeEnum,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         This endpoint returns the cumulative net volumes of trades for the last "n" days selected.
@@ -1514,13 +2294,21 @@ class GVol:
                 "indexPrice": 21970.26
             }
         """
-        return self._client.execute(
-            gql(queries.options_cumulative_net_volumes),
-            variable_values={"symbol":symbol, "exchange":exchange, "days":days, "showActiveExpirations":showActiveExpirations, "tradeType":tradeType}
+        return self._execute(
+            "options_cumulative_net_volumes",
+            variable_values={"symbol":symbol, "exchange":exchange, "days":days, "showActiveExpirations":showActiveExpirations, "tradeType":tradeType},
+            fields=fields,
         )
 
     def options_cumulative_net_volumes_hist(
-        self,  symbol: types.BTCOrETHEnumType, exchange: types.ExchangeDeribit, dateStart: types.String, dateEnd: types.String, showActiveExpirations: types.Boolean, tradeType: types.TradeTypeEnum
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        showActiveExpirations: types.Boolean,
+        tradeType: types.TradeTypeEnum,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         This endpoint returns the cumulative net volumes of trades for the date range selected (dateStart/dateEnd).
@@ -1554,13 +2342,18 @@ class GVol:
             "indexPrice": 27125.03
             }
         """
-        return self._client.execute(
-            gql(queries.options_cumulative_net_volumes_hist),
-            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd, "showActiveExpirations":showActiveExpirations, "tradeType":tradeType}
+        return self._execute(
+            "options_cumulative_net_volumes_hist",
+            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd, "showActiveExpirations":showActiveExpirations, "tradeType":tradeType},
+            fields=fields,
         )
     
     def options_cumulative_net_positioning(
-        self,  symbol: types.BTCOrETHEnumType, exchange: types.ExchangeDeribit, dateStart: types.String
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         This endpoint returns the cumulative net positioning of traders for the period from the dateStart parameter. It means that positioning is assumed "zero" at the dateStart.
@@ -1582,13 +2375,19 @@ class GVol:
                 "indexPrice": 23134
             }
         """
-        return self._client.execute(
-            gql(queries.options_cumulative_net_positioning),
-            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart}   
+        return self._execute(
+            "options_cumulative_net_positioning",
+            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart},
+            fields=fields,
         )
     
     def options_cumulative_net_positioning_hist(
-        self,  symbol: types.BTCOrETHEnumType, exchange: types.ExchangeDeribit, dateStart: types.String, dateEnd: types.String
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         This endpoint returns the cumulative net oi for the date range selected (dateStart/dateEnd)
@@ -1617,13 +2416,19 @@ class GVol:
                 "indexPrice": 23134
             }
         """
-        return self._client.execute(
-            gql(queries.options_cumulative_net_positioning_hist),
-            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd}    
+        return self._execute(
+            "options_cumulative_net_positioning_hist",
+            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd},
+            fields=fields,
         )  
 
     def options_iv_rv_comparison(
-        self,  symbol: types.BTCOrETHEnumType, exchange: types.ExchangeDeribit, dateStart: types.String, dateEnd: types.String
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         Exchange: Deribit Only
@@ -1652,13 +2457,19 @@ class GVol:
            }
         
         """
-        return self._client.execute(
-            gql(queries.options_iv_rv_comparison),
-            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd}    
+        return self._execute(
+            "options_iv_rv_comparison",
+            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd},
+            fields=fields,
         )  
 
     def options_butterfly_constant_maturities(
-        self,  symbol: types.BTCOrETHEnumType, exchange: types.ExchangeDeribit, dateStart: types.String, dateEnd: types.String
+        self,
+        symbol: types.BTCOrETHEnumType,
+        exchange: types.ExchangeDeribit,
+        dateStart: types.String,
+        dateEnd: types.String,
+        fields: Optional[Sequence[str]] = None,
     ) -> Dict:
         """
         This endpoint returns butterflies of different delta with 1 minute granularity.
@@ -1689,12 +2500,20 @@ class GVol:
                 "fly35D180Day": 2.96
             }
         """
-        return self._client.execute(
-            gql(queries.options_butterfly_constant_maturities),
-            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd}    
+        return self._execute(
+            "options_butterfly_constant_maturities",
+            variable_values={"symbol":symbol, "exchange":exchange, "dateStart":dateStart, "dateEnd":dateEnd},
+            fields=fields,
         )
     
-    def options_term_structure_richness(self, symbol: types.SymbolEnumType, exchange: types.ExchangeEnumType, dateStart: str, dateEnd: str) -> Dict:
+    def options_term_structure_richness(
+        self,
+        symbol: types.SymbolEnumType,
+        exchange: types.ExchangeEnumType,
+        dateStart: str,
+        dateEnd: str,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
         """
         This endpoint retrieves the term structure richness data for a specific symbol and exchange. It encompasses various
         time buckets and at-the-money (ATM) implied volatility data, allowing for analysis and understanding of the
@@ -1721,12 +2540,13 @@ class GVol:
                 "termStructureRichness": 0.9346785467843016
             }
         """
-        return self._client.execute(
-            gql(queries.options_term_structure_richness),
+        return self._execute(
+            "options_term_structure_richness",
             variable_values={
                 "symbol": symbol,
                 "exchange": exchange,
                 "dateStart": dateStart,
                 "dateEnd": dateEnd
-            }
+            },
+            fields=fields,
         )
\ No newline at end of file
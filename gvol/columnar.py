@@ -0,0 +1,226 @@
+"""Columnar results: endpoint responses as NumPy arrays or pyarrow Tables.
+
+Columns follow the field lists of the documents in :mod:`gvol.queries`, typed
+from the client schema: ``Float`` fields become float64 (nulls as NaN),
+millisecond timestamp fields such as ``date``, ``expiration`` or ``txTs``
+become datetime64[ms] (nulls as NaT), ``Int`` fields int64 (float64 with NaN
+when a response has nulls) and ``Boolean`` fields bool. Strings, enums, lists
+and objects, and columns whose values do not match their schema type, stay
+object arrays, as NumPy has no nullable string type. In Tables, ``Int``,
+``Boolean``, ``String``, ``ID`` and enum columns are typed, with nulls.
+
+Requires the ``numpy`` extra, or the ``arrow`` extra for Tables.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from graphql import (
+    FieldNode,
+    GraphQLSchema,
+    get_named_type,
+    is_enum_type,
+    is_object_type,
+)
+
+from gvol.registry import registry
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+except ImportError:  # pragma: no cover
+    pa = pc = None  # type: ignore
+
+FORMATS = ("numpy", "arrow")
+
+TIMESTAMP_FIELDS = frozenset(
+    (
+        "date",
+        "date1",
+        "date2",
+        "expiration",
+        "expiration1",
+        "expiration2",
+        "postTxObTs",
+        "preTxObTs",
+        "timeBucket",
+        "timerange",
+        "ts",
+        "txTs",
+    )
+)
+
+Columns = Tuple[Tuple[str, str], ...]
+
+# Kind of the columns of each scalar type, enums are strings.
+_KINDS = {
+    "Float": "float",
+    "Int": "int",
+    "Boolean": "bool",
+    "String": "string",
+    "ID": "string",
+}
+
+
+def check_format(result_format: Optional[str]) -> None:
+    """Raises if a result format is unknown or its dependencies are missing."""
+    if result_format is None:
+        return
+    if result_format not in FORMATS:
+        raise ValueError(
+            f"Unknown result_format {result_format!r}, expected one of {FORMATS}"
+        )
+    if np is None or (result_format == "arrow" and pa is None):
+        raise ImportError(
+            f"result_format={result_format!r} requires the {result_format} extra, "
+            f"install it with `pip install gvol[{result_format}]`"
+        )
+
+
+@lru_cache(maxsize=None)
+def columns(query: str, schema: GraphQLSchema) -> Dict[str, Columns]:
+    """Returns ``(field, kind)`` pairs for every root field of a query.
+
+    Kind is ``"timestamp"``, ``"float"``, ``"int"``, ``"bool"``, ``"string"``
+    or ``"object"``.
+    """
+    definition: Any = registry.document(query).definitions[0]
+    assert schema.query_type is not None
+    result = {}
+    for root in definition.selection_set.selections:
+        assert isinstance(root, FieldNode)
+        row_type: Any = get_named_type(schema.query_type.fields[root.name.value].type)
+        fields = []
+        for field in root.selection_set.selections if root.selection_set else ():
+            assert isinstance(field, FieldNode)
+            name = field.alias.value if field.alias else field.name.value
+            field_type: Any = (
+                get_named_type(row_type.fields[field.name.value].type)
+                if is_object_type(row_type) and field.name.value in row_type.fields
+                else None
+            )
+            if name in TIMESTAMP_FIELDS:
+                fields.append((name, "timestamp"))
+            elif is_enum_type(field_type):
+                fields.append((name, "string"))
+            elif field_type is not None:
+                fields.append((name, _KINDS.get(field_type.name, "object")))
+            else:
+                fields.append((name, "object"))
+        result[root.alias.value if root.alias else root.name.value] = tuple(fields)
+    return result
+
+
+def convert(
+    query: str, schema: GraphQLSchema, result: Dict, result_format: str
+) -> Dict[str, Any]:
+    """Converts a raw response to a mapping of root field to columns.
+
+    Args:
+        query: name of the query document in :mod:`gvol.queries`
+        schema: schema the query was validated against
+        result: raw response, lists of row dicts keyed by root field
+        result_format: ``"numpy"`` for dicts of arrays, ``"arrow"`` for Tables
+    """
+    converted: Dict[str, Any] = {}
+    for root, fields in columns(query, schema).items():
+        rows = result.get(root) or []
+        if isinstance(rows, dict):
+            rows = [rows]
+        arrays = {name: _column([row.get(name) for row in rows], kind) for name, kind in fields}
+        converted[root] = _table(arrays, dict(fields)) if result_format == "arrow" else arrays
+    return converted
+
+
+def concat(results: Iterable[Dict[str, Any]], key: str = "date") -> Dict[str, Any]:
+    """Columnar counterpart of :func:`gvol.ranges.merge`.
+
+    Concatenates converted responses and stably sorts every root field by ``key``.
+    """
+    parts: Dict[str, List] = {}
+    for result in results:
+        for root, value in result.items():
+            parts.setdefault(root, []).append(value)
+
+    merged: Dict[str, Any] = {}
+    for root, values in parts.items():
+        if pa is not None and isinstance(values[0], pa.Table):
+            table = pa.concat_tables(values)
+            if key in table.column_names:
+                table = table.take(pc.sort_indices(table, sort_keys=[(key, "ascending")]))
+            merged[root] = table
+        else:
+            arrays = {
+                name: np.concatenate([value[name] for value in values])
+                for name in values[0]
+            }
+            if key in arrays:
+                order = np.argsort(arrays[key], kind="stable")
+                arrays = {name: array[order] for name, array in arrays.items()}
+            merged[root] = arrays
+    return merged
+
+
+def _column(values: List[Any], kind: str) -> "np.ndarray":
+    if kind == "float":
+        return np.array(values, dtype=np.float64)
+
+    if kind == "timestamp":
+        raw = np.array(values, dtype=object)
+        nulls = np.array([value is None for value in values], dtype=bool)
+        present = raw[~nulls].astype(str)
+        # Most values are milliseconds, a few endpoints return dates as
+        # "2022-12-30" or "2022-12-30 08:00:00", sometimes in the same column.
+        numeric = (
+            np.char.isdigit(np.char.lstrip(present, "-"))
+            if len(present)
+            else np.zeros(0, dtype=bool)
+        )
+        parsed = np.empty(len(present), dtype="datetime64[ms]")
+        if numeric.any():
+            parsed[numeric] = present[numeric].astype(np.int64).astype("datetime64[ms]")
+        if not numeric.all():
+            parsed[~numeric] = np.char.replace(present[~numeric], " ", "T").astype(
+                "datetime64[ms]"
+            )
+        column = np.full(len(raw), np.datetime64("NaT"), dtype="datetime64[ms]")
+        column[~nulls] = parsed
+        return column
+
+    if kind == "int" and all(type(value) is int for value in values):
+        return np.array(values, dtype=np.int64)
+    if kind == "int" and all(value is None or type(value) is int for value in values):
+        return np.array(values, dtype=np.float64)
+    if kind == "bool" and all(type(value) is bool for value in values):
+        return np.array(values, dtype=bool)
+
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _table(arrays: Dict[str, "np.ndarray"], kinds: Dict[str, str]) -> "pa.Table":
+    types = {"int": pa.int64(), "bool": pa.bool_(), "string": pa.string()}
+    table = {}
+    for name, array in arrays.items():
+        if array.dtype.kind == "M":
+            table[name] = pa.array(
+                array.view(np.int64),
+                mask=np.isnat(array),
+                type=pa.timestamp("ms", tz="UTC"),
+            )
+        elif kinds[name] == "float":
+            table[name] = pa.array(array, type=pa.float64())
+        elif kinds[name] in types:
+            try:
+                # NaN only stands for the nulls of an int column here.
+                table[name] = pa.array(array, type=types[kinds[name]], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                table[name] = pa.array(array.tolist())
+        else:
+            table[name] = pa.array(array.tolist())
+    return pa.table(table)
@@ -0,0 +1,124 @@
+"""Incremental updates between successive snapshots of a real-time endpoint."""
+import asyncio
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+Row = Dict[str, Any]
+
+
+class Change(NamedTuple):
+    """A row present in both snapshots with at least one field changed.
+
+    ``mask`` has bit ``n`` set when ``SnapshotDiffer.fields[n]`` changed.
+    """
+
+    row: Row
+    previous: Row
+    mask: int
+    fields: Tuple[str, ...]
+
+
+class SnapshotDiff(NamedTuple):
+    added: List[Row]
+    removed: List[Row]
+    changed: List[Change]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class SnapshotDiffer:
+    """Keeps the last snapshot of rows by key and diffs the next one against it.
+
+    Args:
+        key: field identifying a row across snapshots
+        ignore: fields not compared, e.g. the snapshot timestamp every row carries
+    """
+
+    def __init__(self, key: str = "instrumentName", ignore: Iterable[str] = ("date",)) -> None:
+        self.key = key
+        self.ignore = frozenset(ignore)
+        self.fields: Tuple[str, ...] = ()
+        self.snapshot: Dict[Any, Row] = {}
+        self._values: Dict[Any, Tuple] = {}
+
+    def update(self, rows: Iterable[Row]) -> SnapshotDiff:
+        """Replaces the snapshot with ``rows`` and returns what changed."""
+        previous_snapshot, previous_values = self.snapshot, self._values
+        snapshot: Dict[Any, Row] = {}
+        values: Dict[Any, Tuple] = {}
+        added: List[Row] = []
+        changed: List[Change] = []
+
+        for row in rows:
+            if not self.fields:
+                self.fields = tuple(field for field in row if field not in self.ignore)
+            key = row[self.key]
+            snapshot[key] = row
+            # Comparing tuples of the compared fields keeps unchanged rows,
+            # usually most of them, on a fast path.
+            row_values = values[key] = tuple([row.get(field) for field in self.fields])
+
+            previous = previous_values.get(key)
+            if previous is None:
+                added.append(row)
+            elif row_values != previous:
+                mask = 0
+                for n, (value, previous_value) in enumerate(zip(row_values, previous)):
+                    if value != previous_value:
+                        mask |= 1 << n
+                changed.append(
+                    Change(row, previous_snapshot[key], mask, self._names(mask))
+                )
+
+        removed = [row for key, row in previous_snapshot.items() if key not in snapshot]
+        self.snapshot, self._values = snapshot, values
+        return SnapshotDiff(added, removed, changed)
+
+    def _names(self, mask: int) -> Tuple[str, ...]:
+        return tuple(field for n, field in enumerate(self.fields) if mask >> n & 1)
+
+
+def poll(
+    fetch: Callable[[], List[Row]],
+    interval: float,
+    differ: Optional[SnapshotDiffer] = None,
+) -> Iterator[SnapshotDiff]:
+    """Calls ``fetch`` every ``interval`` seconds and yields the non-empty diffs.
+
+    The first diff has every row of the first snapshot as added.
+    """
+    differ = differ or SnapshotDiffer()
+    while True:
+        started = time.monotonic()
+        diff = differ.update(fetch())
+        if diff:
+            yield diff
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+async def poll_async(
+    fetch: Callable[[], Awaitable[List[Row]]],
+    interval: float,
+    differ: Optional[SnapshotDiffer] = None,
+) -> AsyncIterator[SnapshotDiff]:
+    """Asyncio counterpart of :func:`poll`."""
+    differ = differ or SnapshotDiffer()
+    while True:
+        started = time.monotonic()
+        diff = differ.update(await fetch())
+        if diff:
+            yield diff
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,253 @@
+"""Parsing instrument names and indexing option chains.
+
+Rows of ``options_orderbook``, ``options_trades``, ``options_orderbook_details``
+or ``futures_orderbook`` identify contracts by names such as
+``BTC-24NOV21-59000-C`` (Deribit, bit.com), ``BTC-USD-211124-59000-C`` (OKX)
+or ``BTC-PERPETUAL``. :func:`parse_names` turns a whole column of names into
+currency, expiration, strike and put/call columns, parsing every distinct
+name once::
+
+    columns = parse_names(row["instrumentName"] for row in book)
+    columns["strike"]  # float64, NaN for futures
+
+:class:`OptionChain` indexes the options of a response by contract::
+
+    chain = OptionChain(gvol_client.options_orderbook_details(exchange="deribit")["UtilityRealtimeOptionbook"])
+    chain.get("30DEC22", 40000, "C")
+    chain.strikes("30DEC22")
+    chain.between("30DEC22", 30000, 50000, "P")
+
+Requires the ``numpy`` extra.
+"""
+import bisect
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+#: Hour of the day, UTC, at which contracts expire.
+EXPIRY_HOUR = 8
+
+#: Distinct names whose parse is kept by :func:`parse`.
+CACHE_SIZE = 2 ** 16
+
+_MONTHS = {
+    month: number
+    for number, month in enumerate(
+        ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"),
+        start=1,
+    )
+}
+
+_PATTERNS = (
+    # BTC-24NOV21, BTC-24NOV21-59000-C, XRP-24NOV21-0d5-P
+    re.compile(
+        r"(?P<currency>[A-Z0-9]+)-(?P<day>\d{1,2})(?P<month>[A-Z]{3})(?P<year>\d{2})"
+        r"(?:-(?P<strike>\d+(?:[.d]\d+)?)-(?P<putCall>[CP]))?"
+    ),
+    # BTC-USD-211124, BTC-USD-211124-59000-C
+    re.compile(
+        r"(?P<currency>[A-Z0-9]+)-[A-Z]+-(?P<year>\d{2})(?P<numeric_month>\d{2})(?P<day>\d{2})"
+        r"(?:-(?P<strike>\d+(?:\.\d+)?)-(?P<putCall>[CP]))?"
+    ),
+    # BTC-PERPETUAL, BTC-USD-SWAP
+    re.compile(r"(?P<currency>[A-Z0-9]+)-(?:[A-Z]+-)?(?:PERPETUAL|PERP|SWAP)"),
+)
+
+Expiration = Union[str, int, float, datetime, "np.datetime64"]
+
+
+class Instrument(NamedTuple):
+    """A parsed instrument name, with None for the parts it does not have."""
+
+    currency: str
+    expiration: Optional[int]
+    strike: Optional[float]
+    putCall: Optional[str]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(name: str) -> Optional[Instrument]:
+    """Parses an instrument name, None if it is in no known format.
+
+    The expiration is in UTC milliseconds, at :data:`EXPIRY_HOUR`.
+    """
+    for pattern in _PATTERNS:
+        match = pattern.fullmatch(name)
+        if match is None:
+            continue
+        parts = match.groupdict()
+        expiration = None
+        if parts.get("year") is not None:
+            month = (
+                int(parts["numeric_month"])
+                if parts.get("numeric_month")
+                else _MONTHS.get(parts["month"])
+            )
+            if month is None:
+                return None
+            try:
+                expiry = datetime(
+                    2000 + int(parts["year"]), month, int(parts["day"]), EXPIRY_HOUR,
+                    tzinfo=timezone.utc,
+                )
+            except ValueError:
+                return None
+            expiration = int(expiry.timestamp() * 1000)
+        strike = parts.get("strike")
+        return Instrument(
+            parts["currency"],
+            expiration,
+            float(strike.replace("d", ".")) if strike is not None else None,
+            parts.get("putCall"),
+        )
+    return None
+
+
+def parse_names(names: Iterable[Any]) -> Dict[str, "np.ndarray"]:
+    """Parses a column of instrument names.
+
+    Every distinct name is parsed once, so a book quoting each contract many
+    times costs little more than its list of contracts. Names that cannot be
+    parsed get nulls.
+
+    Returns:
+        ``currency`` (object, None when unparsed), ``expiration``
+        (datetime64[ms], NaT for perpetuals), ``strike`` (float64, NaN for
+        futures) and ``putCall`` (object, "C", "P" or None) arrays
+    """
+    if np is None:
+        raise ImportError(
+            "parse_names requires numpy, install it with `pip install gvol[numpy]`"
+        )
+    # Hashing the names is faster than sorting them with np.unique.
+    codes: Dict[Any, int] = {}
+    inverse = np.fromiter(
+        (codes.setdefault(name, len(codes)) for name in names), dtype=np.intp
+    )
+    parsed = [parse(name) if isinstance(name, str) else None for name in codes]
+
+    currency = np.array([p.currency if p else None for p in parsed], dtype=object)
+    expiration = np.array(
+        [p.expiration if p and p.expiration is not None else np.iinfo(np.int64).min for p in parsed],
+        dtype=np.int64,
+    ).view("datetime64[ms]")
+    strike = np.array(
+        [p.strike if p and p.strike is not None else np.nan for p in parsed], dtype=np.float64
+    )
+    put_call = np.array([p.putCall if p else None for p in parsed], dtype=object)
+    return {
+        "currency": currency[inverse],
+        "expiration": expiration[inverse],
+        "strike": strike[inverse],
+        "putCall": put_call[inverse],
+    }
+
+
+def expiration_ms(value: Expiration) -> int:
+    """Returns an expiration in UTC milliseconds, from milliseconds, a datetime,
+    a datetime64, a date string ("2022-12-30") or a Deribit code ("30DEC22").
+    """
+    if np is not None and isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[ms]").astype(np.int64))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, (int, float)):
+        return int(value)
+    instrument = parse(f"X-{value.strip().upper()}")
+    if instrument is not None and instrument.expiration is not None:
+        return instrument.expiration
+    try:
+        return int(value)
+    except ValueError:
+        day = datetime.strptime(value.strip()[:10], "%Y-%m-%d")
+        return int(
+            day.replace(hour=EXPIRY_HOUR, tzinfo=timezone.utc).timestamp() * 1000
+        )
+
+
+class OptionChain:
+    """Options of a response indexed by expiration, strike and put/call.
+
+    Looking up a contract takes one dict lookup and the strikes of every
+    expiration are kept sorted, so slicing a range of strikes is a binary
+    search. Rows that are not options, such as futures, are left out.
+
+    Args:
+        rows: rows with an ``instrumentName`` field, as row dicts or as the
+            columns of a ``result_format="numpy"`` response
+    """
+
+    def __init__(self, rows: Union[List[Dict[str, Any]], Dict[str, Any]]) -> None:
+        if isinstance(rows, dict):
+            names = list(rows["instrumentName"])
+            fields = list(rows)
+            self.rows = [
+                {field: rows[field][n] for field in fields} for n in range(len(names))
+            ]
+        else:
+            self.rows = list(rows)
+            names = [row.get("instrumentName") for row in self.rows]
+
+        self._index: Dict[Tuple[int, float, str], int] = {}
+        strikes: Dict[int, Dict[Optional[str], set]] = {}
+        for position, name in enumerate(names):
+            instrument = parse(str(name))
+            if instrument is None or instrument.strike is None:
+                continue
+            assert instrument.expiration is not None and instrument.putCall is not None
+            key = (instrument.expiration, instrument.strike, instrument.putCall)
+            self._index[key] = position
+            by_type = strikes.setdefault(instrument.expiration, {None: set()})
+            by_type[None].add(instrument.strike)
+            by_type.setdefault(instrument.putCall, set()).add(instrument.strike)
+
+        self._strikes: Dict[int, Dict[Optional[str], List[float]]] = {
+            expiration: {put_call: sorted(values) for put_call, values in by_type.items()}
+            for expiration, by_type in strikes.items()
+        }
+        #: Expirations of the chain in UTC milliseconds, in order.
+        self.expirations: List[int] = sorted(self._strikes)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Tuple[Expiration, float, str]) -> bool:
+        return self.get(*key) is not None
+
+    def __getitem__(self, key: Tuple[Expiration, float, str]) -> Dict[str, Any]:
+        row = self.get(*key)
+        if row is None:
+            raise KeyError(key)
+        return row
+
+    def get(
+        self, expiration: Expiration, strike: float, putCall: str
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the row of a contract, None if the chain does not have it."""
+        position = self._index.get((expiration_ms(expiration), float(strike), putCall))
+        return None if position is None else self.rows[position]
+
+    def strikes(self, expiration: Expiration, putCall: Optional[str] = None) -> List[float]:
+        """Returns the strikes of an expiration in ascending order, of calls or
+        puts only if ``putCall`` is "C" or "P".
+        """
+        return list(self._strikes.get(expiration_ms(expiration), {}).get(putCall, ()))
+
+    def between(
+        self, expiration: Expiration, low: float, high: float, putCall: str
+    ) -> List[Dict[str, Any]]:
+        """Returns the rows of the calls or puts of an expiration with a strike
+        from low to high (both inclusive), by ascending strike.
+        """
+        ms = expiration_ms(expiration)
+        strikes = self._strikes.get(ms, {}).get(putCall, [])
+        selected = strikes[bisect.bisect_left(strikes, low) : bisect.bisect_right(strikes, high)]
+        return [self.rows[self._index[(ms, strike, putCall)]] for strike in selected]
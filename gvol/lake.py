@@ -0,0 +1,389 @@
+"""Local Parquet data lake of historical responses.
+
+Responses of historical endpoints are stored one day per file, typed from the
+client schema (see :mod:`gvol.columnar`) and compressed, under Hive-style
+partitions::
+
+    <lake>/options_greeks_hour/symbol=BTC/exchange=deribit/interval=1%20hour/date=2022-01-01/part.parquet
+
+so the lake can be scanned by anything reading Parquet datasets, e.g.
+``pyarrow.dataset.dataset(path, partitioning="hive")``. Every query directory
+has a ``_manifest.json`` recording the days written, and how many rows they
+hold, so empty days are not fetched again and half written files are ignored.
+
+:meth:`Lake.load` reads a window of days from the lake and fetches only the
+missing ones::
+
+    lake = Lake("lake")
+    trades = lake.load(
+        gvol_client, "options_trades",
+        dateStart="2022-01-01", dateEnd="2022-03-31", exchange="deribit",
+    )["TimesAndSales"]
+
+Requires the ``arrow`` extra.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from graphql import GraphQLSchema, get_named_type, is_enum_type
+
+from gvol import columnar, ranges, schema
+from gvol.async_client import AsyncGVol
+from gvol.cache import INTERVAL_QUERIES
+from gvol.client import GVol
+from gvol.registry import registry
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:  # pragma: no cover
+    pa = pq = None  # type: ignore
+
+# Queries pulled one day at a time, with the variable holding the day.
+DAY_QUERIES: Dict[str, str] = {
+    "options_trades": "date",
+    "options_greeks_hour": "date",
+    "options_volatility_surface": "date",
+}
+
+# Queries over a dateStart/dateEnd window, with the field holding row timestamps.
+# Windows are fetched whole and split into days by that field.
+WINDOW_QUERIES: Dict[str, str] = dict(INTERVAL_QUERIES, spot_prices="date")
+
+# Variables leading the partitions, the others follow in alphabetical order.
+PARTITION_ORDER = ("symbol", "exchange")
+
+_MANIFEST = "_manifest.json"
+_PART = "part.parquet"
+
+
+@lru_cache(maxsize=None)
+def arrow_types(query: str, client_schema: GraphQLSchema) -> Dict[str, Dict[str, Any]]:
+    """Returns the Arrow type of every column of a query, per root field.
+
+    Columns whose type cannot be derived from the schema, such as nested
+    objects, are typed None and kept as pyarrow infers them.
+    """
+    scalars = {"Int": pa.int64(), "Boolean": pa.bool_(), "String": pa.string(), "ID": pa.string()}
+    definition: Any = registry.document(query).definitions[0]
+    assert client_schema.query_type is not None
+    result = {}
+    for root in definition.selection_set.selections:
+        row_type: Any = get_named_type(
+            client_schema.query_type.fields[root.name.value].type
+        )
+        kinds = columnar.columns(query, client_schema)[(root.alias or root.name).value]
+        names = {
+            (field.alias or field.name).value: field.name.value
+            for field in root.selection_set.selections
+        }
+        types: Dict[str, Any] = {}
+        for name, kind in kinds:
+            if kind == "timestamp":
+                types[name] = pa.timestamp("ms", tz="UTC")
+            elif kind == "float":
+                types[name] = pa.float64()
+            else:
+                field = getattr(row_type, "fields", {}).get(names[name])
+                named: Any = get_named_type(field.type) if field is not None else None
+                if is_enum_type(named):
+                    types[name] = pa.string()
+                else:
+                    types[name] = scalars.get(named.name) if named is not None else None
+        result[(root.alias or root.name).value] = types
+    return result
+
+
+def _typed(table: "pa.Table", types: Dict[str, Any]) -> "pa.Table":
+    """Casts the columns of a table to their schema types where the values allow."""
+    for index, name in enumerate(table.column_names):
+        target = types.get(name)
+        if target is None or table.schema.field(index).type == target:
+            continue
+        try:
+            column = table.column(index).cast(target)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+        table = table.set_column(index, name, column)
+    return table
+
+
+def _empty(types: Dict[str, Any]) -> "pa.Table":
+    return pa.schema(
+        [(name, pa.null() if target is None else target) for name, target in types.items()]
+    ).empty_table()
+
+
+class Lake:
+    """Parquet files of historical responses, partitioned by query, variables and day.
+
+    Only days older than ``settle`` are written: more recent ones may still
+    change, so :meth:`load` fetches them every time. Writing a day again
+    replaces it, so interrupted or repeated loads are safe. The lake can be
+    read by many processes but should be written by one at a time.
+
+    Args:
+        path: lake directory, defaults to ``lake`` under the gvol cache directory
+        compression: Parquet compression codec
+        settle: how long after the fact data is considered final
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        compression: str = "zstd",
+        settle: timedelta = timedelta(hours=1),
+    ) -> None:
+        columnar.check_format("arrow")
+        self.path = Path(path) if path else schema.cache_dir() / "lake"
+        self.compression = compression
+        self.settle = settle
+        self._lock = threading.Lock()
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+
+    def partition(self, query: str, day: str, variable_values: Dict[str, Any]) -> str:
+        """Returns the directory of a day of a query, relative to the query's directory."""
+        _check(query)
+        names = sorted(
+            (name for name, value in variable_values.items() if value is not None),
+            key=lambda name: (
+                PARTITION_ORDER.index(name) if name in PARTITION_ORDER else len(PARTITION_ORDER),
+                name,
+            ),
+        )
+        parts = [f"{name}={quote(str(variable_values[name]), safe='')}" for name in names]
+        return "/".join(parts + [f"date={day}"])
+
+    def missing(
+        self, query: str, dateStart: str, dateEnd: str, **variable_values: Any
+    ) -> List[str]:
+        """Returns the days from dateStart to dateEnd (both inclusive) not in the lake."""
+        with self._lock:
+            written = self._manifest(query)["partitions"]
+        return [
+            day
+            for day in ranges.days(dateStart, dateEnd)
+            if self.partition(query, day, variable_values) not in written
+        ]
+
+    def write(
+        self, query: str, day: str, variable_values: Dict[str, Any], result: Dict
+    ) -> None:
+        """Stores the raw response of a query for one day.
+
+        Args:
+            query: name of the query document in :mod:`gvol.queries`
+            day: the day the rows belong to, e.g. "2022-01-01"
+            variable_values: query variables other than the day or window
+            result: raw response, lists of row dicts keyed by root field
+        """
+        client_schema = schema.load_schema()
+        tables = columnar.convert(query, client_schema, result, "arrow")
+        types = arrow_types(query, client_schema)
+        partition = self.partition(query, day, variable_values)
+        directory = self.path / query / partition
+        rows = sum(table.num_rows for table in tables.values())
+
+        if rows:
+            directory.mkdir(parents=True, exist_ok=True)
+            # One root field per lake query, the root is kept in the manifest.
+            ((root, table),) = tables.items()
+            file = directory / _PART
+            tmp_file = file.with_name(f"{_PART}.{os.getpid()}.{threading.get_ident()}")
+            pq.write_table(_typed(table, types[root]), tmp_file, compression=self.compression)
+            os.replace(tmp_file, file)
+        else:
+            (root,) = types
+            try:
+                (directory / _PART).unlink()
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            manifest = self._manifest(query)
+            manifest["partitions"][partition] = {
+                "root": root,
+                "rows": rows,
+                "written": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._save_manifest(query, manifest)
+
+    def read(
+        self, query: str, dateStart: str, dateEnd: str, **variable_values: Any
+    ) -> Dict[str, "pa.Table"]:
+        """Returns the rows the lake holds from dateStart to dateEnd (both inclusive).
+
+        Returns:
+            mapping of root field to a pyarrow Table sorted by timestamp, as
+            returned by a client with ``result_format="arrow"``
+        """
+        return self._concat(
+            query, self._tables(query, ranges.days(dateStart, dateEnd), variable_values)
+        )
+
+    def load(
+        self,
+        gvol_client: GVol,
+        query: str,
+        dateStart: str,
+        dateEnd: str,
+        max_concurrency: int = 8,
+        **variable_values: Any,
+    ) -> Dict[str, "pa.Table"]:
+        """Returns a window of a query from the lake, fetching the missing days first.
+
+        Missing days are fetched by ``gvol_client``, through its caches and
+        rate limiter, up to max_concurrency at the same time, and stored
+        unless they are too recent.
+
+        Args:
+            gvol_client: client fetching the missing days, an AsyncGVol is
+                rejected as the days are fetched from threads
+            query: name of the query document in :mod:`gvol.queries`
+            dateStart: first day, e.g. "2022-01-01"
+            dateEnd: last day, included
+            variable_values: query variables other than the day or window
+        """
+        if isinstance(gvol_client, AsyncGVol):
+            raise TypeError("Lake.load needs a GVol client, not an AsyncGVol")
+
+        days = ranges.days(dateStart, dateEnd)
+        fresh: Dict[str, Dict] = {}
+        for day, result in self._fetch(
+            gvol_client, query, self.missing(query, dateStart, dateEnd, **variable_values),
+            max_concurrency, variable_values,
+        ):
+            if self._settled(day):
+                self.write(query, day, variable_values, result)
+            else:
+                fresh[day] = result
+
+        client_schema = schema.load_schema()
+        tables = self._tables(query, [day for day in days if day not in fresh], variable_values)
+        tables.extend(
+            columnar.convert(query, client_schema, result, "arrow")
+            for result in fresh.values()
+        )
+        return self._concat(query, tables)
+
+    def _fetch(
+        self,
+        gvol_client: GVol,
+        query: str,
+        days: List[str],
+        max_concurrency: int,
+        variable_values: Dict[str, Any],
+    ) -> Iterator[Tuple[str, Dict]]:
+        """Yields the raw response of every day, fetching windows of consecutive days whole."""
+        if query in DAY_QUERIES:
+            yield from ranges.backfill(
+                lambda day: gvol_client._fetch(
+                    query, dict(variable_values, **{DAY_QUERIES[query]: day})
+                ),
+                days,
+                max_concurrency,
+            )
+            return
+
+        windows: Dict[str, List[str]] = {}
+        last: List[str] = []
+        for day in days:
+            if last and _next_day(last[-1]) == day:
+                last.append(day)
+            else:
+                last = windows[day] = [day]
+
+        for first, result in ranges.backfill(
+            lambda first: gvol_client._fetch(
+                query,
+                dict(
+                    variable_values,
+                    dateStart=first,
+                    dateEnd=_next_day(windows[first][-1]),
+                ),
+            ),
+            windows,
+            max_concurrency,
+        ):
+            split: Dict[str, Dict[str, List]] = {
+                day: {field: [] for field in result} for day in windows[first]
+            }
+            time_field = WINDOW_QUERIES[query]
+            for field, rows in result.items():
+                for row in rows or []:
+                    if row.get(time_field) is None:
+                        continue
+                    day = datetime.fromtimestamp(
+                        int(row[time_field]) / 1000, timezone.utc
+                    ).strftime(ranges.DATE_FORMAT)
+                    if day in split:
+                        split[day][field].append(row)
+            yield from split.items()
+
+    def _tables(
+        self, query: str, days: List[str], variable_values: Dict[str, Any]
+    ) -> List[Dict[str, "pa.Table"]]:
+        with self._lock:
+            written = dict(self._manifest(query)["partitions"])
+        tables = []
+        for day in days:
+            partition = self.partition(query, day, variable_values)
+            entry = written.get(partition)
+            if entry and entry["rows"]:
+                file = self.path / query / partition / _PART
+                tables.append({entry["root"]: pq.read_table(file, partitioning=None)})
+        return tables
+
+    def _concat(self, query: str, tables: List[Dict[str, "pa.Table"]]) -> Dict[str, "pa.Table"]:
+        types = arrow_types(query, schema.load_schema())
+        tables = [
+            {root: _typed(table, types[root]) for root, table in result.items()}
+            for result in tables
+        ]
+        key = WINDOW_QUERIES.get(query, "date")
+        merged = columnar.concat(tables, key=key) if tables else {}
+        for root in types:
+            merged.setdefault(root, _empty(types[root]))
+        return merged
+
+    def _settled(self, day: str) -> bool:
+        end = datetime.strptime(day, ranges.DATE_FORMAT) + timedelta(days=1)
+        return end + self.settle <= datetime.utcnow()
+
+    def _manifest(self, query: str) -> Dict[str, Any]:
+        if query not in self._manifests:
+            try:
+                with open(self.path / query / _MANIFEST, encoding="utf-8") as f:
+                    self._manifests[query] = json.load(f)
+            except (OSError, ValueError):
+                self._manifests[query] = {"query": query, "partitions": {}}
+        return self._manifests[query]
+
+    def _save_manifest(self, query: str, manifest: Dict[str, Any]) -> None:
+        directory = self.path / query
+        directory.mkdir(parents=True, exist_ok=True)
+        file = directory / _MANIFEST
+        tmp_file = file.with_name(f"{_MANIFEST}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_file, file)
+
+
+def _check(query: str) -> None:
+    if query not in DAY_QUERIES and query not in WINDOW_QUERIES:
+        raise ValueError(
+            f"{query} cannot be stored in the lake, expected one of "
+            f"{sorted(set(DAY_QUERIES) | set(WINDOW_QUERIES))}"
+        )
+
+
+def _next_day(day: str) -> str:
+    return (datetime.strptime(day, ranges.DATE_FORMAT) + timedelta(days=1)).strftime(
+        ranges.DATE_FORMAT
+    )
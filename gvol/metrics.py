@@ -0,0 +1,365 @@
+"""Per-request instrumentation of the clients.
+
+Every request sent to the API is timed in three parts: the wait for the rate
+limiter and for retry backoffs, the network time until the last byte of the
+response arrived, and the decoding of the response. Clients pass a
+:class:`Call` record of every request to their ``hooks``; a
+:class:`Metrics` aggregator can be used as one and exported for Prometheus::
+
+    metrics = Metrics()
+    gvol_client = GVol(header="x-oracle", gvol_api_key="...", hooks=[metrics])
+    ...
+    metrics.prometheus()
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from gvol.cache import request_key
+
+
+class Call(NamedTuple):
+    """Measurements of one request, over all its attempts.
+
+    ``error`` is the name of the exception the request failed with, if any.
+    """
+
+    query: str
+    variables_hash: str
+    queue_wait: float
+    network: float
+    decode: float
+    bytes: int
+    rows: int
+    attempts: int
+    error: Optional[str]
+
+    @property
+    def latency(self) -> float:
+        return self.queue_wait + self.network + self.decode
+
+
+Hook = Callable[[Call], None]
+
+
+class Span:
+    """Measurements of a request in progress."""
+
+    def __init__(self, query: str, variable_values: Optional[Dict[str, Any]]) -> None:
+        self.query = query
+        self.variable_values = variable_values
+        self.queue_wait = 0.0
+        self.network = 0.0
+        self.decode = 0.0
+        self.bytes = 0
+        self.rows = 0
+        self.attempts = 0
+        self.received: Optional[float] = None
+
+    @contextmanager
+    def waiting(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.queue_wait += time.perf_counter() - started
+
+    @contextmanager
+    def sending(self) -> Iterator[None]:
+        """Times an attempt, split where the transport hooks saw the last byte."""
+        self.attempts += 1
+        self.received = None
+        token = _current.set(self)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            _current.reset(token)
+            received = self.received if self.received is not None else ended
+            self.network += received - started
+            self.decode += ended - received
+
+    def done(self, result: Any) -> None:
+        self.rows = count_rows(result)
+
+    def receiving(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Counts the bytes of a streamed body, timing the wait for every chunk
+        as network time.
+        """
+        iterator = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            chunk = next(iterator, None)
+            self.network += time.perf_counter() - started
+            if chunk is None:
+                return
+            self.bytes += len(chunk)
+            yield chunk
+
+    async def receiving_async(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        iterator = chunks.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                self.network += time.perf_counter() - started
+            self.bytes += len(chunk)
+            yield chunk
+
+    @contextmanager
+    def decoding(self) -> Iterator[None]:
+        """Times the parsing of a streamed chunk."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.decode += time.perf_counter() - started
+
+    def call(self, error: Optional[BaseException] = None) -> Call:
+        return Call(
+            self.query,
+            request_key("", self.variable_values)[:16],
+            self.queue_wait,
+            self.network,
+            self.decode,
+            self.bytes,
+            self.rows,
+            self.attempts,
+            type(error).__name__ if error is not None else None,
+        )
+
+
+_current: "ContextVar[Optional[Span]]" = ContextVar("gvol_span", default=None)
+
+
+@contextmanager
+def measure(
+    hooks: Sequence[Hook], query: str, variable_values: Optional[Dict[str, Any]]
+) -> Iterator[Span]:
+    """Yields the span of a request and passes its record to ``hooks`` once done.
+
+    A stream its consumer stops reading early is recorded without an error.
+    """
+    span = Span(query, variable_values)
+    try:
+        yield span
+    except GeneratorExit:
+        for hook in hooks:
+            hook(span.call())
+        raise
+    except BaseException as e:
+        for hook in hooks:
+            hook(span.call(e))
+        raise
+    for hook in hooks:
+        hook(span.call())
+
+
+def count_rows(result: Any) -> int:
+    """Returns the number of rows of a response, counting objects as one row."""
+    if not isinstance(result, dict):
+        return 0
+    return sum(
+        len(value) if isinstance(value, list) else 1 for value in result.values()
+    )
+
+
+def on_response(response: Any, *args: Any, **kwargs: Any) -> None:
+    """requests response hook reading the body of the request being measured."""
+    span = _current.get()
+    if span is not None and not kwargs.get("stream"):
+        span.bytes += len(response.content)
+        span.received = time.perf_counter()
+
+
+def trace_config() -> Any:
+    """Returns an aiohttp trace config counting the bytes of the request being measured."""
+    import aiohttp
+
+    async def on_chunk(session: Any, context: Any, params: Any) -> None:
+        span = _current.get()
+        if span is not None:
+            span.bytes += len(params.chunk)
+            span.received = time.perf_counter()
+
+    config = aiohttp.TraceConfig()
+    config.on_response_chunk_received.append(on_chunk)
+    return config
+
+
+#: Upper bounds of the latency buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+#: Upper bounds of the response size buckets, in bytes.
+SIZE_BUCKETS = tuple(float(4**n * 256) for n in range(10))
+#: Upper bounds of the row count buckets.
+ROW_BUCKETS = tuple(float(10**n) for n in range(7))
+
+
+class Histogram:
+    """Counts of observations per bucket, as in a Prometheus histogram."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[float, int]]:
+        """Yields every upper bound, ending with infinity, and the observations under it."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates a quantile by interpolating within its bucket, as
+        Prometheus' histogram_quantile does. None without observations.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, below = 0.0, 0
+        for bound, total in self.cumulative():
+            if total >= rank and total > below:
+                if bound == float("inf"):
+                    return lower
+                return lower + (bound - lower) * (rank - below) / (total - below)
+            lower, below = bound, total
+        return lower  # pragma: no cover
+
+
+class Metrics:
+    """Hook aggregating the requests of clients into histograms per query.
+
+    Tracks the latency, network and decode time, response size and rows of
+    every query, and its errors.
+    """
+
+    _histograms = (
+        (
+            "latency",
+            "gvol_request_duration_seconds",
+            "Request time, including queueing",
+            LATENCY_BUCKETS,
+        ),
+        (
+            "queue_wait",
+            "gvol_request_queue_seconds",
+            "Wait for the rate limiter and retries",
+            LATENCY_BUCKETS,
+        ),
+        (
+            "network",
+            "gvol_request_network_seconds",
+            "Time until the response was received",
+            LATENCY_BUCKETS,
+        ),
+        (
+            "decode",
+            "gvol_request_decode_seconds",
+            "Time spent decoding the response",
+            LATENCY_BUCKETS,
+        ),
+        ("bytes", "gvol_response_bytes", "Response size", SIZE_BUCKETS),
+        ("rows", "gvol_response_rows", "Rows in the response", ROW_BUCKETS),
+    )
+
+    def __init__(self) -> None:
+        self.histograms: Dict[str, Dict[str, Histogram]] = {
+            field: {} for field, *_ in self._histograms
+        }
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, call: Call) -> None:
+        with self._lock:
+            if call.error is not None:
+                key = (call.query, call.error)
+                self.errors[key] = self.errors.get(key, 0) + 1
+                return
+            for field, _, _, buckets in self._histograms:
+                histograms = self.histograms[field]
+                if call.query not in histograms:
+                    histograms[call.query] = Histogram(buckets)
+                histograms[call.query].observe(getattr(call, field))
+
+    def quantile(self, query: str, q: float, field: str = "latency") -> Optional[float]:
+        """Estimates a quantile of a query's latency, or of another measurement."""
+        with self._lock:
+            histogram = self.histograms[field].get(query)
+            return histogram.quantile(q) if histogram is not None else None
+
+    def prometheus(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for field, name, help, _ in self._histograms:
+                lines += [f"# HELP {name} {help}.", f"# TYPE {name} histogram"]
+                for query, histogram in sorted(self.histograms[field].items()):
+                    for bound, total in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(
+                            f'{name}_bucket{{query="{query}",le="{le}"}} {total}'
+                        )
+                    lines.append(f'{name}_sum{{query="{query}"}} {histogram.sum!r}')
+                    lines.append(f'{name}_count{{query="{query}"}} {histogram.count}')
+
+            lines += [
+                "# HELP gvol_request_errors_total Failed requests.",
+                "# TYPE gvol_request_errors_total counter",
+            ]
+            for (query, error), count in sorted(self.errors.items()):
+                lines.append(
+                    f'gvol_request_errors_total{{query="{query}",error="{error}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "") -> ThreadingHTTPServer:
+        """Serves the metrics for Prometheus to scrape from a background thread.
+
+        Returns the server, call its ``shutdown()`` to stop it.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        httpd = ThreadingHTTPServer((host, port), Handler)
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return httpd
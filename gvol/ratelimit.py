@@ -0,0 +1,223 @@
+"""Client-side rate limiting matching the GVol API plans."""
+import asyncio
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from gvol import schema
+from gvol.registry import registry
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+PLANS = {
+    "lite_plus": 10.0,
+    "pro": 30.0,
+    "enterprise": 30.0,
+}
+
+#: Share of the bucket each priority class leaves to the classes above it.
+#: "live" requests reserve tokens ahead of time like :class:`RateLimiter` does,
+#: the others only take tokens actually in the bucket.
+PRIORITIES: Dict[str, Optional[float]] = {
+    "live": None,
+    "default": 0.0,
+    "backfill": 0.5,
+}
+
+
+class RateLimiter:
+    """Token bucket shared by every request of a client, or of several clients.
+
+    The bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+    second. Each request takes ``costs.get(query, 1)`` tokens. A request
+    finding the bucket short reserves its tokens anyway and sleeps until they
+    have been refilled, so concurrent callers are served in arrival order at
+    exactly the sustained rate, without polling.
+
+    Args:
+        rate: tokens added per second, i.e. requests per second at cost 1
+        burst: bucket size, defaults to one second worth of tokens
+        costs: tokens taken by a request, per query name
+    """
+
+    #: Share of the bucket to leave untouched, None to reserve ahead of time.
+    floor: Optional[float] = None
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        costs: Optional[Dict[str, float]] = None,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.costs = costs or {}
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_plan(
+        cls,
+        plan: str,
+        burst: Optional[float] = None,
+        costs: Optional[Dict[str, float]] = None,
+        **kwargs: Any,
+    ) -> "RateLimiter":
+        """Returns a limiter for the rate of a plan: "lite_plus", "pro" or "enterprise"."""
+        try:
+            rate = PLANS[plan]
+        except KeyError:
+            raise ValueError(
+                f"Unknown plan {plan!r}, expected one of {tuple(PLANS)}"
+            ) from None
+        return cls(rate, burst, costs, **kwargs)
+
+    def reserve(self, query: Optional[str] = None) -> float:
+        """Takes the tokens for a request and returns how long to wait before sending it.
+
+        Limiters with a floor only take tokens available right away; when they
+        return a delay, nothing was taken and the request has to try again.
+        """
+        cost = self.costs.get(registry.base(query), 1.0) if query is not None else 1.0
+        with self._locked():
+            tokens, now = self._refill()
+            if self.floor is None:
+                tokens -= cost
+                delay = max(0.0, -tokens / self.rate)
+            else:
+                # A request costing more than the share above the floor waits
+                # for a full bucket instead of never being served.
+                required = min(self.floor * self.burst + cost, self.burst)
+                if tokens >= required:
+                    tokens -= cost
+                    delay = 0.0
+                else:
+                    delay = (required - tokens) / self.rate
+
+            self._store(tokens, now)
+            return delay
+
+    def pause(self, seconds: float) -> None:
+        """Holds every request back for ``seconds``, e.g. after the server throttled one."""
+        with self._locked():
+            tokens, now = self._refill()
+            self._store(min(tokens, -seconds * self.rate), now)
+
+    def acquire(self, query: Optional[str] = None) -> None:
+        """Blocks until a request may be sent."""
+        while True:
+            delay = self.reserve(query)
+            if delay:
+                time.sleep(delay)
+            if not delay or self.floor is None:
+                return
+
+    async def acquire_async(self, query: Optional[str] = None) -> None:
+        """Waits, without blocking the event loop, until a request may be sent."""
+        while True:
+            delay = self.reserve(query)
+            if delay:
+                await asyncio.sleep(delay)
+            if not delay or self.floor is None:
+                return
+
+    def _refill(self) -> Tuple[float, float]:
+        """Returns the tokens in the bucket and the current time."""
+        tokens, updated = self._load()
+        now = time.monotonic()
+        if now < updated:  # the host rebooted since the bucket was stored
+            updated = now - self.burst / self.rate
+        return min(self.burst, tokens + (now - updated) * self.rate), now
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    def _load(self) -> Tuple[float, float]:
+        return self._tokens, self._updated
+
+    def _store(self, tokens: float, updated: float) -> None:
+        self._tokens, self._updated = tokens, updated
+
+
+class SharedRateLimiter(RateLimiter):
+    """Token bucket shared by every process on a host through a locked file.
+
+    Collectors running in separate processes on one API key pass limiters
+    for the same file, so together they stay under the key's limit. Each
+    limiter has a priority class: "live" requests are served first, "default"
+    ones get the tokens live requests have not reserved, and "backfill" ones
+    only run while more than half the bucket is left::
+
+        live = SharedRateLimiter.for_plan("pro", priority="live")
+        backfill = SharedRateLimiter.for_plan("pro", priority="backfill")
+
+    POSIX only. The bucket keeps the rate and burst of the limiter using it,
+    so every process should use the same plan.
+
+    Args:
+        rate: tokens added per second, i.e. requests per second at cost 1
+        burst: bucket size, defaults to one second worth of tokens
+        costs: tokens taken by a request, per query name
+        priority: "live", "default" or "backfill"
+        path: bucket file, defaults to ``ratelimit`` under the gvol cache directory
+    """
+
+    _state = struct.Struct("dd")
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        costs: Optional[Dict[str, float]] = None,
+        priority: str = "default",
+        path: Optional[str] = None,
+    ) -> None:
+        if fcntl is None:
+            raise OSError("SharedRateLimiter requires fcntl file locks")
+        if priority not in PRIORITIES:
+            raise ValueError(
+                f"Unknown priority {priority!r}, expected one of {tuple(PRIORITIES)}"
+            )
+
+        super().__init__(rate, burst, costs)
+        self.priority = priority
+        self.floor = PRIORITIES[priority]
+        self.path = Path(path) if path else schema.cache_dir() / "ratelimit"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def __del__(self) -> None:
+        fd = getattr(self, "_fd", None)
+        if fd is not None:
+            os.close(fd)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _load(self) -> Tuple[float, float]:
+        data = os.pread(self._fd, self._state.size, 0)
+        if len(data) < self._state.size:
+            return self.burst, time.monotonic()
+        return self._state.unpack(data)
+
+    def _store(self, tokens: float, updated: float) -> None:
+        os.pwrite(self._fd, self._state.pack(tokens, updated), 0)
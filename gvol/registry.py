@@ -0,0 +1,168 @@
+"""Parsed query documents, shared by every client in the process.
+
+Each document in :mod:`gvol.queries` is parsed the first time it is used, and
+validated only once per schema instead of on every request.
+"""
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from gql import gql
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    GraphQLError,
+    GraphQLSchema,
+    NameNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    get_named_type,
+    is_leaf_type,
+    print_ast,
+    validate,
+)
+
+from gvol import queries
+from gvol.schema import schema_hash
+
+
+class QueryRegistry:
+    """Lazily parsed query documents keyed by their name in ``queries.py``."""
+
+    def __init__(self, module: ModuleType = queries) -> None:
+        self._module = module
+        self._documents: Dict[str, DocumentNode] = {}
+        self._projections: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+        self._validation_errors: Dict[Tuple[str, str], List[GraphQLError]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        if name in self._projections:
+            return True
+        return not name.startswith("_") and isinstance(getattr(self._module, name, None), str)
+
+    def __iter__(self) -> Iterator[str]:
+        """Yields the name of every query, projections included."""
+        yield from filter(self.__contains__, dir(self._module))
+        yield from list(self._projections)
+
+    @staticmethod
+    def base(name: str) -> str:
+        """Returns the name of the query a projection was made from."""
+        return name.partition("[")[0]
+
+    def source(self, name: str) -> str:
+        """Returns the GraphQL source of a query."""
+        if name in self._projections:
+            return self._projections[name]
+        if name not in self:
+            raise KeyError(f"Unknown query: {name}")
+        return getattr(self._module, name)
+
+    def name(self, source: str) -> Optional[str]:
+        """Returns the name of a query from its source, as written or printed."""
+        return self._source_names().get(source)
+
+    def _source_names(self) -> Dict[str, str]:
+        if not self._names:
+            names: Dict[str, str] = {}
+            for name in filter(self.__contains__, dir(self._module)):
+                names[self.source(name)] = name
+                names[print_ast(self.document(name))] = name
+            self._names.update(names)
+        return self._names
+
+    def project(self, name: str, fields: Sequence[str], schema: GraphQLSchema) -> str:
+        """Registers a query selecting only some fields of the rows of another.
+
+        Fields missing from the query but present on its row type in the schema
+        can be selected too. The projection is registered once, under a name
+        such as ``options_trades[date,price]`` that can be used wherever a
+        query name is.
+
+        Raises:
+            ValueError: if a field is not a scalar field of the rows
+        """
+        fields = tuple(dict.fromkeys(fields))
+        projected = f"{self.base(name)}[{','.join(fields)}]"
+        if projected in self._projections:
+            return projected
+        if not fields:
+            raise ValueError("Select at least one field")
+
+        operation: Any = self.document(self.base(name)).definitions[0]
+        root = operation.selection_set.selections[0]
+        assert schema.query_type is not None
+        row_type: Any = get_named_type(schema.query_type.fields[root.name.value].type)
+        selected = {
+            (field.alias or field.name).value: field
+            for field in root.selection_set.selections
+        }
+
+        selections = []
+        for field in fields:
+            if field in selected:
+                selections.append(selected[field])
+            elif field in row_type.fields and is_leaf_type(
+                get_named_type(row_type.fields[field].type)
+            ):
+                selections.append(
+                    FieldNode(name=NameNode(value=field), arguments=(), directives=())
+                )
+            else:
+                available = sorted(set(selected) | set(row_type.fields))
+                raise ValueError(
+                    f"{field!r} is not a field of {name} rows, expected one of {available}"
+                )
+
+        document = DocumentNode(
+            definitions=[
+                OperationDefinitionNode(
+                    operation=operation.operation,
+                    name=operation.name,
+                    variable_definitions=operation.variable_definitions,
+                    directives=operation.directives,
+                    selection_set=SelectionSetNode(
+                        selections=[
+                            FieldNode(
+                                alias=root.alias,
+                                name=root.name,
+                                arguments=root.arguments,
+                                directives=root.directives,
+                                selection_set=SelectionSetNode(selections=selections),
+                            )
+                        ]
+                    ),
+                )
+            ]
+        )
+        source = print_ast(document)
+        self._source_names().setdefault(source, projected)
+        self._projections.setdefault(projected, source)
+        return projected
+
+    def document(self, name: str) -> DocumentNode:
+        """Returns the parsed document for a query, parsing it on first use."""
+        try:
+            return self._documents[name]
+        except KeyError:
+            document = gql(self.source(name))
+        return self._documents.setdefault(name, document)
+
+    def validate(self, document: DocumentNode, schema: GraphQLSchema) -> None:
+        """Validates a document against a schema, raising the first error found.
+
+        The result is cached per document source and schema hash.
+        """
+        source = document.loc.source.body if document.loc else print_ast(document)
+        key = (source, schema_hash(schema))
+
+        try:
+            errors = self._validation_errors[key]
+        except KeyError:
+            errors = self._validation_errors.setdefault(key, validate(schema, document))
+
+        if errors:
+            raise errors[0]
+
+
+registry = QueryRegistry()
@@ -0,0 +1,120 @@
+"""Retrying failed requests with jittered exponential backoff."""
+import asyncio
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+import requests
+from gql.transport.exceptions import TransportServerError
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore
+
+RETRY_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+
+
+class RetryPolicy:
+    """When and how long to wait before sending a failed request again.
+
+    Connection errors, timeouts and HTTP 408, 429 and 5xx responses are retried
+    with "full jitter" backoff: a random delay of up to ``backoff * 2 ** n``
+    seconds, capped at ``max_backoff``. A Retry-After header takes precedence,
+    the server is waited for as long as it asks up to ``max_retry_after``.
+    Every GVol request is a read-only query, so any of them is safe to repeat.
+
+    Retries are counted per query in :attr:`retries`, and requests that still
+    failed after every attempt in :attr:`failures`.
+
+    Args:
+        attempts: maximum number of times a request is sent, 1 disables retries
+        backoff: base delay in seconds
+        max_backoff: longest delay between two attempts, in seconds
+        max_retry_after: longest Retry-After honoured, in seconds, longer ones
+            are cut to it, None honours any
+    """
+
+    def __init__(
+        self,
+        attempts: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_retry_after: Optional[float] = None,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError(f"attempts must be at least 1, got {attempts}")
+
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.retries: Counter = Counter()
+        self.failures: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def retryable(self, error: BaseException) -> bool:
+        if isinstance(error, TransportServerError):
+            return error.code in RETRY_STATUSES
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if aiohttp is not None and isinstance(error, aiohttp.ClientConnectionError):
+            return True
+        return isinstance(error, asyncio.TimeoutError)
+
+    def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """Returns how long to wait after the given failed attempt, counting from 0."""
+        retry_after = retry_after_seconds(headers)
+        if retry_after is not None:
+            if self.max_retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def should_retry(self, query: str, attempt: int, error: BaseException) -> bool:
+        """Records a failed attempt and returns whether to send the request again."""
+        with self._lock:
+            if attempt + 1 < self.attempts and self.retryable(error):
+                self.retries[query] += 1
+                return True
+            self.failures[query] += 1
+            return False
+
+
+def response_headers(error: BaseException) -> Optional[Mapping[str, str]]:
+    """Returns the headers of the failed response an error was raised for.
+
+    The transports raise TransportServerError from the requests or aiohttp
+    error of the response, which holds its headers. Reading them from the
+    error rather than from the transport keeps concurrent requests apart.
+    """
+    cause: Optional[BaseException] = error
+    while cause is not None:
+        response = getattr(cause, "response", None)
+        if isinstance(response, requests.Response):
+            return response.headers
+        if aiohttp is not None and isinstance(cause, aiohttp.ClientResponseError):
+            return cause.headers
+        cause = cause.__cause__
+    return None
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Parses a Retry-After header, given in seconds or as an HTTP date."""
+    value: Any = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
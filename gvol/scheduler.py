@@ -0,0 +1,309 @@
+"""Polling many live endpoints at their own cadence within one rate budget.
+
+Example::
+
+    scheduler = Scheduler(gvol_client, rate=30)
+    for exchange in "deribit", "okex", "bybit":
+        scheduler.add("futures_orderbook", period=1, priority=1, exchange=exchange)
+    scheduler.add("options_orderbook_details", period=5, exchange="deribit")
+
+    with scheduler:
+        ...
+        scheduler.report()
+
+Instead of polling from a background thread, an application loop of its own
+can call ``scheduler.run_pending()`` to poll the feeds that are due.
+"""
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from gvol.async_client import AsyncGVol
+from gvol.client import GVol
+
+
+class Freshness(NamedTuple):
+    """How up to date a feed has been kept.
+
+    ``planned`` is None while the feed is shed, ``achieved`` is the mean time
+    between updates and ``age`` the time since the last one, None before two,
+    respectively one, updates.
+    """
+
+    target: float
+    planned: Optional[float]
+    achieved: Optional[float]
+    age: Optional[float]
+    updates: int
+    errors: int
+    skipped: int
+
+
+class Feed:
+    """An endpoint call polled by a :class:`Scheduler`."""
+
+    def __init__(
+        self,
+        method: str,
+        variable_values: Dict[str, Any],
+        period: float,
+        priority: int,
+        callback: Optional[Callable[["Feed", Any], None]],
+        cost: float,
+    ) -> None:
+        self.method = method
+        self.variable_values = variable_values
+        self.period = period
+        self.priority = priority
+        self.callback = callback
+        self.cost = cost
+        self.planned: Optional[float] = period
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.in_flight = False
+        self.updates = 0
+        self.errors = 0
+        self.skipped = 0
+        self.first_update: Optional[float] = None
+        self.last_update: Optional[float] = None
+
+    def __repr__(self) -> str:
+        arguments = ", ".join(f"{k}={v!r}" for k, v in self.variable_values.items())
+        return f"Feed({self.method}({arguments}), period={self.period})"
+
+    def freshness(self, now: float) -> Freshness:
+        achieved = None
+        if self.updates > 1:
+            assert self.first_update is not None and self.last_update is not None
+            achieved = (self.last_update - self.first_update) / (self.updates - 1)
+        age = now - self.last_update if self.last_update is not None else None
+        return Freshness(
+            self.period, self.planned, achieved, age, self.updates, self.errors, self.skipped
+        )
+
+
+class Scheduler:
+    """Polls registered feeds, spreading their requests within a rate budget.
+
+    Every feed asks for one request per ``period`` seconds. While the feeds
+    together ask for more than ``rate`` tokens per second, the scheduler
+    serves priorities from the highest down: the highest priorities keep their
+    period, the first one that does not fit in what is left has its periods
+    stretched evenly to fit, and the ones below it are shed until the budget
+    allows them again. Requests are sent in deadline order from a thread pool;
+    a feed still waiting on its previous request skips its turn.
+
+    Args:
+        gvol_client: client the endpoint methods are called on, an AsyncGVol
+            is rejected as the feeds are polled from threads
+        rate: budget in tokens per second, defaults to the rate of the
+            client's rate limiter, whose costs are also used
+        workers: number of requests in flight at once
+        clock: returns the current time in seconds, time.monotonic by default
+    """
+
+    def __init__(
+        self,
+        gvol_client: GVol,
+        rate: Optional[float] = None,
+        workers: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if isinstance(gvol_client, AsyncGVol):
+            raise TypeError("Scheduler needs a GVol client, not an AsyncGVol")
+
+        limiter = gvol_client._rate_limiter
+        if rate is None:
+            if limiter is None:
+                raise ValueError("Pass a rate or give the client a rate_limiter")
+            rate = limiter.rate
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+
+        self.gvol_client = gvol_client
+        self.rate = rate
+        self.costs = limiter.costs if limiter is not None else {}
+        self.feeds: List[Feed] = []
+        self._workers = workers
+        self._clock = clock
+        self._queue: List[Tuple[float, int, int, Feed]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stopped = True
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Scheduler":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def add(
+        self,
+        method: str,
+        period: float,
+        priority: int = 0,
+        callback: Optional[Callable[[Feed, Any], None]] = None,
+        **variable_values: Any,
+    ) -> Feed:
+        """Registers a feed and replans the budget.
+
+        Args:
+            method: name of the endpoint method, e.g. "futures_orderbook"
+            period: target time between requests, in seconds
+            priority: feeds with higher priorities are served first
+            callback: called with the feed and every result, from a pool thread
+            variable_values: arguments of the endpoint method
+        """
+        if not callable(getattr(self.gvol_client, method, None)):
+            raise ValueError(f"Unknown endpoint method: {method}")
+        if period <= 0:
+            raise ValueError(f"period must be positive, got {period}")
+
+        feed = Feed(
+            method, variable_values, period, priority, callback, self.costs.get(method, 1.0)
+        )
+        with self._lock:
+            self.feeds.append(feed)
+            self._plan()
+            self._push(self._clock(), feed)
+            self._wake.notify()
+        return feed
+
+    def remove(self, feed: Feed) -> None:
+        """Stops polling a feed and replans the budget."""
+        with self._lock:
+            self.feeds.remove(feed)
+            self._queue = [entry for entry in self._queue if entry[-1] is not feed]
+            heapq.heapify(self._queue)
+            self._plan()
+
+    def report(self) -> Dict[Feed, Freshness]:
+        """Returns the freshness of every feed."""
+        now = self._clock()
+        with self._lock:
+            return {feed: feed.freshness(now) for feed in self.feeds}
+
+    def start(self) -> None:
+        """Starts polling in a background thread."""
+        with self._lock:
+            if not self._stopped:
+                return
+            self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops polling and waits for the requests in flight."""
+        with self._lock:
+            self._stopped = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_pending(self) -> int:
+        """Polls the feeds that are due in the calling thread, returning how many.
+
+        For driving the scheduler from a loop of one's own instead of start().
+        """
+        polled = 0
+        while True:
+            with self._lock:
+                feed, _ = self._due(self._clock())
+                if feed is None:
+                    return polled
+                claimed = self._claim(feed)
+            if claimed:
+                self._poll(feed)
+                polled += 1
+
+    def _plan(self) -> None:
+        """Sets the planned period of every feed, None for shed feeds."""
+        budget = self.rate
+        for priority in sorted({feed.priority for feed in self.feeds}, reverse=True):
+            level = [feed for feed in self.feeds if feed.priority == priority]
+            demand = sum(feed.cost / feed.period for feed in level)
+            stretch = 1.0 if demand <= budget else demand / budget if budget > 0 else None
+            for feed in level:
+                feed.planned = feed.period * stretch if stretch is not None else None
+            budget = max(0.0, budget - demand)
+
+    def _run(self) -> None:
+        with ThreadPoolExecutor(self._workers) as executor:
+            while True:
+                with self._lock:
+                    feed = self._next()
+                    if feed is None:
+                        return
+                    if self._claim(feed):
+                        executor.submit(self._poll, feed)
+
+    def _claim(self, feed: Feed) -> bool:
+        """Marks a feed in flight, False if its previous request still is."""
+        if feed.in_flight:
+            feed.skipped += 1
+            return False
+        feed.in_flight = True
+        return True
+
+    def _next(self) -> Optional[Feed]:
+        """Waits for the next feed due and reschedules it, None once stopped."""
+        while not self._stopped:
+            feed, wait = self._due(self._clock())
+            if feed is not None:
+                return feed
+            self._wake.wait(wait)
+        return None
+
+    def _due(self, now: float) -> Tuple[Optional[Feed], Optional[float]]:
+        """Pops the next feed due and reschedules it.
+
+        Returns:
+            the feed, or None and the time until the next one is due, None
+            without feeds
+        """
+        while self._queue:
+            due, _, _, feed = self._queue[0]
+            if due > now:
+                return None, due - now
+            heapq.heappop(self._queue)
+            if feed.planned is None:
+                # Shed feeds are looked at again once a period, in case the
+                # budget freed up.
+                self._push(now + feed.period, feed)
+                continue
+            next_due = due + feed.planned
+            if next_due <= now:
+                # Running a period behind: start over rather than burst to catch up.
+                next_due = now + feed.planned
+            self._push(next_due, feed)
+            return feed, None
+        return None, None
+
+    def _push(self, due: float, feed: Feed) -> None:
+        heapq.heappush(self._queue, (due, -feed.priority, id(feed), feed))
+
+    def _poll(self, feed: Feed) -> None:
+        try:
+            result = getattr(self.gvol_client, feed.method)(**feed.variable_values)
+        except Exception as e:
+            with self._lock:
+                feed.in_flight = False
+                feed.errors += 1
+                feed.error = e
+            return
+
+        now = self._clock()
+        with self._lock:
+            feed.in_flight = False
+            feed.result = result
+            feed.updates += 1
+            feed.last_update = now
+            if feed.first_update is None:
+                feed.first_update = now
+        if feed.callback is not None:
+            feed.callback(feed, result)
@@ -0,0 +1,92 @@
+"""Local copies of the GVol GraphQL schema.
+
+Clients validate their queries against a schema snapshot shipped with the
+package, so constructing one needs no network I/O. ``GVol.refresh_schema``
+stores a fresh introspection of the API in the local cache directory, and that
+copy is preferred over the bundled snapshot from then on, as long as it was
+introspected by the installed version of gvol: a copy saved before an upgrade
+may be older than the snapshot the upgrade bundles, and is ignored.
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from graphql import GraphQLSchema, build_ast_schema, parse, print_schema
+
+from gvol import __version__
+
+BUNDLED_SCHEMA_PATH = Path(__file__).with_name("schema.graphql")
+
+_CACHED_HEADER = "# GVol API schema introspected by gvol {version}.\n"
+
+
+def cache_dir() -> Path:
+    """Returns the directory for data gvol persists locally.
+
+    ``$GVOL_CACHE_DIR`` if set, otherwise ``gvol`` under the user cache directory.
+    """
+    if os.environ.get("GVOL_CACHE_DIR"):
+        return Path(os.environ["GVOL_CACHE_DIR"])
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "gvol"
+
+
+def cached_schema_path() -> Path:
+    return cache_dir() / "schema.graphql"
+
+
+def load_schema(path: Optional[Path] = None) -> GraphQLSchema:
+    """Loads the local schema.
+
+    Args:
+        path: schema file to load, defaults to the cached schema when one has
+            been saved by this version of gvol and to the bundled snapshot
+            otherwise
+
+    Returns:
+        GraphQLSchema, shared by every client in the process
+    """
+    if path is None:
+        path = cached_schema_path()
+        if not _saved_by_this_version(path):
+            path = BUNDLED_SCHEMA_PATH
+
+    return _load_schema(str(path), path.stat().st_mtime)
+
+
+def _saved_by_this_version(path: Path) -> bool:
+    try:
+        with open(path, encoding="utf-8") as f:
+            header = f.readline()
+    except FileNotFoundError:
+        return False
+    return header == _CACHED_HEADER.format(version=__version__)
+
+
+@lru_cache(maxsize=None)
+def _load_schema(path: str, mtime: float) -> GraphQLSchema:
+    with open(path, encoding="utf-8") as f:
+        return build_ast_schema(parse(f.read()))
+
+
+def save_schema(schema: GraphQLSchema, path: Optional[Path] = None) -> Path:
+    """Persists a schema to the local cache, returning the file written."""
+    if path is None:
+        path = cached_schema_path()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(_CACHED_HEADER.format(version=__version__))
+        f.write("\n")
+        f.write(print_schema(schema))
+    os.replace(tmp_path, path)
+
+    return path
+
+
+@lru_cache(maxsize=None)
+def schema_hash(schema: GraphQLSchema) -> str:
+    """Returns a short content hash identifying a schema."""
+    return hashlib.sha256(print_schema(schema).encode()).hexdigest()[:16]
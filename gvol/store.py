@@ -0,0 +1,355 @@
+"""Local SQLite store of endpoint rows, indexed for point-in-time and range lookups.
+
+Every query gets a table named after it, with a column per field of its rows
+and per variable that is not a date (e.g. ``symbol`` or ``exchange``).
+Timestamps are stored as UTC milliseconds. Rows are keyed on those variables,
+their timestamp and the instrument fields (``tradeId``, ``instrumentName``,
+``expiration``, ``strike``, ``putCall``) they have, so storing a response
+again updates its rows instead of duplicating them. Tables are indexed on
+time, on instrument then time, and on expiration, strike and put/call then
+time.
+
+A client given a store adds the rows of every response it receives::
+
+    store = Store("gvol.sqlite")
+    gvol_client = GVol(header="x-oracle", gvol_api_key="...", store=store)
+    gvol_client.HourlyInstrumentImpliedVolandOI(
+        symbol="BTC", dateStart="2022-10-01", dateEnd="2022-12-31",
+        expiration="30DEC22", strike="40000", putCall="C",
+    )
+
+    store.select(
+        "HourlyInstrumentImpliedVolandOI", "2022-10-01", "2023-01-01",
+        instrumentName="BTC-30DEC22-40000-C",
+    )
+    store.at("options_greeks_hour", "2022-11-15 12:00", symbol="BTC", strike=40000.0)
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from graphql import get_named_type, is_leaf_type
+
+from gvol import columnar, ranges, schema
+from gvol.registry import registry
+
+# Fields holding row timestamps, the first one a query has is its time column.
+TIME_FIELDS = ("txTs", "date", "ts", "timerange", "timeBucket")
+
+# Fields identifying the instrument, or trade, of a row.
+KEY_FIELDS = ("tradeId", "instrumentName", "expiration", "strike", "putCall")
+
+Time = Union[str, int, float, datetime]
+
+
+class Table(NamedTuple):
+    """Layout of the table of a query."""
+
+    name: str
+    columns: Dict[str, str]
+    variables: Tuple[str, ...]
+    time: Optional[str]
+    key: Tuple[str, ...]
+    json: Tuple[str, ...]
+
+
+def to_ms(value: Time) -> int:
+    """Converts a time, as a date string, datetime (UTC if naive) or
+    milliseconds, to UTC milliseconds.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(value)
+    except ValueError:
+        return to_ms(ranges.parse_datetime(value.replace("T", " ")[:19]))
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _key(columns: Tuple[str, ...]) -> str:
+    """Expressions of the unique index of a table, which treat nulls as equal."""
+    return ", ".join(f"ifnull({_quote(column)}, '')" for column in columns)
+
+
+class Store:
+    """SQLite database of the rows of endpoint responses.
+
+    Only queries with a single root field can be stored, see :meth:`accepts`.
+    The store can be shared by threads, and read by other processes while
+    it is written.
+
+    Args:
+        path: database file, defaults to ``store.sqlite`` in the gvol cache directory
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path) if path else schema.cache_dir() / "store.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Table] = {}
+
+    def __enter__(self) -> "Store":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def accepts(query: str) -> bool:
+        """Whether the rows of a query can be stored."""
+        definition: Any = registry.document(query).definitions[0]
+        return len(definition.selection_set.selections) == 1
+
+    def insert(
+        self, query: str, variable_values: Optional[Dict[str, Any]], result: Dict
+    ) -> int:
+        """Stores the rows of a raw response and returns how many there were.
+
+        Args:
+            query: name of the query document in :mod:`gvol.queries`
+            variable_values: variables the response was requested with
+            result: raw response, a list of row dicts keyed by the root field
+        """
+        rows = next(iter(result.values()), None) if result else None
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return 0
+
+        variable_values = variable_values or {}
+        with self._lock:
+            table = self._table(query, rows[0])
+            fields = [name for name in rows[0] if name not in table.variables]
+            names = list(table.variables) + fields
+            values = [
+                [self._encode(table, name, variable_values.get(name)) for name in table.variables]
+                + [self._encode(table, name, row.get(name)) for name in fields]
+                for row in rows
+            ]
+            # Responses of projections update their fields of the stored rows only.
+            updates = [name for name in fields if name not in table.key]
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT INTO {_quote(table.name)} ({', '.join(map(_quote, names))}) "
+                    f"VALUES ({', '.join('?' * len(names))}) "
+                    f"ON CONFLICT ({_key(table.key)}) DO "
+                    + (
+                        "UPDATE SET "
+                        + ", ".join(f"{_quote(name)} = excluded.{_quote(name)}" for name in updates)
+                        if updates
+                        else "NOTHING"
+                    ),
+                    values,
+                )
+        return len(rows)
+
+    def select(
+        self,
+        query: str,
+        start: Optional[Time] = None,
+        end: Optional[Time] = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """Returns the stored rows of a query from start (inclusive) to end
+        (exclusive), in time order.
+
+        Args:
+            query: name of the query document in :mod:`gvol.queries`
+            start: earliest time, e.g. "2022-10-01", no bound if None
+            end: time after the last row, no bound if None
+            filters: values of columns, e.g. ``instrumentName="BTC-30DEC22-40000-C"``
+        """
+        with self._lock:
+            table = self._table(query)
+            where, parameters = self._where(table, filters)
+            if start is not None or end is not None:
+                if table.time is None:
+                    raise ValueError(f"{query} rows have no timestamp")
+                if start is not None:
+                    where.append(f"{_quote(table.time)} >= ?")
+                    parameters.append(to_ms(start))
+                if end is not None:
+                    where.append(f"{_quote(table.time)} < ?")
+                    parameters.append(to_ms(end))
+            order = f" ORDER BY {_quote(table.time)}" if table.time else ""
+            cursor = self._connection.execute(
+                f"SELECT * FROM {_quote(table.name)}"
+                f"{' WHERE ' + ' AND '.join(where) if where else ''}{order}",
+                parameters,
+            )
+            return self._decode(table, cursor)
+
+    def at(self, query: str, when: Time, **filters: Any) -> List[Dict[str, Any]]:
+        """Returns the latest row of every instrument at or before a time.
+
+        Args:
+            query: name of the query document in :mod:`gvol.queries`
+            when: point in time, e.g. "2022-11-15 12:00"
+            filters: values of columns, e.g. ``strike=40000.0``
+        """
+        with self._lock:
+            table = self._table(query)
+            if table.time is None:
+                raise ValueError(f"{query} rows have no timestamp")
+            where, parameters = self._where(table, filters)
+            where.append(f"{_quote(table.time)} <= ?")
+            parameters.append(to_ms(when))
+            group = [name for name in table.key if name != table.time]
+            columns = ", ".join(map(_quote, table.columns))
+            # SQLite returns the other columns of the row holding the MAX().
+            cursor = self._connection.execute(
+                f"SELECT {columns}, MAX({_quote(table.time)}) FROM {_quote(table.name)} "
+                f"WHERE {' AND '.join(where)}"
+                f"{' GROUP BY ' + ', '.join(map(_quote, group)) if group else ''}",
+                parameters,
+            )
+            return [
+                {name: row[name] for name in table.columns}
+                for row in self._decode(table, cursor)
+            ]
+
+    def _where(
+        self, table: Table, filters: Dict[str, Any]
+    ) -> Tuple[List[str], List[Any]]:
+        where, parameters = [], []
+        for name, value in filters.items():
+            if name not in table.columns:
+                raise ValueError(
+                    f"{name!r} is not a column of {table.name}, "
+                    f"expected one of {sorted(table.columns)}"
+                )
+            if value is None:
+                where.append(f"{_quote(name)} IS NULL")
+            else:
+                where.append(f"{_quote(name)} = ?")
+                parameters.append(self._encode(table, name, value))
+        return where, parameters
+
+    def _encode(self, table: Table, name: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if name == table.time or name in columnar.TIMESTAMP_FIELDS:
+            try:
+                return to_ms(value)
+            except ValueError:
+                return value
+        if name in table.json or isinstance(value, (dict, list)):
+            return json.dumps(value, sort_keys=True)
+        return value
+
+    def _decode(self, table: Table, cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        names = [description[0] for description in cursor.description]
+        rows = [dict(zip(names, values)) for values in cursor]
+        for row in rows:
+            for name in table.json:
+                if row.get(name) is not None:
+                    row[name] = json.loads(row[name])
+        return rows
+
+    def _table(self, query: str, row: Optional[Dict[str, Any]] = None) -> Table:
+        """Returns the table of a query, creating it or adding the columns of
+        ``row`` it lacks.
+        """
+        name = registry.base(query)
+        if name not in self._tables:
+            if not self.accepts(name):
+                raise ValueError(f"{name} has several root fields and cannot be stored")
+            self._tables[name] = self._create(name)
+        table = self._tables[name]
+
+        missing = [field for field in row or () if field not in table.columns]
+        if missing:
+            with self._connection:
+                for field in missing:
+                    self._connection.execute(
+                        f"ALTER TABLE {_quote(name)} ADD COLUMN {_quote(field)}"
+                    )
+            table = self._tables[name] = table._replace(
+                columns=dict(table.columns, **{field: "" for field in missing})
+            )
+        return table
+
+    def _create(self, query: str) -> Table:
+        client_schema = schema.load_schema()
+        definition: Any = registry.document(query).definitions[0]
+        root = definition.selection_set.selections[0]
+        assert client_schema.query_type is not None
+        row_type: Any = get_named_type(client_schema.query_type.fields[root.name.value].type)
+        ((_, fields),) = columnar.columns(query, client_schema).items()
+        field_names = {
+            (field.alias or field.name).value: field.name.value
+            for field in root.selection_set.selections
+        }
+
+        columns: Dict[str, str] = {}
+        variables = []
+        for variable in definition.variable_definitions:
+            variable_name = variable.variable.name.value
+            if not variable_name.startswith("date") and variable_name not in field_names:
+                variables.append(variable_name)
+                columns[variable_name] = ""
+        json_columns = []
+        for field, kind in fields:
+            graphql_field = getattr(row_type, "fields", {}).get(field_names[field])
+            named: Any = get_named_type(graphql_field.type) if graphql_field else None
+            if kind == "timestamp":
+                columns[field] = "INTEGER"
+            elif kind == "float":
+                columns[field] = "REAL"
+            elif named is not None and not is_leaf_type(named):
+                columns[field] = "TEXT"
+                json_columns.append(field)
+            elif named is not None and named.name in ("Int", "Boolean"):
+                columns[field] = "INTEGER"
+            else:
+                columns[field] = "TEXT"
+
+        time = next((field for field in TIME_FIELDS if field in columns), None)
+        key = tuple(variables) + tuple(
+            field for field in (time,) + KEY_FIELDS if field is not None and field in columns
+        )
+        indexes: List[Tuple[str, ...]] = [(time,) if time else ()]
+        if "instrumentName" in columns:
+            indexes.append(("instrumentName",) + ((time,) if time else ()))
+        contract = tuple(field for field in ("expiration", "strike", "putCall") if field in columns)
+        if contract:
+            indexes.append(contract + ((time,) if time else ()))
+
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(query)} ("
+                + ", ".join(f"{_quote(column)} {kind}".strip() for column, kind in columns.items())
+                + ")"
+            )
+            self._connection.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(query + '_key')} "
+                f"ON {_quote(query)} ({_key(key)})"
+            )
+            for index in filter(None, indexes):
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(query + '_' + '_'.join(index))} "
+                    f"ON {_quote(query)} ({', '.join(map(_quote, index))})"
+                )
+            existing = {
+                column[1]
+                for column in self._connection.execute(f"PRAGMA table_info({_quote(query)})")
+            }
+        for column in existing - set(columns):
+            columns[column] = ""
+        return Table(query, columns, tuple(variables), time, key, tuple(json_columns))
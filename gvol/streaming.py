@@ -0,0 +1,179 @@
+"""Incremental parsing of GraphQL responses, one row at a time.
+
+``{"data": {"<root>": [row, row, ...]}}`` is parsed as it arrives, so only
+the current network chunk and the row being decoded are held in memory,
+however large the whole response is.
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from gql.transport.exceptions import TransportProtocolError, TransportQueryError
+
+CHUNK_SIZE = 2**16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class _Incomplete(Exception):
+    """More input is needed to parse the next token."""
+
+
+class RecordParser:
+    """Push parser yielding the rows of one root field of a GraphQL response.
+
+    Feed it the body in chunks of any size; :meth:`feed` returns the rows
+    completed so far and :meth:`close` checks the response was complete and
+    free of GraphQL errors.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.errors: Optional[List[Dict[str, Any]]] = None
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._state = self._top_open
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        self._buffer = self._buffer[self._pos :] + self._text.decode(chunk)
+        self._pos = 0
+        return self._parse()
+
+    def close(self) -> List[Dict[str, Any]]:
+        self._buffer = self._buffer[self._pos :] + self._text.decode(b"", final=True)
+        self._pos = 0
+        self._eof = True
+        records = self._parse()
+
+        if self.errors:
+            raise TransportQueryError(str(self.errors[0]), errors=self.errors)
+        if self._state != self._done:
+            raise TransportProtocolError("Incomplete JSON response from the server")
+        return records
+
+    def _parse(self) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        while self._state != self._done:
+            start = self._pos
+            try:
+                self._state = self._state(records)
+            except _Incomplete:
+                self._pos = start
+                break
+        return records
+
+    def _skip(self) -> str:
+        """Skips whitespace and returns the next character."""
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+        if self._pos >= len(self._buffer):
+            raise _Incomplete
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str) -> None:
+        if self._skip() != char:
+            raise TransportProtocolError(
+                f"Unexpected JSON response from the server: expected {char!r} "
+                f"at {self._buffer[self._pos:self._pos + 40]!r}"
+            )
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._skip()
+        try:
+            value, end = _decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise TransportProtocolError("Invalid JSON response from the server")
+            raise _Incomplete
+        # A number running up to the end of the buffer may continue in the next chunk.
+        if end == len(self._buffer) and not self._eof and _is_number(value):
+            raise _Incomplete
+        self._pos = end
+        return value
+
+    def _key(self) -> Optional[str]:
+        """Returns the next key of an object, or None at its end."""
+        char = self._skip()
+        if char == ",":
+            self._pos += 1
+            char = self._skip()
+        if char == "}":
+            self._pos += 1
+            return None
+        key = self._value()
+        self._expect(":")
+        return key
+
+    def _top_open(self, records: List) -> Any:
+        self._expect("{")
+        return self._top_key
+
+    def _top_key(self, records: List) -> Any:
+        key = self._key()
+        if key is None:
+            return self._done
+        if key == "data":
+            return self._data_open
+        value = self._value()
+        if key == "errors":
+            self.errors = value
+        return self._top_key
+
+    def _data_open(self, records: List) -> Any:
+        if self._skip() != "{":
+            self._value()
+            return self._top_key
+        self._pos += 1
+        return self._data_key
+
+    def _data_key(self, records: List) -> Any:
+        key = self._key()
+        if key is None:
+            return self._top_key
+        if key == self.root and self._skip() == "[":
+            self._pos += 1
+            return self._rows
+        self._value()
+        return self._data_key
+
+    def _rows(self, records: List) -> Any:
+        char = self._skip()
+        if char == ",":
+            self._pos += 1
+            char = self._skip()
+        if char == "]":
+            self._pos += 1
+            return self._data_key
+        records.append(self._value())
+        return self._rows
+
+    def _done(self, records: List) -> Any:  # pragma: no cover
+        return self._done
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def records(root: str, chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yields the rows of ``root`` from a response body given in chunks."""
+    parser = RecordParser(root)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Groups rows into lists of ``size``, the last one possibly shorter."""
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,104 @@
+"""Subscription-style iteration over real-time queries.
+
+With a websocket-capable GraphQL server, and the ``websockets`` extra
+installed, a query is subscribed to as a GraphQL subscription. Otherwise it is
+polled, faster while its result keeps changing and slower while it does not.
+"""
+import asyncio
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from gql import Client
+from graphql import DocumentNode, OperationDefinitionNode, OperationType
+
+from gvol.registry import registry
+
+try:
+    from gql.transport.websockets import WebsocketsTransport
+except ImportError:  # pragma: no cover
+    WebsocketsTransport = None  # type: ignore
+
+
+class AdaptiveInterval:
+    """Polling interval dropping to min_interval when a result changes and
+    growing by ``factor`` up to max_interval while it does not.
+    """
+
+    def __init__(
+        self, min_interval: float = 0.1, max_interval: float = 5.0, factor: float = 1.5
+    ) -> None:
+        if not 0 <= min_interval <= max_interval:
+            raise ValueError("Expected 0 <= min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.interval = min_interval
+
+    def update(self, changed: bool) -> float:
+        """Returns the time to wait before the next poll."""
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(
+                self.max_interval, max(self.interval, 0.001) * self.factor
+            )
+        return self.interval
+
+
+async def poll(
+    fetch: Callable[[], Awaitable[Any]], interval: AdaptiveInterval
+) -> AsyncIterator[Any]:
+    """Awaits ``fetch`` repeatedly and yields its result whenever it changes."""
+    previous = None
+    while True:
+        result = await fetch()
+        changed = result != previous
+        if changed:
+            previous = result
+            yield result
+        await asyncio.sleep(interval.update(changed))
+
+
+def websockets_available() -> bool:
+    return WebsocketsTransport is not None
+
+
+@lru_cache(maxsize=None)
+def document(query: str) -> DocumentNode:
+    """Returns a registered query as a subscription operation."""
+    operation = registry.document(query).definitions[0]
+    assert isinstance(operation, OperationDefinitionNode)
+    return DocumentNode(
+        definitions=[
+            OperationDefinitionNode(
+                operation=OperationType.SUBSCRIPTION,
+                name=operation.name,
+                variable_definitions=operation.variable_definitions,
+                directives=operation.directives,
+                selection_set=operation.selection_set,
+            )
+        ]
+    )
+
+
+async def subscribe(
+    url: str,
+    headers: Dict[str, str],
+    query: str,
+    variable_values: Optional[Dict[str, Any]],
+) -> AsyncIterator[Any]:
+    """Subscribes to a query over a graphql-ws websocket and yields its results.
+
+    The local schema has no subscription type, so documents are not validated.
+    """
+    if WebsocketsTransport is None:
+        raise ImportError(
+            "Subscribing over websockets requires the websockets package, "
+            "install it with `pip install gvol[websockets]`"
+        )
+    transport = WebsocketsTransport(url=url, headers=headers)
+    async with Client(transport=transport) as session:
+        async for result in session.subscribe(
+            document(query), variable_values=variable_values
+        ):
+            yield result
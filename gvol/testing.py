@@ -0,0 +1,319 @@
+"""Offline stand-ins for the GVol API, for testing and benchmarking code built
+on the client.
+
+:class:`LocalServer` answers GraphQL POST requests for the queries of
+:mod:`gvol.queries`, alone or batched, with whatever its feed returns, so live
+data can be scripted::
+
+    books = iter([{"OrderbookData": [...]}, {"OrderbookData": [...]}])
+
+    with LocalServer(lambda query, variables: next(books)) as server:
+        gvol_client = GVol(header="x-oracle", gvol_api_key="test")
+        server.attach(gvol_client)
+        ...
+
+Real responses can be recorded to :class:`Fixtures` once, then replayed
+without a network, either directly by the client or by a server simulating
+the latency and bandwidth of the API::
+
+    record(gvol_client, "fixtures")
+    gvol_client.options_orderbook(symbol="BTC", exchange="deribit")
+
+    replay(gvol_client, "fixtures")
+    # or
+    with LocalServer(Fixtures("fixtures"), latency=0.05, bandwidth=2e6) as server:
+        server.attach(gvol_client)
+
+A feed raising :class:`StatusError` makes the server answer with an HTTP
+error, to script rate limiting or outages::
+
+    statuses = iter([429, 503])
+
+    def flaky(query, variables):
+        status = next(statuses, None)
+        if status is not None:
+            raise StatusError(status, {"Retry-After": "1"})
+        return {"OrderbookData": [...]}
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from gql.transport.requests import RequestsHTTPTransport
+from graphql import DocumentNode, ExecutionResult, print_ast
+
+from gvol import batch
+from gvol.async_client import AsyncGVol
+from gvol.cache import request_key
+from gvol.client import GVol
+from gvol.registry import registry
+
+Feed = Callable[[str, Dict[str, Any]], Any]
+"""Returns the ``data`` of the response to a query, given its name and variables."""
+
+#: Bytes written at a time by a server with a limited bandwidth.
+CHUNK_SIZE = 16 * 1024
+
+
+class StatusError(Exception):
+    """Raised by the feed of a :class:`LocalServer` to answer with an HTTP error.
+
+    Args:
+        status: HTTP status code of the response
+        headers: extra headers of the response, such as Retry-After
+    """
+
+    def __init__(self, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(status)
+        self.status = status
+        self.headers = headers or {}
+
+
+def query_name(document: Union[str, DocumentNode]) -> Optional[str]:
+    """Returns the name of a registered query from its source or document."""
+    if isinstance(document, DocumentNode):
+        document = document.loc.source.body if document.loc else print_ast(document)
+    return registry.name(document)
+
+
+class Fixtures:
+    """Responses of queries saved as JSON files, one per query and variables.
+
+    A ``Fixtures`` instance is a :data:`Feed` replaying the saved responses.
+
+    Args:
+        directory: where the files are kept, as ``<query>/<variables hash>.json``
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+
+    def __call__(self, query: str, variable_values: Dict[str, Any]) -> Any:
+        return self.load(query, variable_values)
+
+    def path(self, query: str, variable_values: Optional[Dict[str, Any]]) -> Path:
+        return self.directory / query / f"{request_key('', variable_values)[:16]}.json"
+
+    def load(self, query: str, variable_values: Optional[Dict[str, Any]]) -> Any:
+        """Returns the data of a saved response, raising KeyError if there is none."""
+        try:
+            with open(self.path(query, variable_values)) as f:
+                return json.load(f)["data"]
+        except FileNotFoundError:
+            raise KeyError(
+                f"No fixture for {query} with variables {variable_values}"
+            ) from None
+
+    def save(
+        self, query: str, variable_values: Optional[Dict[str, Any]], data: Any
+    ) -> None:
+        path = self.path(query, variable_values)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w") as f:
+            json.dump({"query": query, "variables": variable_values, "data": data}, f)
+        temporary.replace(path)
+
+
+class RecordingTransport(RequestsHTTPTransport):
+    """Transport saving the successful responses to registered queries to fixtures."""
+
+    def __init__(self, fixtures: Fixtures, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.fixtures = fixtures
+
+    def execute(  # type: ignore[override]
+        self,
+        document: DocumentNode,
+        variable_values: Optional[Dict[str, Any]] = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> ExecutionResult:
+        result = super().execute(document, variable_values, *args, **kwargs)
+        query = query_name(document)
+        if query is not None and not result.errors:
+            self.fixtures.save(query, variable_values, result.data)
+        return result
+
+
+class ReplayTransport(RequestsHTTPTransport):
+    """Transport answering registered queries from fixtures, without any network."""
+
+    def __init__(self, fixtures: Fixtures, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.fixtures = fixtures
+
+    def execute(  # type: ignore[override]
+        self,
+        document: DocumentNode,
+        variable_values: Optional[Dict[str, Any]] = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> ExecutionResult:
+        query = query_name(document)
+        if query is None:
+            raise KeyError("Only registered queries can be replayed")
+        return ExecutionResult(data=self.fixtures.load(query, variable_values))
+
+
+def _swap_transport(gvol_client: GVol, transport: RequestsHTTPTransport) -> None:
+    if isinstance(gvol_client, AsyncGVol):
+        raise TypeError(
+            "Fixtures are recorded and replayed by a GVol client, not an AsyncGVol, "
+            "use a LocalServer serving them instead"
+        )
+    gvol_client.close()
+    gvol_client._transport = gvol_client._client.transport = transport
+
+
+def record(gvol_client: GVol, directory: Union[str, Path]) -> Fixtures:
+    """Makes a client save the responses it gets from the API to fixtures.
+
+    Only requests to a single query are recorded, not batches or streams, and
+    only by a :class:`GVol` client, an ``AsyncGVol`` is rejected.
+    """
+    fixtures = Fixtures(directory)
+    _swap_transport(
+        gvol_client,
+        RecordingTransport(
+            fixtures, url=gvol_client._url, headers=gvol_client._api_headers
+        ),
+    )
+    return fixtures
+
+
+def replay(gvol_client: GVol, directory: Union[str, Path]) -> Fixtures:
+    """Makes a client answer queries from fixtures instead of the API.
+
+    Streams still go to the API, use a :class:`LocalServer` to replay them, or
+    to replay fixtures to an ``AsyncGVol``, which is rejected here.
+    """
+    fixtures = Fixtures(directory)
+    _swap_transport(
+        gvol_client,
+        ReplayTransport(fixtures, url=gvol_client._url, headers=gvol_client._api_headers),
+    )
+    return fixtures
+
+
+class LocalServer:
+    """GraphQL server on localhost serving responses from a feed.
+
+    A feed raising an exception is answered with a GraphQL error carrying its
+    message, or with an HTTP error for a :class:`StatusError`.
+
+    Args:
+        feed: callable returning the data of each response
+        host: interface to listen on
+        port: port to listen on, any free port if 0
+        latency: seconds to wait before answering each request
+        bandwidth: bytes per second each response is sent at, unlimited if None
+    """
+
+    def __init__(
+        self,
+        feed: Feed,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+    ) -> None:
+        self.feed = feed
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}/graphql"
+
+    def __enter__(self) -> "LocalServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def attach(self, gvol_client: GVol) -> None:
+        """Points a client, sync or async, at this server."""
+        gvol_client._url = self.url
+        for name in "_transport", "_aio_transport":
+            transport = getattr(gvol_client, name, None)
+            if transport is not None:
+                transport.url = self.url
+
+    def respond(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the response to a GraphQL request body."""
+        with self._lock:
+            self.requests += 1
+        source, variable_values = body.get("query", ""), body.get("variables") or {}
+        query = query_name(source)
+        try:
+            if query is not None:
+                return {"data": self.feed(query, variable_values)}
+            calls = batch.calls(source, variable_values)
+            if calls is None:
+                return {"errors": [{"message": "Unknown query"}]}
+            return {
+                "data": {
+                    f"b{n}_{field}": value
+                    for n, (name, values) in enumerate(calls)
+                    for field, value in self.feed(name, values or {}).items()
+                }
+            }
+        except StatusError:
+            raise
+        except Exception as e:
+            return {"errors": [{"message": str(e)}]}
+
+    def encode(self, body: Dict[str, Any]) -> bytes:
+        """Returns the encoded response to a GraphQL request body."""
+        return json.dumps(self.respond(body)).encode()
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                status, headers = 200, {}
+                try:
+                    response = server.encode(json.loads(body))
+                except StatusError as e:
+                    status, headers, response = e.status, e.headers, b"{}"
+                time.sleep(server.latency)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if server.bandwidth is None:
+                    self.wfile.write(response)
+                    return
+                for start in range(0, len(response), CHUNK_SIZE):
+                    chunk = response[start : start + CHUNK_SIZE]
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+                    time.sleep(len(chunk) / server.bandwidth)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,67 @@
+from typing import List
+
+from graphql import print_ast, validate
+
+from gvol import GVol, batch, schema
+from gvol.registry import registry
+from gvol.testing import LocalServer
+
+CALLS = [
+    ("options_atm_constant_lite", {"exchange": "deribit", "symbol": "BTC"}),
+    ("options_atm_constant_lite", {"exchange": "deribit", "symbol": "ETH"}),
+    ("options_termstructure", {"exchange": "deribit", "symbol": "BTC"}),
+]
+
+
+def test_merged_document_is_valid():
+    document = batch.document(tuple(query for query, _ in CALLS))
+    source = print_ast(document)
+
+    assert validate(schema.load_schema(), document) == []
+    assert "b1_FixedMaturityAtm: FixedMaturityAtm(" in source
+    assert "symbol: $b1_symbol" in source
+    assert "b2_CurrentOrderbookTermStructure: genericOrderbookTermStructure" in source
+    assert batch.document(("options_atm_constant_lite",) * 2 + ("options_termstructure",)) is document
+    assert batch.variables(CALLS)["b1_symbol"] == "ETH"
+
+
+class FakeGVol(GVol):
+    sent: List[str] = []
+
+    def _send(self, query, document, variable_values):
+        self.sent.append(query)
+        return {
+            "b0_FixedMaturityAtm": [{"symbol": variable_values["b0_symbol"], "n": 0}],
+            "b1_FixedMaturityAtm": [{"symbol": variable_values["b1_symbol"], "n": 1}],
+            "b2_CurrentOrderbookTermStructure": [{"symbol": "BTC", "n": 2}],
+        }
+
+
+def test_batch_splits_results_per_call():
+    gvol_client = FakeGVol("header", "gvol_api_key")
+    btc, eth, termstructure = gvol_client.batch(CALLS)
+
+    assert gvol_client.sent == ["batch"]
+    assert btc == {"FixedMaturityAtm": [{"symbol": "BTC", "n": 0}]}
+    assert eth == {"FixedMaturityAtm": [{"symbol": "ETH", "n": 1}]}
+    assert termstructure == {"CurrentOrderbookTermStructure": [{"symbol": "BTC", "n": 2}]}
+    assert gvol_client.batch([]) == []
+
+
+def test_merged_document_is_split_back_into_calls():
+    document = batch.document(tuple(query for query, _ in CALLS))
+    assert batch.calls(print_ast(document), batch.variables(CALLS)) == CALLS
+    assert batch.calls(registry.source("options_termstructure"), {}) is None
+    assert batch.calls("not graphql", {}) is None
+
+
+def test_local_server_answers_batches():
+    def feed(query, variables):
+        return {"Rows": [{"query": query, **variables}]}
+
+    with LocalServer(feed) as server:
+        gvol_client = GVol("header", "gvol_api_key")
+        server.attach(gvol_client)
+        results = gvol_client.batch(CALLS)
+        assert server.requests == 1
+    assert results == [{"Rows": [{"query": query, **values}]} for query, values in CALLS]
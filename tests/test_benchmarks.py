@@ -0,0 +1,80 @@
+import inspect
+import multiprocessing
+
+import pytest
+
+from benchmarks import fixtures
+from benchmarks.run import MODES, case_name, cases, compare, methods, run, run_isolated
+from gvol import GVol
+from gvol.testing import LocalServer
+
+
+def test_every_method_has_arguments_and_a_response():
+    for method in methods():
+        inspect.signature(getattr(GVol, method)).bind(None, **fixtures.arguments(method))
+        if method not in fixtures.ROWS:
+            response = fixtures.synthetic(method)
+            assert response and all(response.values())
+    for method in fixtures.RANGES:
+        inspect.signature(getattr(GVol, method)).bind(
+            None, **fixtures.range_arguments(method)
+        )
+
+    rows = fixtures.synthetic("options_orderbook_details")["UtilityRealtimeOptionbook"]
+    assert len(rows) == fixtures.ROWS["options_orderbook_details"]
+    assert isinstance(rows[0]["markIv"], float)
+
+
+def test_run_and_compare():
+    case = next(case for case in cases(["threaded"]) if case.name == "futures_orderbook")
+    with LocalServer(fixtures.Feed()) as server:
+        result = run(case, server.url, calls=4, concurrency=2)
+        assert server.requests == 5
+
+    assert result.rows_per_sec == pytest.approx(
+        result.requests_per_sec * fixtures.DEFAULT_ROWS
+    )
+    assert result.p50_ms <= result.p99_ms
+
+    baseline = {"a": {"requests_per_sec": 100.0, "p99_ms": 10.0}}
+    assert compare({"a": {"requests_per_sec": 95.0, "p99_ms": 10.5}}, baseline) == []
+    assert compare({"a": {"requests_per_sec": 80.0, "p99_ms": 12.0}}, baseline) == [
+        "a requests_per_sec: 100 -> 80 (-20.0%)",
+        "a p99_ms: 10 -> 12 (+20.0%)",
+    ]
+
+
+def test_cases_run_in_their_own_process():
+    case = next(case for case in cases(["serial"]) if case.name == "futures_orderbook")
+    context = multiprocessing.get_context("spawn")
+    with LocalServer(fixtures.Feed()) as server:
+        result = run_isolated(context, case, server.url, calls=2, concurrency=1)
+        assert server.requests == 3
+
+    assert result.rows_per_sec == pytest.approx(
+        result.requests_per_sec * fixtures.DEFAULT_ROWS
+    )
+    assert result.peak_rss_mb > 0
+
+
+def test_ranges_batches_and_interval_caches_are_benchmarked():
+    names = {case_name(case) for case in cases()}
+    assert {f"{method}[{mode}]" for method in fixtures.RANGES for mode in MODES} <= names
+    assert {f"batch[8][{mode}]" for mode in MODES} <= names
+    assert {"cache[interval-warm][serial]", "cache[interval-partial][serial]"} <= names
+
+    selected = {
+        case.name: case
+        for case in cases(["serial"])
+        if case.name in ("options_trades_range", "cache[interval-partial]")
+    }
+    with LocalServer(fixtures.Feed()) as server:
+        days = run(selected["options_trades_range"], server.url, calls=2, concurrency=1)
+        assert server.requests == 9
+        # After the warm-up, the second day of the window is the only request.
+        run(selected["cache[interval-partial]"], server.url, calls=2, concurrency=1)
+        assert server.requests == 12
+
+    assert days.rows_per_sec == pytest.approx(
+        days.requests_per_sec * 3 * fixtures.ROWS["options_trades"]
+    )
@@ -0,0 +1,216 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from gvol import GVol
+from gvol.cache import DiskCache, IntervalCache, LiveCache, request_key
+from gvol.ranges import parse_datetime
+
+
+def test_ttl_depends_on_window(tmp_path):
+    cache = DiskCache(str(tmp_path), recent_ttl=30)
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+
+    assert cache.ttl("spot_prices", {"dateStart": "2021-01-01", "dateEnd": "2021-04-05"}) is None
+    assert cache.ttl("spot_prices", {"dateStart": "2021-01-01", "dateEnd": today}) == 30
+    assert cache.ttl("options_gvol_gex", {"date": "2022-11-11 14:00"}) is None
+    assert cache.ttl("options_orderbook", {"symbol": "BTC", "exchange": "deribit"}) == 0
+
+
+def test_round_trip_and_expiry(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = request_key("query { a }", {"b": 1})
+
+    assert cache.get(key) is None
+    cache.set(key, {"Rows": [{"date": "1"}]})
+    assert cache.get(key) == {"Rows": [{"date": "1"}]}
+
+    cache.set(key, {"Rows": []}, ttl=-1)
+    assert cache.get(key) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    payload = {"Rows": [os.urandom(300).hex()]}
+
+    for n in range(3):
+        cache.set(str(n) * 64, payload)
+        os.utime(cache._file(str(n) * 64), (time.time() - 100 + n,) * 2)
+    cache.max_bytes = cache._file("0" * 64).stat().st_size * 3.5
+    cache.get("0" * 64)
+    cache.set("3" * 64, payload)
+
+    assert cache.get("0" * 64) is not None
+    assert cache.get("1" * 64) is None
+    assert cache.get("3" * 64) is not None
+
+
+class FakeGVol(GVol):
+    requests = 0
+
+    def _request(self, query, variable_values):
+        self.requests += 1
+        return {"SpotPrices": [{"date": "1609545600000", "close": 0.3607}]}
+
+
+def test_client_serves_historical_queries_from_cache(tmp_path):
+    gvol_client = FakeGVol("header", "gvol_api_key", cache=DiskCache(str(tmp_path)))
+    old = {"symbol": "ZRX", "dateStart": "2021-01-01", "dateEnd": "2021-04-05"}
+    recent_end = (datetime.utcnow() + timedelta(days=1)).strftime("%Y-%m-%d")
+    recent = dict(old, dateEnd=recent_end)
+
+    for _ in range(3):
+        assert gvol_client.spot_prices(**old)["SpotPrices"][0]["close"] == 0.3607
+    assert gvol_client.requests == 1
+
+    gvol_client._cache = DiskCache(str(tmp_path), recent_ttl=0)
+    gvol_client.spot_prices(**recent)
+    gvol_client.spot_prices(**recent)
+    assert gvol_client.requests == 3
+
+
+class FakeSkewGVol(GVol):
+    """Serves one row per day from dateStart to dateEnd, both inclusive."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requested = []
+
+    def _request(self, query, variable_values):
+        self.requested.append((variable_values["dateStart"], variable_values["dateEnd"]))
+        day = parse_datetime(variable_values["dateStart"])
+        rows = []
+        while day <= parse_datetime(variable_values["dateEnd"]):
+            ms = int((day - datetime(1970, 1, 1)).total_seconds() * 1000)
+            rows.append({"date": str(ms), "fiveDelta7DayExp": day.day})
+            day += timedelta(days=1)
+        return {"ConstantMaturitySkew1minutegranularity": rows}
+
+
+def test_interval_cache_fetches_only_missing_ranges(tmp_path):
+    gvol_client = FakeSkewGVol(
+        "header", "gvol_api_key", interval_cache=IntervalCache(str(tmp_path))
+    )
+    uncached = FakeSkewGVol("header", "gvol_api_key")
+    window = {"symbol": "BTC", "interval": "1d"}
+
+    gvol_client.options_skew_constant(dateStart="2021-01-01", dateEnd="2021-01-10", **window)
+    for dateStart, dateEnd in (("2021-01-02", "2021-01-11"), ("2021-01-03", "2021-01-06")):
+        result = gvol_client.options_skew_constant(
+            dateStart=dateStart, dateEnd=dateEnd, **window
+        )
+        assert result == uncached.options_skew_constant(
+            dateStart=dateStart, dateEnd=dateEnd, **window
+        )
+
+    assert gvol_client.requested == [
+        ("2021-01-01", "2021-01-10"),
+        ("2021-01-10", "2021-01-11"),
+        ("2021-01-06", "2021-01-06"),
+    ]
+    assert len(result["ConstantMaturitySkew1minutegranularity"]) == 4
+
+
+def test_interval_cache_serves_projections(tmp_path):
+    gvol_client = FakeSkewGVol(
+        "header", "gvol_api_key", interval_cache=IntervalCache(str(tmp_path))
+    )
+    window = {"symbol": "BTC", "interval": "1d", "fields": ["fiveDelta7DayExp"]}
+
+    gvol_client.options_skew_constant(dateStart="2021-01-01", dateEnd="2021-01-10", **window)
+    result = gvol_client.options_skew_constant(
+        dateStart="2021-01-03", dateEnd="2021-01-06", **window
+    )
+
+    assert gvol_client.requested == [
+        ("2021-01-01", "2021-01-10"),
+        ("2021-01-06", "2021-01-06"),
+    ]
+    rows = result["ConstantMaturitySkew1minutegranularity"]
+    assert [row["fiveDelta7DayExp"] for row in rows] == [3, 4, 5, 6]
+    # The time field the cache splits rows by is always selected.
+    assert gvol_client._project("options_skew_constant", ["fiveDelta7DayExp"]) == (
+        "options_skew_constant[date,fiveDelta7DayExp]"
+    )
+
+
+def test_interval_cache_does_not_hold_unsettled_data(tmp_path):
+    gvol_client = FakeSkewGVol(
+        "header", "gvol_api_key", interval_cache=IntervalCache(str(tmp_path))
+    )
+    start = (datetime.utcnow() - timedelta(days=3)).strftime("%Y-%m-%d")
+    end = (datetime.utcnow() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    for _ in range(2):
+        gvol_client.options_skew_constant(
+            symbol="BTC", dateStart=start, dateEnd=end, interval="1d"
+        )
+    assert gvol_client.requested[1][0] > start
+    assert gvol_client.requested[1][0] <= datetime.utcnow().strftime("%Y-%m-%d")
+
+
+class FakeLiveGVol(GVol):
+    def __init__(self, *args, **kwargs):
+        super().__init__("header", "gvol_api_key", *args, **kwargs)
+        self.sent = 0
+
+    def _request(self, query, variable_values):
+        self.sent += 1
+        time.sleep(0.05)
+        return {"PerpsTable": [{"n": self.sent}]}
+
+
+def test_live_cache_serves_stale_responses_while_refreshing():
+    gvol_client = FakeLiveGVol(
+        live_cache=LiveCache(ttls={"futures_perps_table": 0.1}, max_stale=0.5)
+    )
+
+    first = gvol_client.futures_perps_table(exchange="deribit")
+    assert (first["PerpsTable"], first.stale) == ([{"n": 1}], False)
+    assert gvol_client.futures_perps_table(exchange="deribit")["PerpsTable"] == [{"n": 1}]
+    assert gvol_client.sent == 1
+
+    time.sleep(0.1)
+    stale = gvol_client.futures_perps_table(exchange="deribit")
+    assert (stale["PerpsTable"], stale.stale) == ([{"n": 1}], True)
+    # One background refresh only, whatever the number of callers.
+    gvol_client.futures_perps_table(exchange="deribit")
+    time.sleep(0.1)
+    assert gvol_client.sent == 2
+    assert gvol_client.futures_perps_table(exchange="deribit")["PerpsTable"] == [{"n": 2}]
+
+    time.sleep(0.7)
+    assert gvol_client.futures_perps_table(exchange="deribit")["PerpsTable"] == [{"n": 3}]
+
+
+class FakeLivePerpsGVol(FakeLiveGVol):
+    def _request(self, query, variable_values):
+        self.sent += 1
+        return {"TablePerps": [{"price": float(self.sent)}]}
+
+
+def test_live_cache_keeps_its_markers_with_a_result_format():
+    pytest.importorskip("numpy")
+    gvol_client = FakeLivePerpsGVol(
+        live_cache=LiveCache(ttls={"futures_perps_table": 0.1}),
+        result_format="numpy",
+    )
+
+    first = gvol_client.futures_perps_table(exchange="deribit")
+    assert list(first["TablePerps"]["price"]) == [1.0]
+    assert (first.stale, first.age) == (False, 0.0)
+
+    time.sleep(0.1)
+    stale = gvol_client.futures_perps_table(exchange="deribit")
+    assert list(stale["TablePerps"]["price"]) == [1.0]
+    assert stale.stale and stale.age >= 0.1
+
+
+def test_live_cache_ttls():
+    cache = LiveCache()
+
+    assert cache.ttl("futures_orderbook", {"exchange": "deribit"}) == 0.1
+    assert cache.ttl("futures_orderbook", {"exchange": "dydx"}) == 60
+    assert cache.ttl("spot_prices", {"symbol": "BTC"}) is None
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gvol import AsyncGVol, GVol
+
+
+class FakeGVol(GVol):
+    def __init__(self, *args, **kwargs):
+        super().__init__("header", "gvol_api_key", *args, **kwargs)
+        self.sent = 0
+        self.lock = threading.Lock()
+
+    def _send(self, query, document, variable_values):
+        with self.lock:
+            self.sent += 1
+        time.sleep(0.1)
+        if variable_values["exchange"] == "bitcom":
+            raise ValueError("bitcom is down")
+        return {"UtilityRealtimeOptionbook": [{"exchange": variable_values["exchange"]}]}
+
+
+def test_identical_calls_share_one_request():
+    gvol_client = FakeGVol()
+    with ThreadPoolExecutor(8) as executor:
+        results = list(
+            executor.map(
+                lambda exchange: gvol_client.options_orderbook_details(exchange=exchange),
+                ["deribit"] * 6 + ["okex"] * 2,
+            )
+        )
+
+    assert gvol_client.sent == 2
+    assert all(result is results[0] for result in results[:6])
+    assert results[-1]["UtilityRealtimeOptionbook"] == [{"exchange": "okex"}]
+
+    gvol_client.options_orderbook_details(exchange="deribit")
+    assert gvol_client.sent == 3
+
+
+def test_errors_are_shared_and_coalescing_can_be_disabled():
+    gvol_client = FakeGVol()
+    with ThreadPoolExecutor(4) as executor:
+        futures = [
+            executor.submit(gvol_client.options_orderbook_details, exchange="bitcom")
+            for _ in range(4)
+        ]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result()
+    assert gvol_client.sent == 1
+
+    gvol_client = FakeGVol(coalesce=False)
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: gvol_client.options_orderbook_details(exchange="deribit"), range(4)))
+    assert gvol_client.sent == 4
+
+
+def test_async_calls_share_one_request():
+    pytest.importorskip("aiohttp")
+
+    class FakeAsyncGVol(AsyncGVol):
+        sent = 0
+
+        async def _send(self, query, document, variable_values):
+            self.sent += 1
+            await asyncio.sleep(0.05)
+            return {"UtilityRealtimeOptionbook": []}
+
+    async def main():
+        gvol_client = FakeAsyncGVol("header", "gvol_api_key")
+        call = gvol_client.options_orderbook_details(exchange="deribit")
+        cancelled = asyncio.ensure_future(call)
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        results = await asyncio.gather(
+            *(gvol_client.options_orderbook_details(exchange="deribit") for _ in range(5))
+        )
+        return gvol_client.sent, results
+
+    sent, results = asyncio.run(main())
+    assert sent == 1
+    assert results == [{"UtilityRealtimeOptionbook": []}] * 5
@@ -0,0 +1,127 @@
+import pytest
+
+from gvol import GVol, columnar
+
+np = pytest.importorskip("numpy")
+
+TRADES = {
+    "TimesAndSales": [
+        {
+            "exchange": "deribit",
+            "date": "1609459200000",
+            "instrumentName": "BTC-1JAN21-29000-C",
+            "expiration": "1609488000000",
+            "strike": 29000,
+            "amount": 0.1,
+            "price": None,
+            "iv": "70.52",
+        },
+        {
+            "exchange": "deribit",
+            "date": "1609459260000",
+            "instrumentName": "BTC-30DEC22-20000-P",
+            "expiration": "2022-12-30 08:00:00",
+            "strike": 20000,
+            "amount": 1,
+            "price": 0.05,
+            "iv": None,
+        },
+    ]
+}
+
+
+class FakeGVol(GVol):
+    def _request(self, query, variable_values):
+        return TRADES
+
+
+def test_numpy_columns_are_typed():
+    gvol_client = FakeGVol("header", "gvol_api_key", result_format="numpy")
+    trades = gvol_client.options_trades(date="2021-01-01", exchange="deribit")["TimesAndSales"]
+
+    assert trades["date"].dtype == np.dtype("datetime64[ms]")
+    assert trades["date"][0] == np.datetime64("2021-01-01T00:00")
+    assert trades["expiration"].tolist() == [
+        np.datetime64("2021-01-01T08:00", "ms").item(),
+        np.datetime64("2022-12-30T08:00", "ms").item(),
+    ]
+    assert trades["amount"].dtype == np.float64
+    assert trades["amount"].tolist() == [0.1, 1.0]
+    assert np.isnan(trades["price"][0])
+    assert trades["iv"].tolist() == ["70.52", None]
+    assert trades["putCall"].tolist() == [None, None]
+
+
+def test_arrow_tables():
+    pa = pytest.importorskip("pyarrow")
+    gvol_client = FakeGVol("header", "gvol_api_key", result_format="arrow")
+    trades = gvol_client.options_trades(date="2021-01-01", exchange="deribit")["TimesAndSales"]
+
+    assert isinstance(trades, pa.Table)
+    assert trades.num_rows == 2
+    assert trades.schema.field("date").type == pa.timestamp("ms", tz="UTC")
+    assert trades.schema.field("strike").type == pa.float64()
+    assert trades.column("instrumentName").to_pylist()[1] == "BTC-30DEC22-20000-P"
+
+
+class FakeBookGVol(GVol):
+    def _request(self, query, variable_values):
+        rows = [
+            {"instrumentName": "BTC-1JAN21-29000-C", "putCall": "C", "isAtm": True},
+            {"instrumentName": "BTC-1JAN21-30000-C", "putCall": "C", "isAtm": False},
+        ]
+        return {"UtilityRealtimeOptionbook": rows}
+
+
+def test_scalar_columns_are_typed():
+    gvol_client = FakeBookGVol("header", "gvol_api_key", result_format="numpy")
+    book = gvol_client.options_orderbook_details(exchange="deribit")["UtilityRealtimeOptionbook"]
+    assert book["isAtm"].dtype == np.bool_
+    assert book["putCall"].dtype == object
+
+    assert columnar._column([1, 2], "int").dtype == np.int64
+    assert np.isnan(columnar._column([1, None], "int")[1])
+    # Values not matching the schema type are kept as they are.
+    assert columnar._column([True, None], "bool").tolist() == [True, None]
+    assert columnar._column(["1"], "int").tolist() == ["1"]
+
+
+def test_scalar_columns_are_typed_in_tables():
+    pa = pytest.importorskip("pyarrow")
+    gvol_client = FakeBookGVol("header", "gvol_api_key", result_format="arrow")
+    book = gvol_client.options_orderbook_details(exchange="deribit")["UtilityRealtimeOptionbook"]
+
+    assert book.schema.field("isAtm").type == pa.bool_()
+    assert book.schema.field("putCall").type == pa.string()
+    assert book.schema.field("instrumentName").type == pa.string()
+
+    table = columnar._table({"n": columnar._column([1, None], "int")}, {"n": "int"})
+    assert table.schema.field("n").type == pa.int64()
+    assert table.column("n").to_pylist() == [1, None]
+
+
+def test_unknown_result_format():
+    with pytest.raises(ValueError):
+        GVol("header", "gvol_api_key", result_format="pandas")
+
+
+class FakeMinuteGVol(GVol):
+    def _request(self, query, variable_values):
+        hour = np.datetime64(variable_values["dateTime"].replace(" ", "T"), "ms")
+        ms = int(hour.astype(np.int64))
+        rows = [{"date": str(ms + minute * 60000), "spot": float(minute)} for minute in (1, 0)]
+        return {"HifiVolSurfaceStrikesGreeksMinute": rows}
+
+
+@pytest.mark.parametrize("result_format", ["numpy", "arrow"])
+def test_minute_range_concatenates_columns(result_format):
+    if result_format == "arrow":
+        pytest.importorskip("pyarrow")
+    gvol_client = FakeMinuteGVol("header", "gvol_api_key", result_format=result_format)
+    result = gvol_client.options_greeks_minute_range(
+        exchange="deribit", symbol="BTC", dateStart="2021-01-01", dateEnd="2021-01-01 03:00"
+    )["HifiVolSurfaceStrikesGreeksMinute"]
+
+    spot = result["spot"] if result_format == "numpy" else result.column("spot").to_numpy()
+    assert spot.tolist() == [0.0, 1.0] * 3
+    assert len(result["date"]) == 6
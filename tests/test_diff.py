@@ -0,0 +1,49 @@
+import itertools
+
+from gvol import GVol
+from gvol.diff import SnapshotDiffer
+
+
+def row(name, date="1", markIv=50.0, oi=10):
+    return {"date": date, "instrumentName": name, "markIv": markIv, "oi": oi}
+
+
+def test_added_removed_and_changed_rows():
+    differ = SnapshotDiffer()
+
+    first = differ.update([row("A"), row("B"), row("C")])
+    assert [r["instrumentName"] for r in first.added] == ["A", "B", "C"]
+    assert not first.removed and not first.changed
+
+    second = differ.update([row("A", date="2"), row("B", date="2", oi=11), row("D")])
+    assert second.added == [row("D")]
+    assert second.removed == [row("C")]
+    assert len(second.changed) == 1
+    change = second.changed[0]
+    assert change.row["instrumentName"] == "B" and change.previous["oi"] == 10
+    assert change.fields == ("oi",)
+    assert change.mask == 1 << differ.fields.index("oi")
+
+    assert not differ.update([row("A", date="3"), row("B", oi=11), row("D")])
+
+
+class FakeGVol(GVol):
+    snapshots = iter(
+        [
+            [row("A"), row("B")],
+            [row("A", date="2"), row("B", date="2")],
+            [row("A", date="3", markIv=51.0), row("B", date="3")],
+        ]
+    )
+
+    def _request(self, query, variable_values):
+        return {"UtilityRealtimeOptionbook": next(self.snapshots)}
+
+
+def test_client_yields_only_polls_with_changes():
+    gvol_client = FakeGVol("header", "gvol_api_key")
+    changes = gvol_client.options_orderbook_details_changes(exchange="deribit", interval=0)
+
+    first, second = itertools.islice(changes, 2)
+    assert len(first.added) == 2
+    assert [change.fields for change in second.changed] == [("markIv",)]
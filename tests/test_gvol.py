@@ -1,7 +1,12 @@
+import asyncio
+import inspect
 from pathlib import Path
+from typing import Dict
 
 import toml
-from gvol import GVol, __version__
+from gvol import AsyncGVol, GVol, __version__
+from gvol.registry import registry
+from gvol.testing import LocalServer
 
 
 def test_version():
@@ -16,3 +21,33 @@ def test_version():
 
 def test_client_initialization():
     _ = GVol("header", "gvol_api_key")
+
+
+def test_async_client_initialization():
+    gvol_client = AsyncGVol("header", "gvol_api_key")
+
+    coroutine = gvol_client.options_orderbook(symbol="BTC", exchange="deribit")
+    assert asyncio.iscoroutine(coroutine)
+    coroutine.close()
+
+
+def test_async_endpoints_mirror_the_sync_ones():
+    for name, method in inspect.getmembers(GVol, inspect.isfunction):
+        if name not in registry:
+            continue
+        async_method = getattr(AsyncGVol, name)
+        assert inspect.iscoroutinefunction(async_method), name
+        assert inspect.signature(async_method) == inspect.signature(method), name
+        assert async_method.__doc__ == method.__doc__, name
+
+
+def test_async_endpoints_are_awaitable() -> None:
+    async def main(gvol_client: AsyncGVol) -> Dict:
+        async with gvol_client:
+            return await gvol_client.futures_orderbook(exchange="deribit")
+
+    rows = [{"instrumentName": "BTC-PERPETUAL"}]
+    with LocalServer(lambda query, variables: {"UtilityRealtimeFuturesPrices": rows}) as server:
+        gvol_client = AsyncGVol("header", "gvol_api_key")
+        server.attach(gvol_client)
+        assert asyncio.run(main(gvol_client)) == {"UtilityRealtimeFuturesPrices": rows}
@@ -0,0 +1,46 @@
+import pytest
+
+from gvol.instruments import OptionChain, expiration_ms, parse
+
+np = pytest.importorskip("numpy")
+from gvol.instruments import parse_names  # noqa: E402
+
+EXPIRY = expiration_ms("2022-12-30")
+
+
+def test_parse_names():
+    names = ["BTC-30DEC22-40000-C", "BTC-PERPETUAL", "ETH-USD-221230-1500.5-P", "BTC-30DEC22", "XRP-30DEC22-0d5-P", None] * 3
+
+    columns = parse_names(name for name in names)
+
+    assert columns["currency"].tolist() == ["BTC", "BTC", "ETH", "BTC", "XRP", None] * 3
+    assert columns["expiration"].dtype == np.dtype("datetime64[ms]")
+    assert columns["expiration"][0] == np.datetime64("2022-12-30T08:00", "ms")
+    assert np.isnat(columns["expiration"][1]) and np.isnat(columns["expiration"][5])
+    assert columns["strike"][:5].tolist()[::2] == [40000.0, 1500.5, 0.5]
+    assert np.isnan(columns["strike"][3])
+    assert columns["putCall"].tolist()[:6] == ["C", None, "P", None, "P", None]
+    assert parse("BTC-31FEB22-40000-C") is None
+    assert parse.cache_info().currsize >= 6
+
+
+def test_option_chain():
+    rows = [
+        {"instrumentName": name, "markIv": n}
+        for n, name in enumerate(
+            [
+                "BTC-30DEC22-40000-C", "BTC-30DEC22-20000-P", "BTC-30DEC22-30000-P", "BTC-30DEC22-25000-C",
+                "BTC-30DEC22-25000-P", "BTC-31MAR23-40000-C", "BTC-30DEC22",
+            ]
+        )
+    ]
+
+    for chain in OptionChain(rows), OptionChain({"instrumentName": np.array([row["instrumentName"] for row in rows]), "markIv": np.arange(7)}):
+        assert len(chain) == 6
+        assert chain.expirations == [EXPIRY, expiration_ms("31MAR23")]
+        assert chain.get("30DEC22", 40000, "C")["markIv"] == 0
+        assert chain[(np.datetime64("2022-12-30T08:00"), 30000.0, "P")]["markIv"] == 2
+        assert ("30DEC22", 40000, "P") not in chain
+        assert chain.strikes(EXPIRY) == [20000.0, 25000.0, 30000.0, 40000.0]
+        assert chain.strikes("2022-12-30", "C") == [25000.0, 40000.0]
+        assert [row["markIv"] for row in chain.between("30DEC22", 20000, 29999, "P")] == [1, 4]
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from gvol import AsyncGVol, GVol
+from gvol.testing import LocalServer
+
+pytest.importorskip("pyarrow")
+lake = pytest.importorskip("gvol.lake")
+
+
+def ms(day):
+    return str(int(datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp() * 1000))
+
+
+def feed(requests):
+    def respond(query, variables):
+        requests.append((query, variables))
+        if query == "options_trades":
+            day = variables["date"]
+            if day == "2022-01-02":
+                return {"TimesAndSales": []}
+            return {"TimesAndSales": [{"date": ms(day), "instrumentName": "BTC-1JAN22-40000-C", "price": 0.1, "amount": 2}]}
+        days = ["2022-01-01", "2022-01-02", "2022-01-03", "2022-01-04", "2022-01-05"]
+        return {"SpotPrices": [{"date": ms(day), "currency": "BTC", "close": float(n)} for n, day in enumerate(days) if variables["dateStart"] <= day < variables["dateEnd"]]}
+
+    return respond
+
+
+def test_days_are_written_once(tmp_path):
+    requests = []
+    with LocalServer(feed(requests)) as server:
+        gvol_client = GVol("header", "gvol_api_key")
+        server.attach(gvol_client)
+        store = lake.Lake(str(tmp_path))
+
+        trades = store.load(gvol_client, "options_trades", "2022-01-01", "2022-01-03", exchange="deribit")["TimesAndSales"]
+        assert len(requests) == 3
+        assert trades.num_rows == 2
+        assert str(trades.schema.field("date").type) == "timestamp[ms, tz=UTC]"
+        assert str(trades.schema.field("amount").type) == "double"
+        assert str(trades.schema.field("instrumentName").type) == "string"
+
+        again = store.load(gvol_client, "options_trades", "2022-01-02", "2022-01-04", exchange="deribit")["TimesAndSales"]
+        assert requests[3:] == [("options_trades", {"exchange": "deribit", "date": "2022-01-04"})]
+        assert again.num_rows == 2
+
+    assert (tmp_path / "options_trades/exchange=deribit/date=2022-01-01/part.parquet").exists()
+    assert not (tmp_path / "options_trades/exchange=deribit/date=2022-01-02").exists()
+    assert lake.Lake(str(tmp_path)).missing("options_trades", "2022-01-01", "2022-01-05", exchange="deribit") == ["2022-01-05"]
+
+
+def test_async_clients_are_rejected(tmp_path):
+    pytest.importorskip("aiohttp")
+    with pytest.raises(TypeError, match="AsyncGVol"):
+        lake.Lake(str(tmp_path)).load(
+            AsyncGVol("header", "gvol_api_key"), "options_trades", "2022-01-01", "2022-01-01", exchange="deribit"
+        )
+    assert not list(tmp_path.iterdir())
+
+
+def test_windows_are_fetched_whole_and_split_by_day(tmp_path):
+    requests = []
+    with LocalServer(feed(requests)) as server:
+        gvol_client = GVol("header", "gvol_api_key")
+        server.attach(gvol_client)
+        store = lake.Lake(str(tmp_path))
+        store.load(gvol_client, "spot_prices", "2022-01-02", "2022-01-02", symbol="BTC")
+
+        prices = store.load(gvol_client, "spot_prices", "2022-01-01", "2022-01-04", symbol="BTC")["SpotPrices"]
+
+    assert requests[0][1] == {"symbol": "BTC", "dateStart": "2022-01-02", "dateEnd": "2022-01-03"}
+    # The two windows around the stored day are fetched concurrently.
+    assert sorted((variables for _, variables in requests[1:]), key=lambda v: v["dateStart"]) == [
+        {"symbol": "BTC", "dateStart": "2022-01-01", "dateEnd": "2022-01-02"},
+        {"symbol": "BTC", "dateStart": "2022-01-03", "dateEnd": "2022-01-05"},
+    ]
+    assert prices.column("close").to_pylist() == [0.0, 1.0, 2.0, 3.0]
+    with pytest.raises(ValueError):
+        store.load(gvol_client, "options_orderbook", "2022-01-01", "2022-01-01")
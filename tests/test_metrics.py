@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+from gvol import AsyncGVol, GVol
+from gvol.metrics import Histogram, Metrics
+from gvol.testing import LocalServer
+
+ROWS = [{"instrumentName": f"BTC-PERP-{n}", "markPrice": n} for n in range(50)]
+
+
+def feed(query, variables):
+    if variables["exchange"] == "bitcom":
+        raise ValueError("bitcom is down")
+    return {"UtilityRealtimeFuturesPrices": ROWS}
+
+
+@pytest.mark.parametrize("client_class", [GVol, AsyncGVol])
+def test_clients_report_streams(client_class):
+    if client_class is AsyncGVol:
+        pytest.importorskip("aiohttp")
+    calls = []
+    body = json.dumps({"data": {"UtilityRealtimeFuturesPrices": ROWS}}).encode()
+
+    async def main(gvol_client):
+        batches = [batch async for batch in gvol_client.stream("futures_orderbook", batch_size=20, exchange="deribit")]
+        rows = gvol_client.stream("futures_orderbook", exchange="deribit")
+        await rows.__anext__()
+        await rows.aclose()
+        await gvol_client.close()
+        return batches
+
+    with LocalServer(feed) as server:
+        gvol_client = client_class("header", "gvol_api_key", hooks=[calls.append])
+        server.attach(gvol_client)
+        if client_class is AsyncGVol:
+            batches = asyncio.run(main(gvol_client))
+        else:
+            batches = list(gvol_client.stream("futures_orderbook", batch_size=20, exchange="deribit"))
+            rows = gvol_client.stream("futures_orderbook", exchange="deribit")
+            next(rows)
+            rows.close()
+
+    assert [len(batch) for batch in batches] == [20, 20, 10]
+    streamed, stopped = calls
+    assert streamed.query == "futures_orderbook" and streamed.error is None
+    assert streamed.rows == 50 and streamed.attempts == 1
+    assert streamed.bytes == len(body)
+    assert streamed.network > 0 and streamed.decode > 0
+    # A stream closed by its consumer is not a failed request.
+    assert stopped.error is None and stopped.rows >= 1
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5))
+    assert histogram.quantile(0.99) is None
+
+    for value in [0.05] * 50 + [0.15] * 40 + [0.3] * 9 + [2.0]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(0.1)
+    assert histogram.quantile(0.7) == pytest.approx(0.15)
+    assert histogram.quantile(1.0) == 0.5
+    assert list(histogram.cumulative())[-1] == (float("inf"), 100)
+
+
+@pytest.mark.parametrize("client_class", [GVol, AsyncGVol])
+def test_clients_report_every_request(client_class):
+    if client_class is AsyncGVol:
+        pytest.importorskip("aiohttp")
+    calls = []
+    metrics = Metrics()
+
+    async def main(gvol_client):
+        await gvol_client.futures_orderbook(exchange="deribit")
+        with pytest.raises(Exception):
+            await gvol_client.futures_orderbook(exchange="bitcom")
+        await gvol_client.close()
+
+    with LocalServer(feed) as server:
+        gvol_client = client_class("header", "gvol_api_key", hooks=[calls.append, metrics])
+        server.attach(gvol_client)
+        if client_class is AsyncGVol:
+            asyncio.run(main(gvol_client))
+        else:
+            gvol_client.futures_orderbook(exchange="deribit")
+            with pytest.raises(Exception):
+                gvol_client.futures_orderbook(exchange="bitcom")
+
+    ok, failed = calls
+    assert ok.query == "futures_orderbook" and ok.error is None
+    assert ok.rows == 50 and ok.attempts == 1
+    assert ok.bytes > 50 * len('{"instrumentName":"BTC-PERP-0","markPrice":0}')
+    assert ok.network > 0 and ok.decode > 0 and ok.latency < 1
+    assert ok.variables_hash != failed.variables_hash
+    assert failed.error == "TransportQueryError"
+
+    text = metrics.prometheus()
+    assert 'gvol_request_duration_seconds_count{query="futures_orderbook"} 1' in text
+    assert 'gvol_response_rows_bucket{query="futures_orderbook",le="100.0"} 1' in text
+    assert (
+        'gvol_request_errors_total{query="futures_orderbook",error="TransportQueryError"} 1'
+        in text
+    )
+    assert 0 < metrics.quantile("futures_orderbook", 0.99) < 1
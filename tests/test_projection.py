@@ -0,0 +1,44 @@
+import pytest
+
+from gvol import GVol
+from gvol.cache import LiveCache
+from gvol.registry import QueryRegistry
+from gvol.schema import load_schema
+from gvol.testing import LocalServer
+
+ROWS = [{"instrumentName": f"BTC-PERP-{n}", "markPrice": n} for n in range(5)]
+
+
+def test_projections_are_registered_once():
+    registry = QueryRegistry()
+
+    name = registry.project("futures_orderbook", ["markPrice", "instrumentName", "markPrice"], load_schema())
+
+    assert name == "futures_orderbook[markPrice,instrumentName]"
+    assert registry.project(name, ["markPrice", "instrumentName"], load_schema()) == name
+    assert name in registry and registry.base(name) == "futures_orderbook"
+    source = registry.source(name)
+    assert "markPrice" in source and "bestBidPrice" not in source
+    assert registry.name(source) == name
+    assert registry.name(registry.source("futures_orderbook")) == "futures_orderbook"
+    with pytest.raises(ValueError, match="not a field"):
+        registry.project("futures_orderbook", ["notAField"], load_schema())
+    with pytest.raises(ValueError):
+        registry.project("futures_orderbook", [], load_schema())
+
+
+def test_client_requests_only_selected_fields():
+    requested = []
+
+    def feed(query, variables):
+        requested.append(query)
+        return {"UtilityRealtimeFuturesPrices": ROWS}
+
+    with LocalServer(feed) as server:
+        gvol_client = GVol("header", "gvol_api_key", live_cache=LiveCache(ttls={"futures_orderbook": 60.0}))
+        server.attach(gvol_client)
+        fields = ["instrumentName", "markPrice"]
+        assert gvol_client.futures_orderbook(exchange="deribit", fields=fields)["UtilityRealtimeFuturesPrices"] == ROWS
+        gvol_client.futures_orderbook(exchange="deribit", fields=fields)
+
+    assert requested == ["futures_orderbook[instrumentName,markPrice]"]
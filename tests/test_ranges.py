@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from gvol import AsyncGVol, GVol, ranges
+
+
+def test_hours():
+    assert ranges.hours("2021-01-01 22:30", "2021-01-02") == [
+        "2021-01-01 22:30:00",
+        "2021-01-01 23:30:00",
+    ]
+    with pytest.raises(ValueError):
+        ranges.hours("2021-01-02", "2021-01-01")
+
+
+def test_merge_sorts_rows_by_timestamp():
+    merged = ranges.merge(
+        [
+            {"Rows": [{"date": "3"}, {"date": "10"}]},
+            {"Rows": [{"date": "2"}]},
+            {"Rows": None},
+        ]
+    )
+
+    assert merged == {"Rows": [{"date": "2"}, {"date": "3"}, {"date": "10"}]}
+
+
+def _minute_rows(variable_values):
+    start = ranges.parse_datetime(variable_values["dateTime"]).timestamp() * 1000
+    return {
+        "HifiVolSurfaceStrikesGreeksMinute": [
+            {"date": str(int(start + minute * 60000))} for minute in (30, 0)
+        ]
+    }
+
+
+class FakeGVol(GVol):
+    def __init__(self):
+        super().__init__("header", "gvol_api_key")
+        self.lock = threading.Lock()
+        self.in_flight = self.max_in_flight = 0
+
+    def _execute(self, query, variable_values=None, fields=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        return _minute_rows(variable_values)
+
+
+class FakeAsyncGVol(AsyncGVol):
+    in_flight = max_in_flight = 0
+
+    async def _execute(self, query, variable_values=None, fields=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return _minute_rows(variable_values)
+
+
+def _assert_sorted_day(result):
+    dates = [int(row["date"]) for row in result["HifiVolSurfaceStrikesGreeksMinute"]]
+    assert len(dates) == 48
+    assert dates == sorted(dates)
+
+
+def test_options_greeks_minute_range():
+    gvol_client = FakeGVol()
+
+    result = gvol_client.options_greeks_minute_range(
+        "deribit", "2021-01-01", "2021-01-02", "BTC", max_concurrency=4
+    )
+
+    _assert_sorted_day(result)
+    assert gvol_client.max_in_flight == 4
+
+
+def test_async_options_greeks_minute_range():
+    gvol_client = FakeAsyncGVol("header", "gvol_api_key")
+
+    result = asyncio.run(
+        gvol_client.options_greeks_minute_range(
+            "deribit", "2021-01-01", "2021-01-02", "BTC", max_concurrency=4
+        )
+    )
+
+    _assert_sorted_day(result)
+    assert gvol_client.max_in_flight == 4
+
+
+def test_days_are_inclusive():
+    assert ranges.days("2021-12-30", "2022-01-01") == [
+        "2021-12-30",
+        "2021-12-31",
+        "2022-01-01",
+    ]
+
+
+def test_backfill_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "trades.checkpoint")
+    days = ranges.days("2022-03-01", "2022-03-10")
+
+    def fetch(date):
+        if date == "2022-03-06":
+            raise RuntimeError("server error")
+        return {"TimesAndSales": [{"date": date}]}
+
+    fetched = []
+    with pytest.raises(RuntimeError):
+        for date, result in ranges.backfill(fetch, days, 2, checkpoint):
+            fetched.append(date)
+
+    assert sorted(ranges.Checkpoint(checkpoint).done) == sorted(fetched)
+    assert "2022-03-06" not in fetched
+
+    resumed = dict(ranges.backfill(lambda date: {"date": date}, days, 2, checkpoint))
+
+    assert sorted(resumed) == sorted(set(days) - set(fetched))
+    assert ranges.Checkpoint(checkpoint).done == set(days)
+
+
+def test_async_backfill_streams_in_completion_order():
+    async def fetch(date):
+        await asyncio.sleep(0.05 if date == "2022-03-01" else 0)
+        return {"date": date}
+
+    async def collect():
+        return [
+            date
+            async for date, _ in ranges.backfill_async(
+                fetch, ranges.days("2022-03-01", "2022-03-03"), 3
+            )
+        ]
+
+    assert asyncio.run(collect())[-1] == "2022-03-01"
@@ -0,0 +1,118 @@
+import multiprocessing
+import time
+
+import pytest
+
+from gvol import GVol, ratelimit
+from gvol.ratelimit import RateLimiter, SharedRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ratelimit.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_burst_then_sustained_rate(clock):
+    limiter = RateLimiter(rate=10, burst=5)
+
+    for _ in range(5):
+        limiter.acquire()
+    assert clock.now == 0
+
+    for _ in range(20):
+        limiter.acquire()
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_costs_and_reservations(clock):
+    limiter = RateLimiter.for_plan("lite_plus", costs={"options_trades": 5})
+
+    assert limiter.reserve("options_trades") == 0
+    assert limiter.reserve("options_trades") == 0
+    assert limiter.reserve("spot_prices") == pytest.approx(0.1)
+    assert limiter.reserve("spot_prices") == pytest.approx(0.2)
+
+    with pytest.raises(ValueError):
+        RateLimiter.for_plan("free")
+
+
+class FakeGVol(GVol):
+    def _connect(self):
+        return self
+
+    def execute(self, document, variable_values=None):
+        return {"OrderbookData": []}
+
+
+def test_client_waits_on_limiter(clock):
+    gvol_client = FakeGVol(
+        "header", "gvol_api_key", rate_limiter=RateLimiter(rate=2, burst=1)
+    )
+    for _ in range(5):
+        gvol_client.options_orderbook(symbol="BTC", exchange="deribit")
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_shared_limiters_share_one_bucket(clock, tmp_path):
+    path = str(tmp_path / "bucket")
+    live = SharedRateLimiter(rate=10, burst=4, priority="live", path=path)
+    backfill = SharedRateLimiter(rate=10, burst=4, priority="backfill", path=path)
+
+    assert backfill.reserve() == 0
+    assert backfill.reserve() == 0
+    assert backfill.reserve() == pytest.approx(0.1)
+    assert live.reserve() == 0
+    assert live.reserve() == 0
+    assert live.reserve() == pytest.approx(0.1)
+
+    # Live requests have reserved the next token, backfill waits for half the bucket.
+    assert backfill.reserve() == pytest.approx(0.4)
+    clock.sleep(0.4)
+    assert backfill.reserve() == 0
+
+
+def test_floor_waits_for_a_full_bucket_when_cost_exceeds_it(clock, tmp_path):
+    backfill = SharedRateLimiter.for_plan(
+        "lite_plus", costs={"options_trades": 6}, priority="backfill", path=str(tmp_path / "a")
+    )
+    backfill.acquire("options_trades")
+    backfill.acquire("options_trades")
+    assert clock.now == pytest.approx(0.6)
+
+    slow = SharedRateLimiter(rate=1, priority="backfill", path=str(tmp_path / "b"))
+    for _ in range(3):
+        slow.acquire()
+    assert clock.now == pytest.approx(2.6)
+
+
+def _acquire(path, count):
+    limiter = SharedRateLimiter(rate=20, burst=1, priority="live", path=path)
+    for _ in range(count):
+        limiter.acquire()
+
+
+def test_shared_limiter_across_processes(tmp_path):
+    path = str(tmp_path / "bucket")
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_acquire, args=(path, 5)) for _ in range(2)]
+
+    start = time.monotonic()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert time.monotonic() - start >= 9 / 20
@@ -0,0 +1,37 @@
+import pytest
+from graphql import GraphQLError, build_ast_schema, parse
+
+from gvol import registry as registry_module
+from gvol.registry import QueryRegistry
+from gvol.schema import load_schema
+
+
+def test_documents_are_parsed_once():
+    registry = QueryRegistry()
+
+    document = registry.document("options_orderbook")
+
+    assert registry.document("options_orderbook") is document
+    with pytest.raises(KeyError):
+        registry.document("not_a_query")
+
+
+def test_validation_is_cached_per_schema(monkeypatch):
+    calls = []
+    graphql_validate = registry_module.validate
+
+    def validate(schema, document):
+        calls.append(schema)
+        return graphql_validate(schema, document)
+
+    monkeypatch.setattr(registry_module, "validate", validate)
+    registry = QueryRegistry()
+    document = registry.document("options_orderbook")
+    other_schema = build_ast_schema(parse("type Query { ping: String }"))
+
+    for _ in range(3):
+        registry.validate(document, load_schema())
+        with pytest.raises(GraphQLError):
+            registry.validate(document, other_schema)
+
+    assert len(calls) == 2
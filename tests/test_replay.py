@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from gvol import AsyncGVol, GVol
+from gvol.testing import Fixtures, LocalServer, record, replay
+
+ROWS = [{"instrumentName": f"BTC-PERP-{n}", "markPrice": n} for n in range(2000)]
+
+
+def feed(query, variables):
+    return {"UtilityRealtimeFuturesPrices": ROWS[: len(variables["exchange"])]}
+
+
+def test_recorded_responses_replay_offline(tmp_path):
+    with LocalServer(feed) as server:
+        gvol_client = GVol("header", "gvol_api_key")
+        server.attach(gvol_client)
+        fixtures = record(gvol_client, tmp_path)
+        live = gvol_client.futures_orderbook(exchange="deribit")
+        gvol_client.futures_orderbook(exchange="okex")
+    assert fixtures.load("futures_orderbook", {"exchange": "deribit"}) == live
+    assert len(list(tmp_path.glob("futures_orderbook/*.json"))) == 2
+
+    gvol_client = GVol("header", "gvol_api_key")
+    replay(gvol_client, tmp_path)
+    assert gvol_client.futures_orderbook(exchange="deribit") == live
+    with pytest.raises(KeyError):
+        gvol_client.futures_orderbook(exchange="bybit")
+
+
+@pytest.mark.parametrize("swap", [record, replay])
+def test_async_clients_are_rejected(tmp_path, swap):
+    pytest.importorskip("aiohttp")
+    gvol_client = AsyncGVol("header", "gvol_api_key")
+    with pytest.raises(TypeError, match="AsyncGVol"):
+        swap(gvol_client, tmp_path)
+    assert not list(tmp_path.iterdir())
+
+
+def test_server_simulates_latency_and_bandwidth(tmp_path):
+    fixtures = Fixtures(tmp_path)
+    fixtures.save("futures_orderbook", {"exchange": "deribit"}, {"UtilityRealtimeFuturesPrices": ROWS})
+
+    with LocalServer(fixtures, latency=0.05, bandwidth=1e6) as server:
+        gvol_client = GVol("header", "gvol_api_key")
+        server.attach(gvol_client)
+        started = time.perf_counter()
+        result = gvol_client.futures_orderbook(exchange="deribit")
+        elapsed = time.perf_counter() - started
+
+    assert result["UtilityRealtimeFuturesPrices"] == ROWS
+    # 0.05s of latency plus ~110kB at 1MB/s.
+    assert 0.12 < elapsed < 1
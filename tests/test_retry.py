@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from gql.transport.exceptions import TransportServerError
+
+from gvol import AsyncGVol, GVol
+from gvol.ratelimit import RateLimiter
+from gvol.retry import RetryPolicy, retry_after_seconds
+from gvol.testing import LocalServer, StatusError
+
+ORDERBOOK = {"data": {"CurrentOrderbookSkewStrike": [{"instrumentName": "BTC-1JAN21-29000-C"}]}}
+
+
+def test_retry_after_header():
+    in_a_minute = datetime.now(timezone.utc) + timedelta(minutes=1)
+
+    assert retry_after_seconds({"Retry-After": "2.5"}) == 2.5
+    assert 55 < retry_after_seconds({"Retry-After": format_datetime(in_a_minute)}) <= 60
+    assert retry_after_seconds({"Retry-After": "soon"}) is None
+    assert retry_after_seconds({}) is None
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(backoff=1, max_backoff=4)
+
+    delays = [policy.delay(10) for _ in range(100)]
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_after_takes_precedence_up_to_its_own_ceiling():
+    assert RetryPolicy(max_backoff=4).delay(0, {"Retry-After": "60"}) == 60
+    assert RetryPolicy(max_retry_after=20).delay(0, {"Retry-After": "60"}) == 20
+
+
+@pytest.fixture
+def statuses():
+    """HTTP errors the server answers with before the orderbook, in order."""
+    return []
+
+
+@pytest.fixture
+def server(statuses):
+    def feed(query, variables):
+        if statuses:
+            status = statuses.pop(0)
+            raise StatusError(status, {"Retry-After": "0.25"} if status == 429 else None)
+        return ORDERBOOK["data"]
+
+    with LocalServer(feed) as server:
+        yield server
+
+
+def client(server, **kwargs):
+    gvol_client = GVol("header", "gvol_api_key", **kwargs)
+    server.attach(gvol_client)
+    return gvol_client
+
+
+def test_transient_errors_are_retried(server, statuses):
+    statuses.extend([503, 429, 502])
+    limiter = RateLimiter(rate=10, burst=10)
+    gvol_client = client(server, retry=RetryPolicy(backoff=0.001), rate_limiter=limiter)
+
+    result = gvol_client.options_orderbook(symbol="BTC", exchange="deribit")
+    assert result == ORDERBOOK["data"]
+    assert gvol_client.retries["options_orderbook"] == 3
+    # The 429 emptied the shared bucket.
+    assert limiter.reserve() > 0
+
+
+def test_retry_after_is_read_from_each_response(server, statuses):
+    statuses.extend([429, 503])
+    delays = []
+
+    class RecordingPolicy(RetryPolicy):
+        def delay(self, attempt, headers=None):
+            delays.append(super().delay(attempt, headers))
+            return delays[-1]
+
+    gvol_client = client(server, retry=RecordingPolicy(backoff=0.001))
+
+    gvol_client.options_orderbook(symbol="BTC", exchange="deribit")
+    assert delays[0] == 0.25
+    # The 503 has no Retry-After, the one of the 429 is not reused.
+    assert delays[1] <= 0.002
+
+
+def test_client_errors_and_exhausted_retries_raise(server, statuses):
+    statuses.extend([400, 503, 503])
+    gvol_client = client(server, retry=RetryPolicy(attempts=2, backoff=0.001))
+
+    for code in 400, 503:
+        with pytest.raises(TransportServerError) as error:
+            gvol_client.options_orderbook(symbol="BTC", exchange="deribit")
+        assert error.value.code == code
+    assert gvol_client.retries["options_orderbook"] == 1
+    assert gvol_client._retry.failures["options_orderbook"] == 2
+
+
+def test_streams_are_retried(server, statuses):
+    statuses.extend([503])
+    gvol_client = client(server, retry=RetryPolicy(backoff=0.001))
+
+    rows = list(gvol_client.stream("options_orderbook", symbol="BTC", exchange="deribit"))
+    assert rows == ORDERBOOK["data"]["CurrentOrderbookSkewStrike"]
+    assert gvol_client.retries["options_orderbook"] == 1
+
+
+def test_async_client_retries(server, statuses):
+    pytest.importorskip("aiohttp")
+    statuses.extend([503, 429])
+
+    async def main():
+        async with AsyncGVol(
+            "header", "gvol_api_key", retry=RetryPolicy(backoff=0.001)
+        ) as gvol_client:
+            server.attach(gvol_client)
+            result = await gvol_client.options_orderbook(symbol="BTC", exchange="deribit")
+            rows = [
+                row
+                async for row in gvol_client.stream(
+                    "options_orderbook", symbol="BTC", exchange="deribit"
+                )
+            ]
+            return result, rows, gvol_client.retries["options_orderbook"]
+
+    assert asyncio.run(main()) == (
+        ORDERBOOK["data"],
+        ORDERBOOK["data"]["CurrentOrderbookSkewStrike"],
+        2,
+    )
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from gvol import AsyncGVol, GVol
+from gvol.ratelimit import RateLimiter
+from gvol.scheduler import Scheduler
+
+
+class FakeGVol(GVol):
+    def _request(self, query, variable_values):
+        if variable_values["exchange"] == "bitcom":
+            raise ValueError("bitcom is down")
+        return {"UtilityRealtimeFuturesPrices": [{"exchange": variable_values["exchange"]}]}
+
+
+def test_plan_stretches_and_sheds_lower_priorities():
+    gvol_client = FakeGVol("header", "gvol_api_key", rate_limiter=RateLimiter(10))
+    scheduler = Scheduler(gvol_client)
+
+    live = scheduler.add("futures_orderbook", period=0.25, priority=2, exchange="deribit")
+    perps = [
+        scheduler.add("futures_perps_table", period=0.5, priority=1, exchange=exchange)
+        for exchange in ("deribit", "okex", "bybit", "ftx")
+    ]
+    details = scheduler.add("options_orderbook_details", period=1, exchange="deribit")
+    assert live.planned == 0.25
+    assert [feed.planned for feed in perps] == [pytest.approx(2 / 3)] * 4  # 8/s in 6/s
+    assert details.planned is None
+
+    for feed in perps[1:]:
+        scheduler.remove(feed)
+    assert perps[0].planned == 0.5 and details.planned == 1
+
+    with pytest.raises(ValueError):
+        scheduler.add("futures_orderbooks", period=1)
+    with pytest.raises(ValueError):
+        Scheduler(FakeGVol("header", "gvol_api_key"))
+
+
+def test_async_clients_are_rejected():
+    pytest.importorskip("aiohttp")
+    with pytest.raises(TypeError, match="AsyncGVol"):
+        Scheduler(AsyncGVol("header", "gvol_api_key"), rate=10)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_scheduler_polls_feeds_at_their_period():
+    gvol_client = FakeGVol("header", "gvol_api_key")
+    clock = FakeClock()
+    results = []
+
+    scheduler = Scheduler(gvol_client, rate=100, clock=clock)
+    fast = scheduler.add(
+        "futures_orderbook",
+        period=0.05,
+        exchange="deribit",
+        callback=lambda feed, result: results.append(result),
+    )
+    slow = scheduler.add("futures_orderbook", period=0.2, exchange="okex")
+    down = scheduler.add("futures_orderbook", period=0.2, exchange="bitcom")
+    for step in range(50):
+        clock.now = step / 100
+        scheduler.run_pending()
+    report = scheduler.report()
+
+    assert report[fast].updates == 10
+    assert report[fast].achieved == pytest.approx(0.05, abs=0.01)
+    assert report[slow].updates == 3
+    assert report[down].updates == 0 and report[down].errors == 3
+    assert results[0] == {"UtilityRealtimeFuturesPrices": [{"exchange": "deribit"}]}
+    assert report[slow].age == pytest.approx(0.09) and report[down].age is None
+
+
+def test_scheduler_polls_from_a_background_thread():
+    gvol_client = FakeGVol("header", "gvol_api_key")
+    updated = threading.Event()
+
+    def callback(feed, result):
+        if feed.updates >= 3:
+            updated.set()
+
+    with Scheduler(gvol_client, rate=100) as scheduler:
+        feed = scheduler.add("futures_orderbook", period=0.01, exchange="deribit", callback=callback)
+        assert updated.wait(timeout=10)
+    assert scheduler.report()[feed].updates >= 3
@@ -0,0 +1,44 @@
+import inspect
+import re
+
+from gql import gql
+from graphql import build_ast_schema, parse, validate
+
+from gvol import GVol, __version__, queries, schema
+
+
+def test_endpoint_documents_validate_against_bundled_schema():
+    bundled = schema.load_schema(schema.BUNDLED_SCHEMA_PATH)
+    used = re.findall(r'self\._execute\(\s*"(\w+)"', inspect.getsource(GVol))
+    assert len(used) > 30
+
+    for name in used:
+        assert validate(bundled, gql(getattr(queries, name))) == [], name
+
+
+def test_client_uses_local_schema(tmp_path, monkeypatch):
+    monkeypatch.setenv("GVOL_CACHE_DIR", str(tmp_path))
+
+    gvol_client = GVol("header", "gvol_api_key")
+
+    assert gvol_client._client.schema is not None
+    assert not gvol_client._client.fetch_schema_from_transport
+
+
+def test_saved_schema_is_preferred(tmp_path, monkeypatch):
+    monkeypatch.setenv("GVOL_CACHE_DIR", str(tmp_path))
+    assert "ping" not in schema.load_schema().query_type.fields
+
+    refreshed = build_ast_schema(parse("type Query { ping: String }"))
+    assert schema.save_schema(refreshed) == tmp_path / "schema.graphql"
+
+    assert "ping" in schema.load_schema().query_type.fields
+
+
+def test_schema_saved_by_another_version_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setenv("GVOL_CACHE_DIR", str(tmp_path))
+    refreshed = build_ast_schema(parse("type Query { ping: String }"))
+    path = schema.save_schema(refreshed)
+
+    path.write_text(path.read_text().replace(f"gvol {__version__}.", "gvol 0.0.1.", 1))
+    assert "ping" not in schema.load_schema().query_type.fields
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+
+from gvol import AsyncGVol, GVol
+from gvol.store import Store, to_ms
+from gvol.testing import LocalServer
+
+HOUR = 3600 * 1000
+START = to_ms("2022-10-01")
+
+
+def feed(query, variables):
+    return {
+        "HourlyInstrumentImpliedVolandOI": [
+            {"date": str(START + n * HOUR), "instrumentName": name, "oi": 10, "markIV": iv + n, "bidIV": None, "askIV": None}
+            for n in range(24)
+            for name, iv in (("BTC-30DEC22-40000-C", 60.0), ("BTC-30DEC22-20000-P", 70.0))
+        ]
+    }
+
+
+@pytest.mark.parametrize("client_class", [GVol, AsyncGVol])
+def test_clients_populate_the_store(tmp_path, client_class):
+    if client_class is AsyncGVol:
+        pytest.importorskip("aiohttp")
+    variables = dict(symbol="BTC", dateStart="2022-10-01", dateEnd="2022-10-02", expiration="30DEC22", strike="40000", putCall="C")
+
+    async def main(gvol_client):
+        await gvol_client.HourlyInstrumentImpliedVolandOI(**variables)
+        await gvol_client.close()
+
+    with Store(str(tmp_path / "gvol.sqlite")) as store, LocalServer(feed) as server:
+        gvol_client = client_class("header", "gvol_api_key", store=store)
+        server.attach(gvol_client)
+        if client_class is AsyncGVol:
+            insert, threads = store.insert, []
+            store.insert = lambda *args: threads.append(threading.current_thread()) or insert(*args)
+            asyncio.run(main(gvol_client))
+            # sqlite writes run off the event loop.
+            assert threads and threading.current_thread() not in threads
+        else:
+            gvol_client.HourlyInstrumentImpliedVolandOI(**variables)
+            gvol_client.HourlyInstrumentImpliedVolandOI(**variables, fields=["date", "instrumentName", "oi"])
+
+        rows = store.select("HourlyInstrumentImpliedVolandOI", "2022-10-01 03:00", "2022-10-01 06:00", instrumentName="BTC-30DEC22-40000-C")
+        assert [row["markIV"] for row in rows] == [63.0, 64.0, 65.0]
+        assert rows[0]["date"] == START + 3 * HOUR
+        assert rows[0]["symbol"] == "BTC" and rows[0]["strike"] == "40000"
+        assert len(store.select("HourlyInstrumentImpliedVolandOI")) == 48
+
+        latest = store.at("HourlyInstrumentImpliedVolandOI", "2022-10-01 10:30", symbol="BTC")
+        assert sorted((row["instrumentName"], row["markIV"]) for row in latest) == [
+            ("BTC-30DEC22-20000-P", 80.0),
+            ("BTC-30DEC22-40000-C", 70.0),
+        ]
+        with pytest.raises(ValueError):
+            store.select("HourlyInstrumentImpliedVolandOI", markPrice=1.0)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+from gql.transport.exceptions import TransportProtocolError, TransportQueryError
+
+from gvol import AsyncGVol, GVol, testing
+from gvol.streaming import RecordParser, batches, records
+
+ROWS = [
+    {"date": "1652831832293", "instrumentName": "BTC-27MAY22-30000-C", "price": 0.05},
+    {"date": "1652831832294", "instrumentName": "BTC-27MAY22-31000-C", "price": 12},
+    {"date": "1652831832295", "instrumentName": "ETH-27MAY22-2000-Pé", "price": None},
+]
+BODY = json.dumps(
+    {"data": {"Ignored": {"a": [1, 2]}, "TimesAndSales": ROWS}}, indent=1
+).encode()
+
+
+def chunked(body, size):
+    return [body[n : n + size] for n in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, len(BODY)])
+def test_records_are_parsed_across_chunks(size):
+    assert list(records("TimesAndSales", chunked(BODY, size))) == ROWS
+
+
+def test_rows_are_yielded_as_they_arrive():
+    parser = RecordParser("TimesAndSales")
+    first_row_end = BODY.index(b"}", BODY.index(b"BTC-27MAY22-30000-C")) + 1
+
+    assert parser.feed(BODY[:first_row_end]) == [ROWS[0]]
+    assert parser.feed(BODY[first_row_end:]) == ROWS[1:]
+    assert parser.close() == []
+
+
+def test_errors_and_truncated_bodies():
+    body = b'{"errors": [{"message": "Unauthorized"}], "data": {"TimesAndSales": null}}'
+    with pytest.raises(TransportQueryError, match="Unauthorized"):
+        list(records("TimesAndSales", [body]))
+
+    with pytest.raises(TransportProtocolError):
+        list(records("TimesAndSales", [BODY[:-20]]))
+
+
+def test_batches():
+    assert [len(batch) for batch in batches(range(5), 2)] == [2, 2, 1]
+
+
+def feed(query, variables):
+    assert (query, variables) == ("options_trades", {"date": "2022-05-18", "exchange": "deribit"})
+    return {"Ignored": {"a": [1, 2]}, "TimesAndSales": ROWS}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # Send the body 16 bytes at a time, for rows to arrive across chunks.
+    monkeypatch.setattr(testing, "CHUNK_SIZE", 16)
+    with testing.LocalServer(feed, bandwidth=1e9) as server:
+        yield server
+
+
+def test_client_streams_batches(server):
+    gvol_client = GVol("header", "gvol_api_key")
+    server.attach(gvol_client)
+
+    result = list(
+        gvol_client.stream(
+            "options_trades", batch_size=2, date="2022-05-18", exchange="deribit"
+        )
+    )
+    assert result == [ROWS[:2], ROWS[2:]]
+    gvol_client.close()
+
+
+def test_async_client_streams_rows(server):
+    pytest.importorskip("aiohttp")
+
+    async def main():
+        async with AsyncGVol("header", "gvol_api_key") as gvol_client:
+            server.attach(gvol_client)
+            return [
+                row
+                async for row in gvol_client.stream(
+                    "options_trades", date="2022-05-18", exchange="deribit"
+                )
+            ]
+
+    assert asyncio.run(main()) == ROWS
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+from graphql import OperationType, print_ast
+
+from gvol import AsyncGVol, GVol
+from gvol.registry import registry
+from gvol.subscription import AdaptiveInterval, document
+from gvol.testing import LocalServer
+
+
+def test_adaptive_interval():
+    interval = AdaptiveInterval(min_interval=0.1, max_interval=0.3, factor=2)
+    assert [interval.update(False) for _ in range(3)] == [0.2, 0.3, 0.3]
+    assert interval.update(True) == 0.1
+
+    with pytest.raises(ValueError):
+        AdaptiveInterval(min_interval=1, max_interval=0.5)
+
+
+class Feed:
+    """Futures book changing on every other request."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def __call__(self, query, variables):
+        assert query == "futures_orderbook"
+        self.requests += 1
+        price = self.requests // 2
+        return {"UtilityRealtimeFuturesPrices": [{"markPrice": price}]}
+
+
+async def take(results, n):
+    taken = []
+    async for result in results:
+        taken.append(result)
+        if len(taken) == n:
+            return taken
+
+
+@pytest.mark.parametrize("client_class", [GVol, AsyncGVol])
+def test_subscribe_yields_changed_results(client_class):
+    if client_class is AsyncGVol:
+        pytest.importorskip("aiohttp")
+
+    async def main(server):
+        gvol_client = client_class("header", "gvol_api_key")
+        server.attach(gvol_client)
+        books = await take(
+            gvol_client.subscribe(
+                "futures_orderbook", min_interval=0, max_interval=0.01, exchange="deribit"
+            ),
+            3,
+        )
+        if client_class is AsyncGVol:
+            await gvol_client.close()
+        return books
+
+    with LocalServer(Feed()) as server:
+        books = asyncio.run(main(server))
+
+    assert [book["UtilityRealtimeFuturesPrices"][0]["markPrice"] for book in books] == [0, 1, 2]
+    assert server.requests == 4
+
+
+def test_queries_become_subscriptions():
+    operation = document("futures_orderbook").definitions[0]
+    query = registry.document("futures_orderbook").definitions[0]
+    assert operation.operation == OperationType.SUBSCRIPTION
+    assert print_ast(operation.selection_set) == print_ast(query.selection_set)
+    assert print_ast(document("futures_orderbook")).startswith("subscription ")
+
+
+@pytest.mark.parametrize("client_class", [GVol, AsyncGVol])
+def test_subscribe_over_websockets(client_class):
+    websockets = pytest.importorskip("websockets")
+    if client_class is AsyncGVol:
+        pytest.importorskip("aiohttp")
+    received = []
+
+    async def graphql_ws(websocket, *args):
+        """Answers a subscription with three books over the graphql-ws protocol."""
+        async for message in websocket:
+            message = json.loads(message)
+            received.append(message)
+            if message["type"] == "connection_init":
+                await websocket.send(json.dumps({"type": "connection_ack"}))
+            elif message["type"] == "start":
+                for price in range(3):
+                    data = {"UtilityRealtimeFuturesPrices": [{"markPrice": price}]}
+                    await websocket.send(
+                        json.dumps(
+                            {"type": "data", "id": message["id"], "payload": {"data": data}}
+                        )
+                    )
+                await websocket.send(json.dumps({"type": "complete", "id": message["id"]}))
+
+    async def main():
+        async with websockets.serve(
+            graphql_ws, "127.0.0.1", 0, subprotocols=["graphql-ws"]
+        ) as server:
+            port = server.sockets[0].getsockname()[1]
+            gvol_client = client_class(
+                "header", "gvol_api_key", subscription_url=f"ws://127.0.0.1:{port}/graphql"
+            )
+            books = [
+                book
+                async for book in gvol_client.subscribe("futures_orderbook", exchange="deribit")
+            ]
+            if client_class is AsyncGVol:
+                await gvol_client.close()
+            return books
+
+    books = asyncio.run(main())
+
+    assert [book["UtilityRealtimeFuturesPrices"][0]["markPrice"] for book in books] == [0, 1, 2]
+    start = next(message for message in received if message["type"] == "start")
+    assert start["payload"]["query"].lstrip().startswith("subscription ")
+    assert start["payload"]["variables"] == {"exchange": "deribit"}
+
+
+def test_local_server_reports_feed_errors():
+    def feed(query, variables):
+        raise RuntimeError("feed is down")
+
+    with LocalServer(feed) as server:
+        gvol_client = GVol("header", "gvol_api_key")
+        server.attach(gvol_client)
+        with pytest.raises(Exception, match="feed is down"):
+            gvol_client.futures_orderbook(exchange="deribit")